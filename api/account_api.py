@@ -1,8 +1,8 @@
 # api/account_api.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 
-from api.auth_api import get_current_user
+from api.auth_api import get_current_user, token_cache
 from repositories.account_repository import AccountRepository
 from services.account_service import AccountService
 
@@ -15,6 +15,22 @@ class OpenAccountIn(BaseModel):
     account_no: str
 
 
+# -----------------------------
+# 계좌 소유자 확인 (account / order entry 라우터 공용)
+#  - 토큰 claims(account_ids) 로 메모리에서 먼저 확인
+#  - claims 에 없으면(토큰 발급 후 개설 등) DB 로 한번 확인 후 캐시에 반영
+# -----------------------------
+def check_owner(account_repo: AccountRepository, user, account_id: int):
+    if account_id in user.account_ids:
+        return
+
+    owner = account_repo.get_user_id_by_account(account_id)
+    if owner != user.user_id:
+        raise HTTPException(403, "Forbidden")
+
+    token_cache.grant_account(user.user_id, account_id)
+
+
 # -----------------------------
 # 라우터 팩토리
 # -----------------------------
@@ -30,11 +46,14 @@ def create_account_router(account_repo: AccountRepository, account_service: Acco
         if user.user_id != body.user_id:
             raise HTTPException(status_code=403, detail="User ID mismatch")
 
-        new_id = account_repo.create_account(
+        new_id = account_service.create_account(
             user_id=body.user_id,
             account_no=body.account_no
         )
 
+        # 캐시된 토큰 claims 에 새 계좌 반영
+        token_cache.grant_account(user.user_id, new_id)
+
         return {"account_id": new_id}
 
     # -------------------------------------------------------
@@ -53,19 +72,36 @@ def create_account_router(account_repo: AccountRepository, account_service: Acco
     def summary(account_id: int, user=Depends(get_current_user)):
 
         # 계좌 소유자 확인
-        owner = account_repo.get_user_id_by_account(account_id)
-        if owner != user.user_id:
-            raise HTTPException(403, "Forbidden")
+        check_owner(account_repo, user, account_id)
 
-        summary = account_repo.get_account_summary(account_id)
+        summary = account_service.get_account_summary(account_id)
         return summary
 
     # -------------------------------------------------------
-    # 4) 유저 전체 계좌 목록
+    # 4) 여러 계좌 요약 한번에 조회
+    #    /account/summaries?account_ids=1&account_ids=2
+    # -------------------------------------------------------
+    @router.get("/account/summaries")
+    def summaries(account_ids: list[int] = Query(...), user=Depends(get_current_user)):
+
+        for account_id in account_ids:
+            check_owner(account_repo, user, account_id)
+
+        return account_service.get_account_summaries(account_ids)
+
+    # -------------------------------------------------------
+    # 5) 유저 전체 계좌 목록
     # -------------------------------------------------------
     @router.get("/account/list")
     def account_list(user=Depends(get_current_user)):
-        rows = account_repo.get_accounts_by_user(user.user_id)
+        rows = account_service.get_accounts_by_user(user.user_id)
         return rows
 
+    # -------------------------------------------------------
+    # 6) 계좌 캐시 hit/miss 통계
+    # -------------------------------------------------------
+    @router.get("/account/cache/stats")
+    def cache_stats(user=Depends(get_current_user)):
+        return account_service.cache_stats()
+
     return router
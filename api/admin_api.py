@@ -0,0 +1,111 @@
+# api/admin_api.py
+import time
+from collections import Counter
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+
+from api.auth_api import get_admin_user
+from services import request_trace
+from services.engine_client import EngineClient, EngineError
+from services.profiler import ProfilerBusy, SamplingProfiler
+from services.request_trace import RequestTrace, SlowRequestLog
+
+
+def create_admin_router(profiler: SamplingProfiler, slow_log: SlowRequestLog,
+                        engine_client: EngineClient | None = None):
+    """
+    운영자 전용 (ADMIN_USER_IDS)
+    /admin/profile            POST → seconds 동안 샘플링 후 collapsed stack 파일 (format=top 이면 leaf 상위)
+                                      target=engine 이면 엔진 서버 프로세스를 샘플링
+    /admin/profile            GET  → 실행 여부 / 마지막 실행 요약
+    /admin/slow-requests      GET  → 느린 요청 stage / SQL 내역 (최근 순)
+                              DELETE → 비우기
+    /admin/slow-requests/threshold PUT → 기준 ms 변경 (0 이면 끔)
+    """
+    router = APIRouter(prefix="/admin")
+
+    @router.post("/profile")
+    def run_profile(seconds: float = 10.0, interval_ms: float | None = None,
+                    thread: str | None = None, idle: bool = False,
+                    target: str = "api", format: str = "collapsed",
+                    admin=Depends(get_admin_user)):
+        if target == "engine":
+            if engine_client is None:
+                raise HTTPException(400, "matching engine runs in this process (use target=api)")
+            try:
+                result = engine_client.call("profile", seconds, interval_ms, thread, idle,
+                                            timeout=seconds + engine_client.timeout)
+            except EngineError as e:
+                if e.name == "ProfilerBusy":
+                    raise HTTPException(409, "profiler already running")
+                raise
+            counts = Counter(result.pop("counts"))
+        else:
+            try:
+                result = profiler.run(seconds, interval_ms, thread, idle)
+            except ProfilerBusy:
+                raise HTTPException(409, "profiler already running")
+            counts = result.pop("counts")
+
+        if format == "top":
+            return {**result, "target": target, "top": profiler.top(counts)}
+
+        filename = f"profile-{target}-{int(time.time())}.folded"
+        return Response(
+            content=profiler.collapsed(counts), media_type="text/plain",
+            headers={
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                "X-Profile-Samples": str(result["samples"]),
+            },
+        )
+
+    @router.get("/profile")
+    def profile_status(admin=Depends(get_admin_user)):
+        return {"running": profiler.running, "last": profiler.last}
+
+    @router.get("/slow-requests")
+    def slow_requests(limit: int = 50, admin=Depends(get_admin_user)):
+        return {**slow_log.stats(), "requests": slow_log.recent(limit)}
+
+    @router.delete("/slow-requests")
+    def clear_slow_requests(admin=Depends(get_admin_user)):
+        slow_log.clear()
+        return {"ok": True}
+
+    @router.put("/slow-requests/threshold")
+    def set_threshold(ms: float, admin=Depends(get_admin_user)):
+        slow_log.threshold_ms = max(0.0, ms)
+        return slow_log.stats()
+
+    return router
+
+
+# ---------------------------------------------------------
+# 느린 요청 기록 미들웨어 (pure ASGI, contextvar 에 RequestTrace 를 걸어둠)
+# ---------------------------------------------------------
+class SlowRequestMiddleware:
+    def __init__(self, app, slow_log: SlowRequestLog):
+        self.app = app
+        self.slow_log = slow_log
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.slow_log.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace(scope["method"], scope["path"],
+                             scope.get("query_string", b"").decode(errors="replace"))
+        status = None
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = request_trace.begin(trace)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_trace.end(token)
+            self.slow_log.finish(trace, status)
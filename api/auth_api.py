@@ -1,10 +1,12 @@
 # api/auth_api.py
 import os
-from fastapi import Header, HTTPException
+import threading
+import time
+from fastapi import Depends, Header, HTTPException
 import jwt
 from datetime import datetime, timedelta
 from pydantic import BaseModel
-from services.db_login import LoginDB
+from services.ttl_cache import TTLCache
 
 SECRET = "MYHTS_SECRET_KEY"
 ALGORITHM = "HS256"
@@ -15,17 +17,71 @@ ALGORITHM = "HS256"
 class UserInfo(BaseModel):
     user_id: int
     email: str
+    account_ids: list[int] = []   # 토큰 발급 시점의 보유 계좌 (소유권 체크용)
 
 
-# ---------------------------
-# 단일 DB 인스턴스 (중복 방지)
-# ---------------------------
-db = LoginDB(
-    host=os.getenv("DB_HOST", "localhost"),
-    dbname=os.getenv("DB_NAME", "myhts"),
-    user=os.getenv("DB_USER", "myhts"),
-    password=os.getenv("DB_PASSWORD", "myhts_pw"),
-    port=int(os.getenv("DB_PORT", "5432")),
+# ---------------------------------------------------
+# 검증된 토큰 캐시 (Authorization 헤더 → UserInfo)
+# ---------------------------------------------------
+class TokenCache:
+    """
+    jwt.decode 결과를 캐시해서 폴링 요청마다 서명검증을 반복하지 않게 한다.
+    - 엔트리 TTL 은 토큰 exp 를 넘지 않음
+    - user_id → 헤더 인덱스를 따로 들고 있어서
+      계좌 개설 시 해당 유저의 캐시 엔트리를 바로 갱신할 수 있음
+      (캐시에서 밀려나거나 만료된 헤더는 on_evict 로 인덱스에서도 빠짐 → 캐시 크기 이상 커지지 않음)
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 300.0):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl, on_evict=self._unindex)
+        self._by_user = {}   # user_id -> set(header)
+        self._lock = threading.Lock()
+
+    def _unindex(self, header: str, user: UserInfo):
+        with self._lock:
+            tokens = self._by_user.get(user.user_id)
+            if tokens is not None:
+                tokens.discard(header)
+                if not tokens:
+                    del self._by_user[user.user_id]
+
+    def get(self, header: str) -> UserInfo | None:
+        return self.cache.get(header)
+
+    def put(self, header: str, user: UserInfo, exp: float | None = None):
+        ttl = self.cache.ttl
+        if exp is not None:
+            ttl = min(ttl, exp - time.time())
+        if ttl <= 0:
+            return
+
+        self.cache.set(header, user, ttl=ttl)
+        with self._lock:
+            self._by_user.setdefault(user.user_id, set()).add(header)
+
+    # -----------------------------------
+    # 새 계좌를 캐시된 UserInfo 에 반영
+    # -----------------------------------
+    def grant_account(self, user_id: int, account_id: int):
+        with self._lock:
+            headers = list(self._by_user.get(user_id, ()))
+
+        for h in headers:
+            user = self.cache.get(h)     # 만료됐으면 get 이 on_evict 로 인덱스 정리
+            if user is None or account_id in user.account_ids:
+                continue
+
+            updated = UserInfo(
+                user_id=user.user_id,
+                email=user.email,
+                account_ids=[*user.account_ids, account_id],
+            )
+            self.cache.replace(h, updated)
+
+
+token_cache = TokenCache(
+    maxsize=int(os.getenv("TOKEN_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("TOKEN_CACHE_TTL", "300")),
 )
 
 
@@ -36,6 +92,11 @@ def get_current_user(Authorization: str = Header(None)) -> UserInfo:
     if not Authorization:
         raise HTTPException(status_code=401, detail="Missing Authorization header")
 
+    # 이미 검증된 헤더면 파싱/디코딩 생략
+    cached = token_cache.get(Authorization)
+    if cached is not None:
+        return cached
+
     try:
         scheme, token = Authorization.split()
     except ValueError:
@@ -49,8 +110,10 @@ def get_current_user(Authorization: str = Header(None)) -> UserInfo:
         payload = jwt.decode(token, SECRET, algorithms=[ALGORITHM])
         user_info = UserInfo(
             user_id=payload["user_id"],
-            email=payload["email"]
+            email=payload["email"],
+            account_ids=payload.get("account_ids", []),
         )
+        token_cache.put(Authorization, user_info, exp=payload.get("exp"))
         return user_info
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
@@ -68,3 +131,15 @@ def create_access_token(data: dict, expires_delta: timedelta = timedelta(hours=1
     to_encode.update({"exp": expire})
 
     return jwt.encode(to_encode, SECRET, algorithm=ALGORITHM)
+
+
+# ---------------------------------------------------
+# 운영자 (ADMIN_USER_IDS=1,2 에 있는 user_id 만)
+# ---------------------------------------------------
+ADMIN_USER_IDS = {int(x) for x in os.getenv("ADMIN_USER_IDS", "").split(",") if x.strip()}
+
+
+def get_admin_user(user: UserInfo = Depends(get_current_user)) -> UserInfo:
+    if user.user_id not in ADMIN_USER_IDS:
+        raise HTTPException(status_code=403, detail="Admin only")
+    return user
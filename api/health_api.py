@@ -0,0 +1,78 @@
+# api/health_api.py
+import json
+
+from fastapi import APIRouter, Response
+
+from services.startup import Startup
+
+
+def create_health_router(startup: Startup):
+    """
+    /health          → liveness (기존 응답 유지)
+    /health/live     → 프로세스가 살아 있고 기동에 실패하지 않았으면 200
+    /health/ready    → 기동 + 워밍업 완료, DB / 엔진 check 통과 시 200 (아니면 503)
+    /health/startup  → 단계별 기동 시간
+    """
+    router = APIRouter()
+
+    @router.get("/health")
+    def health():
+        return {"status": "api ok"}
+
+    @router.get("/health/live")
+    def live(response: Response):
+        if not startup.live:
+            response.status_code = 503
+            return {"status": "failed", "error": startup.error}
+        return {"status": "ok"}
+
+    @router.get("/health/ready")
+    def ready(response: Response):
+        ok, checks = startup.readiness()
+        if not ok:
+            response.status_code = 503
+        return {
+            "status": "ready" if ok else "starting" if startup.live else "failed",
+            "phase": startup.current,
+            "checks": checks,
+        }
+
+    @router.get("/health/startup")
+    def startup_report():
+        return startup.report()
+
+    return router
+
+
+# ---------------------------------------------------------
+# 기동(워밍업) 완료 전 요청 차단
+#  /health* 만 통과, 나머지는 503 + Retry-After (라우터가 아직 등록 전)
+# ---------------------------------------------------------
+class StartupGate:
+    """pure ASGI 미들웨어 (기동 후에는 flag 확인 1번만)"""
+
+    def __init__(self, app, startup: Startup, retry_after: int = 1):
+        self.app = app
+        self.startup = startup
+        self.retry_after = retry_after
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or self.startup.finished
+                or scope["path"].startswith("/health")):
+            await self.app(scope, receive, send)
+            return
+
+        body = json.dumps({
+            "detail": "starting" if self.startup.live else "startup failed",
+            "phase": self.startup.current,
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
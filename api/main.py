@@ -1,5 +1,8 @@
 # api/main.py
+import asyncio
 import os
+import threading
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.security import OAuth2PasswordRequestForm
@@ -10,16 +13,34 @@ from api.account_api import create_account_router
 from api.auth_api import get_current_user
 from api.trade_api import create_trade_router
 from api.orderbook_api import create_orderbook_router
+from api.merge_orderbook_api import create_merged_orderbook_router
+from api.order_entry_api import create_order_entry_router
+from api.health_api import StartupGate, create_health_router
+from api.admin_api import SlowRequestMiddleware, create_admin_router
 
 from repositories.account_repository import AccountRepository
+from repositories.archive_repository import ArchiveRepository
 from repositories.order_repository import OrderRepository
 from repositories.trade_repositories import TradeRepository
 
 from services.account_service import AccountService
+from services.binance_depth import BinanceDepthService
+from services.depth_aggregator import DepthAggregator
+from services.archive_job import ArchiveJob
 from services.trade_service import TradeService
 from services.db_login import LoginDB
-from services.db_matching import MatchingDB
+from services.db_migrations import apply_migrations
+from services.db_pool import DBPool
+from services.engine_client import EngineClient, RemoteEngine, RemoteGateway, sync_account_cache
+from services.engine_persister import EnginePersister
+from services.engine_protocol import is_engine_address
 from services.matching_engine import MatchingEngine
+from services.order_gateway import OrderGateway
+from services.order_service import OrderService
+from services.profiler import SamplingProfiler
+from services.request_trace import SlowRequestLog
+from services.shm_book import ShmBookReader
+from services.startup import Startup, warm_engine_books
 from services.marketdata_service import MarketDataService   # ★ 여기 중요!
 
 from fastapi import status
@@ -30,54 +51,200 @@ SECRET = "MYHTS_SECRET_KEY"
 
 
 # ----------------------------------------------------------
-# FastAPI 기본 설정
+# 공용 자원 (import 시점에는 접속하지 않음, lifespan 에서 준비)
 # ----------------------------------------------------------
-app = FastAPI(
-    title="HTS API Server",
-    description="HTS 클라이언트가 직접 호출하는 API 서버",
-    version="1.0.0",
-)
-
-
-# ----------------------------------------------------------
-# DB 연결
-# ----------------------------------------------------------
-db = LoginDB(
-    host=os.getenv("DB_HOST", "localhost"),
-    dbname=os.getenv("DB_NAME", "myhts"),
-    user=os.getenv("DB_USER", "myhts"),
-    password=os.getenv("DB_PASSWORD", "myhts_pw"),
-    port=int(os.getenv("DB_PORT", "5432")),
-)
-
-matchingDb = MatchingDB()
-conn = matchingDb.conn
-
-order_repo = OrderRepository(conn)
-trade_repo = TradeRepository(conn)
-account_repo = AccountRepository(conn)
+pool = DBPool()
+db = LoginDB(pool)
+startup = Startup()
+
+# 운영 진단 (on-demand 프로파일러, 느린 요청 기록)
+profiler = SamplingProfiler()
+slow_log = SlowRequestLog()
+
+
+def build_services() -> dict:
+    """repo / 엔진 / 접수 게이트웨이 / 병합 오더북 구성"""
+    # API 조회/접수용 repo: 호출마다 풀에서 빌려 씀 (요청끼리 커넥션/트랜잭션 공유 없음)
+    order_repo = pool.repo(OrderRepository)
+    trade_repo = pool.repo(TradeRepository)
+    account_repo = pool.repo(AccountRepository)
+
+    account_service = AccountService(account_repo)
+    trade_service = TradeService(trade_repo)
+
+    svc = {
+        "order_repo": order_repo,
+        "trade_repo": trade_repo,
+        "account_repo": account_repo,
+        "account_service": account_service,
+        "trade_service": trade_service,
+    }
 
-account_service = AccountService(account_repo)
-trade_service = TradeService(trade_repo)
+    # 종결 주문/오래된 체결 → cold 파티션 (전용 커넥션)
+    if os.getenv("ARCHIVE_ENABLED", "1") == "1":
+        svc["archive_job"] = ArchiveJob(ArchiveRepository(pool.reserve()))
+
+    # ----------------------------------------------------------
+    # 매칭엔진
+    #  ENGINE_URL=unix://... / tcp://... 이면 엔진 서버(engine/engine_server.py) 하나를
+    #  모든 uvicorn 워커가 공유, 없으면 이 프로세스 안에서 엔진 실행 (워커 1개일 때만)
+    # ----------------------------------------------------------
+    engine_url = os.getenv("ENGINE_URL")
+
+    if is_engine_address(engine_url):
+        engine_client = EngineClient(engine_url)
+        # 체결은 엔진 프로세스에서 반영 → 엔진이 push 하는 무효화로 이 워커 계좌 캐시 갱신
+        sync_account_cache(engine_client, account_service)
+        # 오더북/티커 조회는 엔진이 쓰는 공유메모리(ENGINE_SHM_PATH)에서 바로 읽음
+        matching_engine = RemoteEngine(engine_client, ShmBookReader.from_env())
+        order_gateway = order_service = RemoteGateway(engine_client)
+        svc["engine_client"] = engine_client
+    else:
+        # 엔진 repo(id 예약 / 오더북 적재)만 전용 커넥션, persister 도 풀에서 따로 전용 커넥션
+        conn = svc["engine_conn"] = pool.reserve()
+        matching_engine = MatchingEngine(OrderRepository(conn), TradeRepository(conn), account_service,
+                                         persister=EnginePersister(account_service, pool=pool))
+
+        # 주문 접수: 심볼별 bounded queue + 유저별 속도 제한 → worker 1개가 엔진 호출
+        order_service = OrderService(order_repo, trade_repo, matching_engine)
+        order_gateway = OrderGateway(order_service)
+
+    svc.update(
+        matching_engine=matching_engine,
+        order_service=order_service,
+        order_gateway=order_gateway,
+        binance_service=MarketDataService(symbol="SOLUSDT", limit=20),
+        # Binance + local 병합 오더북 (심볼별 캐시)
+        depth_aggregator=DepthAggregator(
+            order_repo, BinanceDepthService(),
+            version_fn=matching_engine.persisted_version,
+        ),
+    )
+    return svc
+
+
+def include_routers(app: FastAPI, svc: dict):
+    app.include_router(create_orderbook_router(svc["matching_engine"], svc["order_repo"]))
+    app.include_router(create_merged_orderbook_router(svc["depth_aggregator"]))
+    app.include_router(create_trade_router(svc["trade_repo"], svc["trade_service"],
+                                           svc["matching_engine"]))
+    app.include_router(create_account_router(svc["account_repo"], svc["account_service"]))
+    app.include_router(create_order_entry_router(
+        svc["order_gateway"], svc["order_service"], svc["account_repo"],
+        timeout=float(os.getenv("ORDER_TIMEOUT_SEC", "5")),
+    ))
+    app.include_router(create_admin_router(profiler, slow_log, svc.get("engine_client")))
+
+
+def warmup_tasks(svc: dict) -> dict:
+    """기동 시 병렬로 미리 채워두는 것들 (엔진 오더북 / 병합 오더북 캐시)"""
+    tasks = {}
+    engine = svc["matching_engine"]
+
+    if "engine_client" in svc:
+        tasks["engine"] = lambda: svc["engine_client"].call("ping")
+    else:
+        tasks["engine_books"] = lambda: len(warm_engine_books(engine, pool))
+
+    def depth_cache():
+        # 외부 시세 실패는 기동을 막지 않음 (요청 때 다시 조회)
+        for symbol in os.getenv("WARMUP_SYMBOLS", "SOLUSDT").split(","):
+            if symbol.strip():
+                try:
+                    svc["depth_aggregator"].get(symbol.strip())
+                except Exception as e:
+                    print("[Startup] depth warmup error:", symbol, e)
+
+    tasks["depth_cache"] = depth_cache
+    return tasks
+
+
+def start_background(svc: dict):
+    if "archive_job" in svc:
+        svc["archive_job"].start()
+    if "engine_client" not in svc:
+        svc["matching_engine"].start_ticker()      # GTT/GTD 만료
+        gateway = svc["order_gateway"]
+        if svc["order_service"].journal:
+            # 재시작 전 접수된 client_order_id 복구
+            gateway.dedup.load_journal(svc["order_service"].journal.path)
+        gateway.start()
+
+
+def start(app: FastAPI):
+    """
+    lifespan 에서 백그라운드로 실행 (liveness 는 바로 응답, 그동안 나머지 요청은 StartupGate 가 503)
+      db_pool → migrations → services → warmup → background
+    """
+    try:
+        with startup.phase("db_pool"):
+            pool.open(
+                retries=int(os.getenv("DB_CONNECT_RETRIES", "30")),
+                backoff=float(os.getenv("DB_CONNECT_BACKOFF_SEC", "1")),
+            )
+
+        with startup.phase("migrations"):
+            # 스키마 마이그레이션 (인덱스 등) — 미적용분만
+            with pool.connection() as conn:
+                apply_migrations(conn)
+
+        with startup.phase("services"):
+            svc = app.state.services = build_services()
+            include_routers(app, svc)
+
+        startup.concurrent("warmup", warmup_tasks(svc))
+
+        with startup.phase("background"):
+            start_background(svc)
+
+        startup.checks["db"] = pool.ping
+        if "engine_client" in svc:
+            client = svc["engine_client"]
+            startup.checks["engine"] = lambda: client.call("ping", timeout=1) == "pong"
+            # 재시도를 다 쓴 배치(dead letter)가 있으면 not ready
+            startup.checks["engine_persister"] = \
+                lambda: client.call("persister_stats", timeout=1)["dead_letters"] == 0
+        else:
+            startup.checks["engine_persister"] = svc["matching_engine"].persister.healthy
+        startup.done()
+    except Exception as e:
+        startup.fail(e)
+
+
+def stop(app: FastAPI):
+    svc = getattr(app.state, "services", None)
+    if svc is not None:
+        if "engine_client" in svc:
+            svc["engine_client"].close()
+        else:
+            svc["order_gateway"].stop()
+            svc["matching_engine"].stop_ticker()
+            svc["matching_engine"].persister.stop()
+            pool.release(svc["engine_conn"])
+        if "archive_job" in svc:
+            svc["archive_job"].stop()
+    pool.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    threading.Thread(target=start, args=(app,), name="api-startup", daemon=True).start()
+    yield
+    await asyncio.get_running_loop().run_in_executor(None, stop, app)
 
 
 # ----------------------------------------------------------
-# 매칭엔진 & Binance Service 준비
+# FastAPI 기본 설정
 # ----------------------------------------------------------
-matching_engine = MatchingEngine(order_repo, trade_repo, account_service)
-
-binance_service = MarketDataService(
-    symbol="SOLUSDT",
-    limit=20
+app = FastAPI(
+    title="HTS API Server",
+    description="HTS 클라이언트가 직접 호출하는 API 서버",
+    version="1.0.0",
+    lifespan=lifespan,
 )
-
-
-# ----------------------------------------------------------
-# 라우터 등록
-# ----------------------------------------------------------
-app.include_router(create_orderbook_router(matching_engine, order_repo))
-app.include_router(create_trade_router(trade_repo, trade_service))
-app.include_router(create_account_router(account_repo, account_service))
+app.add_middleware(StartupGate, startup=startup)
+app.add_middleware(SlowRequestMiddleware, slow_log=slow_log)
+app.include_router(create_health_router(startup))
 
 
 # ----------------------------------------------------------
@@ -101,11 +268,6 @@ class SignupResponse(BaseModel):
 # ----------------------------------------------------------
 # 기본 엔드포인트
 # ----------------------------------------------------------
-@app.get("/health")
-def health():
-    return {"status": "api ok"}
-
-
 @app.post("/login", response_model=Token)
 def login(form: OAuth2PasswordRequestForm = Depends()):
     user = db.verify_user(form.username, form.password)
@@ -116,6 +278,7 @@ def login(form: OAuth2PasswordRequestForm = Depends()):
     payload = {
         "user_id": user,
         "email": form.username,
+        "account_ids": db.get_account_ids_by_user(user),
         "exp": datetime.utcnow() + timedelta(hours=12)
     }
     token = jwt.encode(payload, SECRET, algorithm="HS256")
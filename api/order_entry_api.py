@@ -0,0 +1,114 @@
+# api/order_entry_api.py
+from datetime import date, datetime
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+
+from api.account_api import check_owner
+from api.auth_api import get_admin_user, get_current_user
+from services.order_gateway import OrderGateway, Overloaded
+from services.request_trace import stage
+
+
+# -----------------------------
+# Pydantic Models
+# -----------------------------
+class OrderIn(BaseModel):
+    account_id: int
+    symbol: str = Field(min_length=1)
+    side: Literal["BUY", "SELL"]
+    qty: float = Field(gt=0)
+    order_type: str = "LIMIT"            # LIMIT / MARKET / STOP / STOP_LIMIT
+    price: float | None = Field(default=None, gt=0)
+    stop_price: float | None = Field(default=None, gt=0)
+    good_till: datetime | date | None = None   # GTT 시각 / GTD 날짜
+    client_order_id: str | None = None         # 재시도 중복 방지 (계좌 단위)
+
+
+class CancelIn(BaseModel):
+    order_ids: list[int]
+
+
+# -----------------------------
+# 라우터 팩토리
+# -----------------------------
+def create_order_entry_router(gateway: OrderGateway, order_service, account_repo,
+                              timeout: float = 5.0):
+    """
+    /order            → 주문 접수 (admission control 후 OrderService)
+    /order/cancel     → 취소 (신규 주문보다 우선)
+    /order/gateway    → 큐 점유 / 제한값 / 거절 통계 (관리자)
+    잘못된 주문(수량/가격 <= 0, side, 필수 가격 누락)은 422, 과부하 시 429 + Retry-After
+    엔진이 별도 프로세스면 gateway / order_service 는 services.engine_client.RemoteGateway
+    """
+    router = APIRouter()
+
+    def wait(submit):
+        # 원격 엔진이면 과부하 거절이 Future 결과로 돌아옴
+        try:
+            with stage("engine"):
+                return submit().result(timeout)
+        except Overloaded as e:
+            raise HTTPException(
+                status_code=429, detail=e.reason,
+                headers={"Retry-After": str(max(1, round(e.retry_after)))},
+            )
+        except FutureTimeout:
+            # 큐에 들어간 요청은 취소하지 않음 (엔진이 처리하면 결과는 주문 조회로 확인)
+            raise HTTPException(status_code=504, detail="Order accepted but result timed out")
+        except ConnectionError:
+            raise HTTPException(status_code=503, detail="Matching engine unavailable")
+
+    # -------------------------------------------------------
+    # 1) 주문
+    # -------------------------------------------------------
+    @router.post("/order")
+    def place_order(body: OrderIn, user=Depends(get_current_user)):
+        # 토큰 발급 후 개설한 계좌는 DB 로 확인
+        check_owner(account_repo, user, body.account_id)
+
+        order_type = body.order_type.upper()
+        if order_type == "LIMIT":
+            if body.price is None:
+                raise HTTPException(422, "price required")
+            return wait(lambda: gateway.place_limit(
+                user.user_id, body.account_id, body.symbol, body.side,
+                body.price, body.qty, body.good_till, body.client_order_id,
+            ))
+        if order_type == "MARKET":
+            return wait(lambda: gateway.place_market(
+                user.user_id, body.account_id, body.symbol, body.side, body.qty,
+                body.client_order_id,
+            ))
+        if order_type in ("STOP", "STOP_LIMIT"):
+            if body.stop_price is None:
+                raise HTTPException(422, "stop_price required")
+            if order_type == "STOP_LIMIT" and body.price is None:
+                raise HTTPException(422, "price required")
+            price = body.price if order_type == "STOP_LIMIT" else None
+            return wait(lambda: gateway.place_stop(
+                user.user_id, body.account_id, body.symbol, body.side,
+                body.stop_price, body.qty, price, body.good_till, body.client_order_id,
+            ))
+        raise HTTPException(422, f"unknown order_type: {body.order_type}")
+
+    # -------------------------------------------------------
+    # 2) 취소
+    # -------------------------------------------------------
+    @router.post("/order/cancel")
+    def cancel_orders(body: CancelIn, user=Depends(get_current_user)):
+        ids = order_service.owned_order_ids(user.user_id, body.order_ids)
+        if not ids:
+            return {"cancelled": 0}
+        return {"cancelled": wait(lambda: gateway.cancel_orders(ids))}
+
+    # -------------------------------------------------------
+    # 3) admission control 상태
+    # -------------------------------------------------------
+    @router.get("/order/gateway")
+    def gateway_stats(admin=Depends(get_admin_user)):
+        return gateway.stats()
+
+    return router
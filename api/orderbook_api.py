@@ -1,13 +1,119 @@
 # api/orderbook_api.py
-from fastapi import APIRouter
+from fastapi import APIRouter, Header, Response
 from services.matching_engine import MatchingEngine
+from services.request_trace import stage
+from services.snapshot_cache import SnapshotCache, dumps
 from repositories.order_repository import OrderRepository
 
+# 오더북 계열 응답 bytes 캐시 (trade_api / merge_orderbook_api 와 공유)
+snapshot_cache = SnapshotCache()
+
+
+def json_response(content: bytes, headers: dict | None = None) -> Response:
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def engine_etag(kind: str, symbol: str, epoch: str, seq: int, *params) -> str:
+    """
+    엔진 seq 기반 ETag: 응답 모양을 바꾸는 파라미터(depth / since / limit) + 엔진 epoch 포함
+    (엔진이 재시작하면 seq 가 0 부터 다시 시작하므로 epoch 없이는 이전 ETag 와 겹침)
+    """
+    parts = [symbol, kind, epoch, *("" if p is None else str(p) for p in params), str(seq)]
+    return '"' + "-".join(parts) + '"'
+
+
+def clamp_delta(delta: dict, snap, depth: int | None) -> dict:
+    """
+    depth 를 지정한 클라이언트용 delta (스냅샷 + delta 로 상위 depth 레벨을 유지하는 경우)
+    - 현재 상위 depth 레벨 범위 밖의 변경은 뺌
+    - 그 side 에서 레벨이 사라졌으면 아래 레벨이 올라오므로 현재 상위 depth 레벨을 전부 같이 보냄
+    클라이언트는 적용 후 side 별 상위 depth 레벨만 남긴다. depth=None(전체) 이면 그대로
+    """
+    if depth is None:
+        return delta
+
+    out = []
+    for side, top in (("BUY", snap.bids[:depth]), ("SELL", snap.asks[:depth])):
+        changes = [d for d in delta["deltas"] if d["side"] == side]
+        kept = changes
+        if len(top) == depth:
+            worst = top[-1][0]
+            if side == "BUY":
+                kept = [d for d in changes if d["price"] >= worst]
+            else:
+                kept = [d for d in changes if d["price"] <= worst]
+        if any(d["cnt"] == 0 for d in changes):
+            sent = {d["price"] for d in kept}
+            kept += [{"side": side, "price": p, "qty": q, "cnt": c}
+                     for p, q, c in top if p not in sent]
+        out += kept
+    return {**delta, "deltas": out}
+
+
+def engine_book_response(matching: MatchingEngine, symbol: str, depth: int | None,
+                         since: int | None, if_none_match: str | None) -> Response:
+    """
+    엔진 오더북 응답 (seq 기반)
+    - ETag = 엔진 epoch + depth + since + 심볼 seq → 변경 없으면 304
+    - depth 미지정이면 전체 레벨
+    - since=<seq> 이면 그 이후 레벨 변경분만 (ring buffer 밖이면 전체 스냅샷)
+      depth 를 주면 상위 depth 레벨 기준으로 잘라서 (clamp_delta)
+    - 전체 스냅샷은 seq 단위로 직렬화 bytes 를 재사용
+    - 엔진이 publish 한 불변 스냅샷 하나로 ETag / delta / 본문을 맞춤 (락 없음)
+    """
+    with stage("snapshot"):
+        snap = matching.snapshot(symbol, depth)
+    seq = snap.seq
+    epoch = matching.epoch
+    etag = engine_etag("book", symbol, epoch, seq, depth, since)
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    if since is not None:
+        delta = matching.depth_since(symbol, since, seq)
+        if delta is not None:
+            return json_response(
+                dumps({"symbol": symbol, "snapshot": False, **clamp_delta(delta, snap, depth)}),
+                {"ETag": etag},
+            )
+
+    with stage("serialize"):
+        body = snapshot_cache.get(
+            "orderbook", symbol, depth, (epoch, seq),
+            lambda: {"symbol": symbol, "snapshot": True, **matching.depth(symbol, depth, snap)},
+        )
+    return json_response(body, {"ETag": etag})
+
+
+def local_book_response(matching: MatchingEngine, order_repo: OrderRepository,
+                        symbol: str, depth: int | None) -> Response:
+    """book_levels 기반 오더북 (DB 커밋 버전 단위로 bytes 재사용)"""
+
+    def build():
+        bids = []
+        asks = []
+
+        for r in order_repo.get_grouped_orderbook(symbol, depth):
+            entry = {"price": float(r["price"]), "qty": float(r["qty"]), "cnt": int(r["cnt"])}
+
+            if r["side"].upper() == "BUY":
+                bids.append(entry)
+            else:
+                asks.append(entry)
+
+        # book_levels 조회가 이미 side 별 가격 우선순위 순서
+        return {"bids": bids, "asks": asks}
+
+    version = matching.persisted_version(symbol)
+    return json_response(snapshot_cache.get("local", symbol, depth, version, build))
+
 
 def create_orderbook_router(matching: MatchingEngine, order_repo: OrderRepository):
     """
-    /orderbook          → 매칭엔진(MEMORY orderbook)
+    /orderbook          → 매칭엔진(MEMORY orderbook), ETag / since=<seq> delta
+                          depth 미지정 = 전체 레벨, depth=N 이면 상위 N 레벨 (delta 도 그 범위로)
     /orderbook/local    → DB 기반(order 테이블) qty/cnt 집계
+    /ticker             → 최우선 호가 / mid / spread / 최근 체결가
     """
     router = APIRouter()
 
@@ -15,65 +121,27 @@ def create_orderbook_router(matching: MatchingEngine, order_repo: OrderRepositor
     # 1) 메모리 기반 오더북 (Matching Engine)
     # ----------------------------------------------------------
     @router.get("/orderbook")
-    def get_orderbook(symbol: str):
+    def get_orderbook(symbol: str,
+                      depth: int | None = None, since: int | None = None,
+                      if_none_match: str | None = Header(None)):
         symbol = symbol.upper()
-        ob = matching.orderbook
-
-        result = {"bids": [], "asks": []}
-
-        def group_book(book):
-            grouped = {}
-            for o in book:
-                if o["symbol"].upper() != symbol:
-                    continue
-                px = o["price"]
-                if px not in grouped:
-                    grouped[px] = {"qty": 0, "cnt": 0}
-                grouped[px]["qty"] += o["remaining_qty"]
-                grouped[px]["cnt"] += 1
-            return grouped
-
-        bids = group_book(ob["bids"])
-        asks = group_book(ob["asks"])
-
-        result["bids"] = sorted(
-            [{"price": p, **v} for p, v in bids.items()],
-            key=lambda x: -x["price"]
-        )
-        result["asks"] = sorted(
-            [{"price": p, **v} for p, v in asks.items()],
-            key=lambda x: x["price"]
-        )
-
-        return result
+        # 엔진이 유지하는 가격 레벨 집계를 그대로 사용
+        return engine_book_response(matching, symbol, depth, since, if_none_match)
 
     # ----------------------------------------------------------
     # 2) DB 기반 오더북 (order 테이블)
     # ----------------------------------------------------------
     @router.get("/orderbook/local")
-    def get_local_orderbook(symbol: str):
+    def get_local_orderbook(symbol: str, depth: int | None = None):
         symbol = symbol.upper()
-        rows = order_repo.get_grouped_orderbook(symbol)
-
-        bids = []
-        asks = []
+        return local_book_response(matching, order_repo, symbol, depth)
 
-        for r in rows:
-            side = r["side"].upper()
-            px = float(r["price"])
-            qty = float(r["qty"])
-            cnt = int(r["cnt"])
-
-            entry = {"price": px, "qty": qty, "cnt": cnt}
-
-            if side == "BUY":
-                bids.append(entry)
-            else:
-                asks.append(entry)
-
-        bids.sort(key=lambda x: -x["price"])
-        asks.sort(key=lambda x: x["price"])
-
-        return {"bids": bids, "asks": asks}
+    # ----------------------------------------------------------
+    # 3) 티커 (엔진 스냅샷 최상위 레벨, 원격 엔진이면 공유메모리에서)
+    # ----------------------------------------------------------
+    @router.get("/ticker")
+    def get_ticker(symbol: str):
+        symbol = symbol.upper()
+        return json_response(dumps({"symbol": symbol, **matching.ticker(symbol)}))
 
     return router
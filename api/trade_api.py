@@ -1,12 +1,23 @@
 # api/trade_api.py
-from fastapi import APIRouter, Depends
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, Header, Response
 from pydantic import BaseModel
 from api.auth_api import get_current_user
+from api.orderbook_api import engine_etag, json_response, snapshot_cache
+from services.matching_engine import MatchingEngine
+from services.snapshot_cache import dumps
 from services.trade_service import TradeService
 from repositories.trade_repositories import TradeRepository
 
 
-def create_trade_router(trade_repo: TradeRepository, trade_service: TradeService):
+def create_trade_router(trade_repo: TradeRepository, trade_service: TradeService,
+                        matching: MatchingEngine):
+    """
+    /trades/insert  → 체결 INSERT
+    /trades/my      → 내 체결 (DB)
+    /trades/recent  → 엔진 메모리 체결 tape (DB 조회 없음), ETag / since=<seq>
+    """
     router = APIRouter()
 
     # ----------------------------
@@ -33,10 +44,42 @@ def create_trade_router(trade_repo: TradeRepository, trade_service: TradeService
 
     # ----------------------------
     # 2) 내 체결 조회
+    #  days: 최근 N일만 (지정 시 해당 월 파티션만 스캔)
     # ----------------------------
     @router.get("/trades/my")
-    def get_my_trades(limit: int = 100, current_user=Depends(get_current_user)):
+    def get_my_trades(limit: int = 100, days: int | None = None, current_user=Depends(get_current_user)):
         user_id = current_user.user_id
-        return trade_repo.get_trades_by_user(user_id, limit)
+        since = datetime.now(timezone.utc) - timedelta(days=days) if days else None
+        return trade_repo.get_trades_by_user(user_id, limit, since)
+
+    # ----------------------------
+    # 3) 최근 체결 (공개 tape)
+    # ----------------------------
+    @router.get("/trades/recent")
+    def get_recent_trades(symbol: str, limit: int = 50, since: int = 0,
+                          if_none_match: str | None = Header(None)):
+        symbol = symbol.upper()
+        limit = max(1, min(limit, 1000))
+        seq, trades = matching.recent_trades(symbol, limit, since)
+        epoch = matching.epoch
+
+        etag = engine_etag("trades", symbol, epoch, seq, limit, since)
+        if if_none_match == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+
+        def build():
+            return {
+                "symbol": symbol,
+                "seq": seq,
+                "trades": [
+                    {"seq": s, "time": ts, "price": p, "qty": q, "side": side}
+                    for s, ts, p, q, side in trades
+                ],
+            }
+
+        # 전체 polling 은 seq / limit 단위로 직렬화 bytes 재사용, since 증분은 클라이언트마다 달라서 바로 직렬화
+        if since:
+            return json_response(dumps(build()), {"ETag": etag})
+        return json_response(snapshot_cache.get("trades", symbol, limit, (epoch, seq), build), {"ETag": etag})
 
     return router
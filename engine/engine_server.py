@@ -0,0 +1,288 @@
+# engine/engine_server.py
+"""
+매칭엔진 단독 프로세스 (API 워커들이 공유하는 단일 오더북)
+
+API 는 services/engine_client.py 로 접속 (ENGINE_URL=unix:///... 또는 tcp://host:port)
+프레이밍은 services/engine_protocol.py 참고
+
+실행:
+    ENGINE_LISTEN=tcp://0.0.0.0:9100 python -m engine.engine_server
+    ENGINE_LISTEN=unix:///tmp/engine.sock python -m engine.engine_server
+"""
+import os
+import socket
+import socketserver
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from services.engine_protocol import (
+    ERROR, EVENT, REQUEST, RESULT, encode_frame, parse_address, read_frame,
+)
+from services.order_gateway import Overloaded
+from services.profiler import SamplingProfiler
+
+
+class EngineServer:
+    """
+    연결마다 스레드 1개가 요청 frame 을 읽어 dispatch
+    - 주문/취소는 OrderGateway 로 넘기고 Future 가 끝날 때 응답 (응답 순서는 완료 순)
+    - 조회는 엔진 불변 스냅샷을 바로 읽어서 응답
+      DB 조회 / 엔진 락이 필요한 조회는 readers 스레드풀에서 (연결 읽기 루프를 막지 않도록, Future)
+    - 체결로 바뀐 계좌는 모든 연결에 EVENT("accounts") push → API 워커 계좌 캐시 무효화
+    """
+
+    def __init__(self, engine, order_service, gateway, listen: str | None = None, pool=None):
+        self.engine = engine
+        self.order_service = order_service
+        self.gateway = gateway
+        self.pool = pool
+        self.listen = listen or os.getenv("ENGINE_LISTEN", "tcp://0.0.0.0:9100")
+        self.profiler = SamplingProfiler()
+        self.readers = ThreadPoolExecutor(
+            max_workers=int(os.getenv("ENGINE_READ_WORKERS", "4")), thread_name_prefix="engine-read",
+        )
+
+        self.methods = {
+            # 접수 (Future)
+            "place_limit": gateway.place_limit,
+            "place_market": gateway.place_market,
+            "place_stop": gateway.place_stop,
+            "cancel_orders": gateway.cancel_orders,
+            # 조회 (DB 조회가 섞이므로 Future)
+            "owned_order_ids": lambda user_id, order_ids:
+                self.readers.submit(order_service.owned_order_ids, user_id, order_ids),
+            # 조회 (즉시, 전체 레벨 스냅샷만 Future)
+            "snapshot": self._snapshot,
+            "depth_since": engine.depth_since,
+            "book_seq": engine.book_seq,
+            "ticker": engine.ticker,
+            "recent_trades": engine.recent_trades,
+            "persisted_version": engine.persisted_version,
+            "epoch": lambda: engine.epoch,
+            "gateway_stats": gateway.stats,
+            # 단일가 재교차 (engine/matching_http_server.py /match/symbol)
+            "match_symbol": self._match_symbol,
+            "persister_stats": engine.persister.stats,
+            # 운영 (API /admin/profile?target=engine)
+            "profile": self._profile,
+            "ping": lambda: "pong",
+        }
+
+        self.connections = 0
+        self._server = None
+        self._senders = set()
+        self._senders_lock = threading.Lock()
+
+        # persister 커밋 후 무효화 → 접속한 API 워커 전부에
+        engine.account_service.listeners.append(
+            lambda keys: self.broadcast("accounts", [list(k) for k in keys])
+        )
+
+    # ---------------------------------------------------------
+    # 요청 1건 처리
+    # ---------------------------------------------------------
+    def dispatch(self, req_id: int, request, send):
+        try:
+            method, args = request
+            fn = self.methods[method]
+            result = fn(*args)
+        except Exception as e:
+            send(req_id, ERROR, self._error(e))
+            return
+
+        if not isinstance(result, Future):
+            send(req_id, RESULT, result)
+            return
+
+        def done(f):
+            err = f.exception()
+            if err is not None:
+                send(req_id, ERROR, self._error(err))
+            else:
+                send(req_id, RESULT, f.result())
+
+        result.add_done_callback(done)
+
+    def _snapshot(self, symbol, n=None):
+        """publish 된 스냅샷 범위면 바로, 전체/더 깊은 조회는 엔진 락이 필요하므로 readers 에서"""
+        if n is not None and n <= self.engine.snapshot_depth:
+            return tuple(self.engine.snapshot(symbol, n))
+        return self.readers.submit(lambda: tuple(self.engine.snapshot(symbol, n)))
+
+    def _profile(self, seconds, interval_ms=None, thread=None, idle=False) -> Future:
+        """샘플링은 별도 스레드에서 (연결 읽기 루프를 막지 않도록)"""
+        fut = Future()
+
+        def run():
+            try:
+                result = self.profiler.run(seconds, interval_ms, thread, idle)
+                fut.set_result({**result, "counts": dict(result["counts"])})
+            except Exception as e:
+                fut.set_exception(e)
+
+        threading.Thread(target=run, name="engine-profile", daemon=True).start()
+        return fut
+
+    def _match_symbol(self, symbol, reference_price=None, reload=False) -> Future:
+        """
+        엔진에 없는 심볼(또는 reload)이면 DB 미체결 주문으로 적재 후 단일가 재교차
+        reload 는 DB 가 엔진을 따라잡았을 때만 (반영 대기 중인 배치가 있으면 메모리 주문을 잃음)
+        """
+        from services.startup import warm_engine_books
+
+        symbol = symbol.upper()
+        fut = Future()
+
+        def run():
+            try:
+                if reload or symbol not in self.engine.books:
+                    p = self.engine.persister.stats()
+                    if reload and (p["pending_rows"] or p["retrying"]):
+                        raise RuntimeError("persister has pending writes, retry reload later")
+                    warm_engine_books(self.engine, self.pool, [symbol])
+                fut.set_result({"symbol": symbol, **self.engine.match_symbol(symbol, reference_price)})
+            except Exception as e:
+                fut.set_exception(e)
+
+        threading.Thread(target=run, name="engine-match-symbol", daemon=True).start()
+        return fut
+
+    @staticmethod
+    def _error(e: Exception) -> list:
+        return [type(e).__name__, str(e), e.retry_after if isinstance(e, Overloaded) else None]
+
+    # ---------------------------------------------------------
+    # 소켓 서버
+    # ---------------------------------------------------------
+    def _handler(self):
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def setup(self):
+                super().setup()
+                if self.connection.family == socket.AF_INET:
+                    self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self._send_lock = threading.Lock()
+                server.connections += 1
+                with server._senders_lock:
+                    server._senders.add(self.send)
+
+            def finish(self):
+                with server._senders_lock:
+                    server._senders.discard(self.send)
+                server.connections -= 1
+                super().finish()
+
+            def send(self, req_id, kind, obj):
+                try:
+                    frame = encode_frame(req_id, kind, obj)
+                except Exception as e:
+                    frame = encode_frame(req_id, ERROR, ["EncodeError", str(e), None])
+                with self._send_lock:
+                    try:
+                        self.connection.sendall(frame)
+                    except OSError:
+                        pass   # 클라이언트가 끊김 → 읽기 루프에서 종료
+
+            def handle(self):
+                while True:
+                    try:
+                        frame = read_frame(self.rfile)
+                    except (OSError, ValueError) as e:
+                        print("[EngineServer] read error:", e)
+                        return
+                    if frame is None:
+                        return
+                    req_id, kind, obj = frame
+                    if kind == REQUEST:
+                        server.dispatch(req_id, obj, self.send)
+
+        return Handler
+
+    def broadcast(self, event: str, payload):
+        """모든 연결에 EVENT frame (끊긴 연결은 send 에서 무시)"""
+        with self._senders_lock:
+            senders = list(self._senders)
+        for send in senders:
+            send(0, EVENT, [event, payload])
+
+    def serve_forever(self):
+        family, address = parse_address(self.listen)
+        if family == socket.AF_UNIX:
+            if os.path.exists(address):
+                os.unlink(address)
+            server_cls = socketserver.ThreadingUnixStreamServer
+        else:
+            server_cls = socketserver.ThreadingTCPServer
+
+        server_cls.daemon_threads = True
+        server_cls.allow_reuse_address = True
+        self._server = server_cls(address, self._handler())
+        print(f"[EngineServer] listening on {self.listen}")
+        self._server.serve_forever()
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        self.readers.shutdown(wait=False)
+
+
+# ---------------------------------------------------------
+# 실행 (DB / 엔진 / 접수 게이트웨이 구성)
+# ---------------------------------------------------------
+def main():
+    from repositories.account_repository import AccountRepository
+    from repositories.order_repository import OrderRepository
+    from repositories.trade_repositories import TradeRepository
+    from services.account_service import AccountService
+    from services.db_migrations import apply_migrations
+    from services.db_pool import DBPool
+    from services.engine_persister import EnginePersister
+    from services.matching_engine import MatchingEngine
+    from services.order_gateway import OrderGateway
+    from services.order_service import OrderService
+    from services.startup import Startup, warm_engine_books
+
+    startup = Startup()
+    pool = DBPool()
+
+    with startup.phase("db_pool"):
+        pool.open(retries=int(os.getenv("DB_CONNECT_RETRIES", "30")))
+        conn = pool.reserve()
+
+    with startup.phase("migrations"):
+        apply_migrations(conn)
+
+    with startup.phase("services"):
+        # 전용 커넥션은 엔진 repo(id 예약 / 오더북 적재)만, RPC 조회는 호출마다 풀에서
+        account_service = AccountService(pool.repo(AccountRepository))
+
+        # persister 는 전용 커넥션 (엔진 커넥션의 커밋과 섞이지 않도록)
+        engine = MatchingEngine(OrderRepository(conn), TradeRepository(conn), account_service,
+                                persister=EnginePersister(account_service, pool=pool))
+        order_service = OrderService(pool.repo(OrderRepository), pool.repo(TradeRepository), engine)
+        gateway = OrderGateway(order_service)
+
+    # DB 미체결 주문으로 오더북 복구 (심볼별 병렬 조회)
+    with startup.phase("warmup.engine_books"):
+        warm_engine_books(engine, pool)
+
+    engine.start_ticker()
+    if order_service.journal:
+        gateway.dedup.load_journal(order_service.journal.path)
+    gateway.start()
+    startup.done()
+
+    try:
+        EngineServer(engine, order_service, gateway, pool=pool).serve_forever()
+    finally:
+        gateway.stop()
+        engine.stop_ticker()
+        engine.persister.stop()
+        pool.release(conn)
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,8 @@ from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 
 from services.db_matching import MatchingDB
-from services.matching_engine import MatchingEngine
+from services.db_migrations import apply_migrations
+from services.engine_client import EngineClient, RemoteEngine
 
 app = FastAPI()
 
@@ -15,7 +16,11 @@ db = MatchingDB(
     password=os.getenv("DB_PASSWORD", "myhts_pw"),
     port=int(os.getenv("DB_PORT", "5432")),
 )
-engine = MatchingEngine(db)
+apply_migrations(db.conn)
+
+# 엔진은 engine/engine_server.py 하나만 (여기서 엔진을 따로 띄우면 같은 주문을 두 엔진이 체결)
+engine_client = EngineClient(os.getenv("ENGINE_URL"))
+engine = RemoteEngine(engine_client)
 
 class LoginRequest(BaseModel):
     email: str
@@ -44,13 +49,20 @@ def login(req: LoginRequest):
 
 class MatchRequest(BaseModel):
     symbol: str
+    reference_price: float | None = None
+    reload: bool = False
 
 
 @app.post("/match/symbol")
 def match_symbol(req: MatchRequest):
-    sym = req.symbol.upper()
-    engine.match_symbol(sym)
-    return {"ok": True, "symbol": sym}
+    """
+    심볼 미체결 주문 단일가 재교차 (장 시작 / 거래 정지 해제 후)
+    - 엔진 서버 RPC 로 실행 (엔진에 처음 올라오는 심볼 또는 reload 면 엔진이 DB 에서 적재)
+    - 이후에는 엔진 메모리 오더북이 기준 (DB 는 배치로 따라옴)
+    """
+    result = engine_client.call("match_symbol", req.symbol, req.reference_price, req.reload,
+                                timeout=60)
+    return {"ok": True, **result}
 
 
 @app.get("/health")
@@ -0,0 +1,297 @@
+# engine/replay.py
+"""
+기록된 주문 흐름을 MatchingEngine 에 그대로 다시 흘려보내는 오프라인 리플레이
+
+입력
+  - 주문 저널 JSONL (services/order_journal.py 형식)
+  - orders 테이블 CSV export (id,user_id,account_id,symbol,side,price,quantity,status,created_at[,updated_at])
+    → created_at 에 신규 주문, status=CANCELLED 면 updated_at 에 취소
+
+DB 없이 돌도록 persistence 는 row 수만 세는 메모리 repo 를 쓰고, 리스크 체크는 끈다.
+결과(체결 목록 + 최종 오더북)를 golden 파일과 비교하고 처리량을 출력한다.
+
+사용 예:
+    python -m engine.replay flow.jsonl                       # 최대 속도
+    python -m engine.replay flow.jsonl --realtime --speed 10 # 원래 간격의 1/10
+    python -m engine.replay orders.csv --write-golden g.json
+    python -m engine.replay flow.jsonl --golden g.json       # 불일치 시 exit 1
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from datetime import datetime, timezone
+
+from services.engine_persister import EnginePersister
+from services.matching_engine import MatchingEngine
+from services.order_journal import read_events
+from services.timer_wheel import TimerWheel
+
+
+# ---------------------------------------------------------
+# DB 대신 쓰는 메모리 repo (엔진 배치 row 수만 집계)
+# ---------------------------------------------------------
+class _NullConn:
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+class ReplayRepository:
+    """order_repo / trade_repo / account_repo 겸용"""
+
+    def __init__(self):
+        self.conn = _NullConn()
+        self.rows = {"orders": 0, "order_updates": 0, "trades": 0, "levels": 0}
+        self._next_id = 0
+        self._next_trade_id = 0
+
+    def reserve_order_ids(self, count: int):
+        ids = list(range(self._next_id + 1, self._next_id + count + 1))
+        self._next_id += count
+        return ids
+
+    def reserve_trade_ids(self, count: int):
+        ids = list(range(self._next_trade_id + 1, self._next_trade_id + count + 1))
+        self._next_trade_id += count
+        return ids
+
+    def insert_orders(self, rows):
+        self.rows["orders"] += len(rows)
+        return [r[0] for r in rows]
+
+    copy_orders = insert_orders
+
+    def update_orders(self, rows):
+        self.rows["order_updates"] += len(rows)
+        return len(rows)
+
+    merge_order_states = update_orders
+
+    def insert_trades(self, rows):
+        self.rows["trades"] += len(rows)
+        return [r[0] for r in rows]
+
+    copy_trades = insert_trades
+
+    def apply_level_deltas(self, rows):
+        self.rows["levels"] += len(rows)
+
+    def apply_fill_legs(self, legs, commit=True):
+        return {}
+
+
+class ReplayAccountService:
+    def invalidate_nets(self, nets):
+        pass
+
+
+# ---------------------------------------------------------
+# 입력 로딩
+# ---------------------------------------------------------
+def _ts(value) -> float:
+    if value in (None, ""):
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+
+
+def load_events(path: str) -> list[dict]:
+    if path.endswith(".csv"):
+        return _events_from_orders_csv(path)
+
+    events = list(read_events(path))
+    for e in events:
+        e["ts"] = _ts(e.get("ts"))
+    return events
+
+
+def _events_from_orders_csv(path: str) -> list[dict]:
+    events = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for r in csv.DictReader(f):
+            price = float(r["price"] or 0)
+            events.append({
+                "ts": _ts(r["created_at"]),
+                "type": "limit" if price > 0 else "market",
+                "order_id": int(r["id"]),
+                "user_id": int(r["user_id"]),
+                "account_id": int(r["account_id"]),
+                "symbol": r["symbol"],
+                "side": r["side"],
+                "price": price,
+                "qty": float(r["quantity"]),
+            })
+            if r.get("status") == "CANCELLED" and price > 0:
+                events.append({
+                    "ts": _ts(r.get("updated_at") or r["created_at"]),
+                    "type": "cancel",
+                    "order_ids": [int(r["id"])],
+                })
+
+    # 같은 시각이면 입력 순서 유지 (sort 는 stable)
+    events.sort(key=lambda e: e["ts"])
+    return events
+
+
+# ---------------------------------------------------------
+# 리플레이
+# ---------------------------------------------------------
+def build_engine() -> tuple[MatchingEngine, ReplayRepository]:
+    repo = ReplayRepository()
+    accounts = ReplayAccountService()
+    persister = EnginePersister(accounts, repos=(repo, repo, repo), async_mode=False)
+    engine = MatchingEngine(repo, repo, accounts, persister=persister)
+    engine.risk.enabled = False
+    return engine, repo
+
+
+def replay(events: list[dict], realtime: bool = False, speed: float = 1.0) -> dict:
+    engine, repo = build_engine()
+
+    fills = []
+    latencies = []
+    base_ts = events[0]["ts"] if events else 0.0
+    started = time.perf_counter()
+
+    # 만료 타이머는 벽시계 대신 기록 시각으로 진행
+    engine.timers = TimerWheel(tick_ms=engine.timers.tick_ms, start_ms=int(base_ts * 1000))
+
+    for e in events:
+        if realtime:
+            wait = (e["ts"] - base_ts) / speed - (time.perf_counter() - started)
+            if wait > 0:
+                time.sleep(wait)
+
+        t0 = time.perf_counter_ns()
+
+        engine.expire_due(int(e["ts"] * 1000))
+
+        if e["type"] == "cancel":
+            engine.cancel_orders(e["order_ids"])
+        else:
+            is_stop = e["type"] == "stop"
+            order = engine.create_order(
+                e["user_id"], e["account_id"], e["symbol"], e["side"],
+                e.get("price") or 0.0, e["qty"],
+                order_type=("STOP_LIMIT" if e.get("price") else "STOP") if is_stop else "LIMIT",
+                stop_price=e.get("stop_price") if is_stop else None,
+                expire_at=(datetime.fromtimestamp(e["expire_at"], timezone.utc)
+                           if e.get("expire_at") else None),
+            )
+            if e.get("order_id") is not None:
+                order["id"] = e["order_id"]
+
+            if is_stop:
+                fills += engine.process_stop_order(order, is_new=True)
+            elif e["type"] == "market":
+                fills += engine.process_market_order(order, is_new=True)
+            else:
+                fills += engine.process_limit_order(order, is_new=True)
+
+        latencies.append(time.perf_counter_ns() - t0)
+
+    elapsed = time.perf_counter() - started
+
+    return {
+        "result": {
+            "fills": [_normalize(f) for f in fills],
+            "book": {
+                symbol: _normalize({"bids": book.depth("BUY"), "asks": book.depth("SELL")})
+                for symbol, book in sorted(engine.books.items())
+            },
+        },
+        "stats": _stats(len(events), len(fills), elapsed, latencies, repo.rows),
+    }
+
+
+def _normalize(obj):
+    """golden 비교용 (float 오차 제거, seq 제외)"""
+    if isinstance(obj, float):
+        return round(obj, 10)
+    if isinstance(obj, dict):
+        return {k: _normalize(v) for k, v in obj.items() if k != "seq"}
+    if isinstance(obj, list):
+        return [_normalize(v) for v in obj]
+    return obj
+
+
+def _stats(n_events, n_fills, elapsed, latencies, rows) -> dict:
+    lat = sorted(latencies)
+
+    def pct(p):
+        return lat[min(len(lat) - 1, int(len(lat) * p))] / 1000 if lat else 0.0
+
+    return {
+        "events": n_events,
+        "fills": n_fills,
+        "elapsed_sec": round(elapsed, 3),
+        "events_per_sec": round(n_events / elapsed, 1) if elapsed > 0 else 0.0,
+        "latency_us": {"p50": pct(0.50), "p99": pct(0.99), "max": pct(1.0)},
+        "persist_rows": rows,
+    }
+
+
+def diff_golden(result: dict, golden: dict) -> list[str]:
+    problems = []
+
+    a, b = result["fills"], golden.get("fills", [])
+    if len(a) != len(b):
+        problems.append(f"fill count {len(a)} != golden {len(b)}")
+    for i, (x, y) in enumerate(zip(a, b)):
+        if x != y:
+            problems.append(f"fill #{i}: {x} != golden {y}")
+            break
+
+    for symbol in sorted(set(result["book"]) | set(golden.get("book", {}))):
+        x = result["book"].get(symbol, {"bids": [], "asks": []})
+        y = golden.get("book", {}).get(symbol, {"bids": [], "asks": []})
+        if x != y:
+            problems.append(f"book {symbol} differs from golden")
+
+    return problems
+
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="MatchingEngine order flow replay")
+    p.add_argument("input", help="주문 저널 JSONL 또는 orders CSV export")
+    p.add_argument("--realtime", action="store_true", help="기록된 시각 간격대로 재생")
+    p.add_argument("--speed", type=float, default=1.0, help="--realtime 배속")
+    p.add_argument("--golden", help="비교할 golden 결과 JSON")
+    p.add_argument("--write-golden", help="결과를 golden 으로 저장")
+    args = p.parse_args(argv)
+
+    events = load_events(args.input)
+    out = replay(events, realtime=args.realtime, speed=args.speed)
+
+    print(json.dumps(out["stats"], indent=2))
+
+    if args.write_golden:
+        with open(args.write_golden, "w", encoding="utf-8") as f:
+            json.dump(out["result"], f, indent=1)
+        print(f"[replay] golden written: {args.write_golden}")
+
+    if args.golden:
+        with open(args.golden, encoding="utf-8") as f:
+            problems = diff_golden(out["result"], json.load(f))
+        if problems:
+            for msg in problems:
+                print("[replay] MISMATCH", msg)
+            return 1
+        print("[replay] golden OK")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+# loadtest/__init__.py
+"""
+API 서버 HTTP 부하 테스트 (python -m loadtest --help)
+
+- 대상: 실행 중인 서버(--base-url) 또는 api.main:app 을 같은 프로세스에서 ASGI transport 로
+- 시나리오: loadtest/scenarios.py (로그인 / 지정가·시장가 주문 / 취소 / 오더북·체결 tape polling / 체결·계좌 조회)
+- open-loop 도착률(--rate) + 가상 유저 수(--users)
+- 엔드포인트별 처리량 / 지연 백분위, baseline 저장 후 릴리스 간 비교
+"""
@@ -0,0 +1,98 @@
+# loadtest/__main__.py
+"""
+사용 예:
+    python -m loadtest --scenario mixed --users 50 --rate 200 --duration 30
+    python -m loadtest --base-url http://localhost:9000 --scenario order_storm --rate 500 \
+        --users-file users.csv --save-baseline baseline.json
+    python -m loadtest --base-url http://localhost:9000 --compare baseline.json   # 회귀 시 exit 1
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from loadtest.runner import LoadTest, make_users, open_client, prepare_users
+from loadtest.scenarios import SCENARIOS, Context
+from loadtest.stats import compare, format_compare, format_report, load_baseline, save_baseline
+
+
+def parse_weights(scenario: str) -> dict:
+    """시나리오 이름 또는 "orderbook=5,limit_order=2" 형식"""
+    if scenario in SCENARIOS:
+        return SCENARIOS[scenario]
+    weights = {}
+    for part in scenario.split(","):
+        name, _, w = part.partition("=")
+        weights[name.strip()] = float(w or 1)
+    return weights
+
+
+async def run(args) -> dict:
+    weights = parse_weights(args.scenario)
+    ctx = Context(args.symbol, args.price, args.spread, args.qty, seed=args.seed)
+
+    async with open_client(args.base_url, timeout=args.timeout) as client:
+        users = await prepare_users(
+            client, make_users(args.users, args.users_file), create=args.signup,
+        )
+        if not users:
+            raise SystemExit("[loadtest] no user could log in (use --signup or --users-file)")
+        print(f"[loadtest] {len(users)} users ready, scenario={args.scenario} "
+              f"rate={args.rate}/s duration={args.duration}s")
+
+        test = LoadTest(
+            client, users, weights, ctx,
+            rate=args.rate, duration=args.duration, arrival=args.arrival,
+            max_in_flight=args.max_in_flight, warmup=args.warmup, seed=args.seed,
+        )
+        return await test.run()
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="API HTTP load test")
+    p.add_argument("--base-url", help="실행 중인 서버 (없으면 api.main:app 을 in-process 로)")
+    p.add_argument("--scenario", default="mixed",
+                   help=f"{', '.join(SCENARIOS)} 또는 action=weight,...")
+    p.add_argument("--users", type=int, default=20, help="가상 유저 수")
+    p.add_argument("--users-file", help="email,password 목록 (잔고 있는 계정)")
+    p.add_argument("--signup", action="store_true", help="가상 유저 가입 + 계좌 개설")
+    p.add_argument("--rate", type=float, default=100.0, help="도착률 (req/s, open-loop)")
+    p.add_argument("--arrival", choices=("poisson", "constant"), default="poisson")
+    p.add_argument("--duration", type=float, default=30.0, help="측정 구간 (초)")
+    p.add_argument("--warmup", type=float, default=5.0, help="통계에서 뺄 앞 구간 (초)")
+    p.add_argument("--max-in-flight", type=int, default=1000)
+    p.add_argument("--timeout", type=float, default=30.0)
+    p.add_argument("--symbol", default="SOLUSDT")
+    p.add_argument("--price", type=float, default=100.0, help="주문 기준가")
+    p.add_argument("--spread", type=float, default=0.01, help="기준가 대비 지정가 범위")
+    p.add_argument("--qty", type=float, default=0.1)
+    p.add_argument("--seed", type=int)
+    p.add_argument("--json", help="결과 JSON 저장")
+    p.add_argument("--save-baseline", help="결과를 baseline 으로 저장")
+    p.add_argument("--compare", help="비교할 baseline JSON")
+    p.add_argument("--tolerance", type=float, default=0.2, help="회귀 판정 변화율")
+    args = p.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    print(format_report(report))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+
+    meta = {k: getattr(args, k) for k in
+            ("base_url", "scenario", "users", "rate", "arrival", "duration", "symbol")}
+    if args.save_baseline:
+        save_baseline(args.save_baseline, report, meta)
+        print(f"[loadtest] baseline written: {args.save_baseline}")
+
+    if args.compare:
+        rows = compare(report, load_baseline(args.compare), args.tolerance)
+        print(format_compare(rows))
+        if any(r["regressed"] for r in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+# loadtest/runner.py
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+
+from loadtest.scenarios import Context, VirtualUser, ensure_account, login, pick, signup
+from loadtest.stats import Recorder
+
+
+# ---------------------------------------------------------
+# 대상 클라이언트
+# ---------------------------------------------------------
+@asynccontextmanager
+async def run_lifespan(app):
+    """ASGI lifespan startup / shutdown 직접 구동 (httpx ASGITransport 는 lifespan 을 안 돌림)"""
+    to_app = asyncio.Queue()
+    from_app = asyncio.Queue()
+    task = asyncio.create_task(app({"type": "lifespan", "asgi": {"version": "3.0"}},
+                                   to_app.get, from_app.put))
+
+    await to_app.put({"type": "lifespan.startup"})
+    msg = await from_app.get()
+    if msg["type"] != "lifespan.startup.complete":
+        raise RuntimeError(f"lifespan startup failed: {msg.get('message')}")
+    try:
+        yield
+    finally:
+        await to_app.put({"type": "lifespan.shutdown"})
+        await from_app.get()
+        await task
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float = 120.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            r = await client.get("/health/ready")
+            if r.status_code == 200:
+                return
+            body = r.json()
+            if body.get("status") == "failed":
+                raise RuntimeError(f"server startup failed: {body}")
+        except httpx.TransportError:
+            pass
+        if time.monotonic() > deadline:
+            raise TimeoutError("server not ready")
+        await asyncio.sleep(0.5)
+
+
+@asynccontextmanager
+async def open_client(base_url: str | None = None, timeout: float = 30.0,
+                      max_connections: int = 1000):
+    """
+    base_url 이 있으면 실행 중인 서버로, 없으면 api.main:app 을 이 프로세스 안에서 (ASGI transport)
+    """
+    if base_url:
+        limits = httpx.Limits(max_connections=max_connections,
+                              max_keepalive_connections=max_connections)
+        async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+            await wait_ready(client)
+            yield client
+        return
+
+    from api.main import app
+
+    async with run_lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest",
+                                     timeout=timeout) as client:
+            await wait_ready(client)
+            yield client
+
+
+# ---------------------------------------------------------
+# 가상 유저 준비
+# ---------------------------------------------------------
+def make_users(n: int, users_file: str | None = None, prefix: str = "lt") -> list[VirtualUser]:
+    """users_file: 한 줄에 email,password (미리 잔고를 넣어둔 계정)"""
+    if users_file:
+        users = []
+        with open(users_file, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    email, password = line.split(",", 1)
+                    users.append(VirtualUser(email.strip(), password.strip()))
+        return users[:n] if n else users
+    return [VirtualUser(f"{prefix}-{i}@loadtest.local", "loadtest-pw") for i in range(n)]
+
+
+async def prepare_users(client, users: list[VirtualUser], create: bool = False,
+                        concurrency: int = 20) -> list[VirtualUser]:
+    """로그인 (create 면 가입 + 계좌 개설), 로그인 실패한 유저는 제외"""
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(vu):
+        async with sem:
+            if create:
+                await signup(client, vu)
+            await login(client, vu)
+            if vu.token is not None:
+                await ensure_account(client, vu)
+
+    await asyncio.gather(*(one(vu) for vu in users))
+    return [vu for vu in users if vu.token is not None]
+
+
+# ---------------------------------------------------------
+# open-loop 부하
+# ---------------------------------------------------------
+class LoadTest:
+    """
+    rate (req/s) 로 요청 도착을 만들고 응답을 기다리지 않고 다음 요청을 보냄 (open-loop)
+    - arrival="poisson" 이면 지수분포 간격, "constant" 면 고정 간격
+    - 동작은 시나리오 가중치로, 유저는 가상 유저 중 무작위
+    - 동시 진행 요청이 max_in_flight 를 넘으면 그 도착은 버리고 dropped 로 셈
+    - warmup 초 동안의 요청은 통계에서 제외
+    """
+
+    def __init__(self, client, users: list[VirtualUser], weights: dict, ctx: Context,
+                 rate: float, duration: float, arrival: str = "poisson",
+                 max_in_flight: int = 1000, warmup: float = 0.0, seed: int | None = None):
+        self.client = client
+        self.users = users
+        self.weights = weights
+        self.ctx = ctx
+        self.rate = rate
+        self.duration = duration
+        self.arrival = arrival
+        self.max_in_flight = max_in_flight
+        self.warmup = warmup
+        self.rng = random.Random(seed)
+
+        self.recorder = Recorder()
+        self.in_flight = 0
+        self._measure_from = 0.0
+
+    def _gap(self) -> float:
+        if self.arrival == "constant":
+            return 1.0 / self.rate
+        return self.rng.expovariate(self.rate)
+
+    async def _fire(self, scheduled: float):
+        action = pick(self.weights, self.rng)
+        vu = self.rng.choice(self.users)
+        name = action.endpoint
+        try:
+            name, r = await action(self.client, vu, self.ctx)
+            if r is None:
+                return
+            status = r.status_code
+        except httpx.TimeoutException:
+            status = "timeout"
+        except httpx.TransportError as e:
+            status = f"transport:{type(e).__name__}"
+        finally:
+            self.in_flight -= 1
+
+        if scheduled >= self._measure_from:
+            self.recorder.record(name, (time.perf_counter() - scheduled) * 1000, status)
+
+    async def run(self) -> dict:
+        loop_start = time.perf_counter()
+        self._measure_from = loop_start + self.warmup
+        end = self._measure_from + self.duration
+        tasks = set()
+
+        next_at = loop_start
+        started = False
+        while next_at < end:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if not started and next_at >= self._measure_from:
+                self.recorder.start()
+                started = True
+
+            if self.in_flight >= self.max_in_flight:
+                if next_at >= self._measure_from:
+                    self.recorder.dropped += 1
+            else:
+                self.in_flight += 1
+                t = asyncio.create_task(self._fire(next_at))
+                tasks.add(t)
+                t.add_done_callback(tasks.discard)
+            next_at += self._gap()
+
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if not started:
+            self.recorder.start()
+        self.recorder.stop()
+        return self.recorder.report()
@@ -0,0 +1,209 @@
+# loadtest/scenarios.py
+"""
+가상 유저 동작 / 시나리오 (동작별 가중치)
+
+동작은 async fn(client, vu, ctx) -> (엔드포인트 이름, httpx.Response | None)
+  None 이면 보낼 요청이 없었던 것 (예: 취소할 주문 없음) → 기록하지 않음
+"""
+import base64
+import json
+import random
+from collections import deque
+
+
+class VirtualUser:
+    """로그인 세션 1개 (토큰 / 계좌 / 최근 접수한 주문 id)"""
+
+    def __init__(self, email: str, password: str):
+        self.email = email
+        self.password = password
+        self.token = None
+        self.user_id = None
+        self.account_id = None
+        self.open_orders = deque(maxlen=200)
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+class Context:
+    """시나리오 공용 설정 (심볼 / 기준가 / 난수)"""
+
+    def __init__(self, symbol: str = "SOLUSDT", price: float = 100.0, spread: float = 0.01,
+                 qty: float = 0.1, seed: int | None = None):
+        self.symbol = symbol
+        self.price = price
+        self.spread = spread
+        self.qty = qty
+        self.rng = random.Random(seed)
+
+    def limit_price(self, side: str) -> float:
+        # 기준가 근처 (일부는 교차해서 체결)
+        off = self.rng.uniform(-self.spread, self.spread * 2)
+        p = self.price * (1 - off) if side == "BUY" else self.price * (1 + off)
+        return round(p, 2)
+
+    def side(self) -> str:
+        return self.rng.choice(("BUY", "SELL"))
+
+
+def endpoint(name: str):
+    """통계에 쓰는 엔드포인트 이름 (요청이 예외로 끝나도 이 이름으로 기록)"""
+    def deco(fn):
+        fn.endpoint = name
+        return fn
+    return deco
+
+
+# ---------------------------------------------------------
+# 세션
+# ---------------------------------------------------------
+@endpoint("POST /login")
+async def login(client, vu: VirtualUser, ctx: Context = None):
+    r = await client.post("/login", data={"username": vu.email, "password": vu.password})
+    if r.status_code == 200:
+        vu.token = r.json()["access_token"]
+        claims = _claims(vu.token)
+        vu.user_id = claims.get("user_id", vu.user_id)
+        if vu.account_id is None and claims.get("account_ids"):
+            vu.account_id = claims["account_ids"][0]
+    return "POST /login", r
+
+
+def _claims(token: str) -> dict:
+    """JWT payload (서명 검증 없이, 유저 id / 계좌 확인용)"""
+    try:
+        payload = token.split(".")[1]
+        return json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except (IndexError, ValueError):
+        return {}
+
+
+async def signup(client, vu: VirtualUser):
+    r = await client.post("/signup", json={"email": vu.email, "password": vu.password})
+    if r.status_code == 200:
+        vu.user_id = r.json()["user_id"]
+    return "POST /signup", r
+
+
+async def ensure_account(client, vu: VirtualUser):
+    """기본 계좌 조회, 없으면 개설 (개설 후 토큰 claims 는 서버 캐시가 갱신)"""
+    if vu.account_id is not None:
+        return
+    r = await client.get("/account/primary", headers=vu.headers)
+    if r.status_code == 200 and r.json().get("account_id"):
+        vu.account_id = r.json()["account_id"]
+        return
+
+    if vu.user_id is None:
+        return
+    no = f"LT-{vu.user_id}"
+    r = await client.post("/account/open", headers=vu.headers,
+                          json={"user_id": vu.user_id, "account_no": no})
+    if r.status_code == 200:
+        vu.account_id = r.json()["account_id"]
+
+
+# ---------------------------------------------------------
+# 주문
+# ---------------------------------------------------------
+@endpoint("POST /order LIMIT")
+async def limit_order(client, vu: VirtualUser, ctx: Context):
+    side = ctx.side()
+    r = await client.post("/order", headers=vu.headers, json={
+        "account_id": vu.account_id, "symbol": ctx.symbol, "side": side,
+        "order_type": "LIMIT", "price": ctx.limit_price(side), "qty": ctx.qty,
+    })
+    if r.status_code == 200:
+        oid = r.json().get("order_id")
+        if oid:
+            vu.open_orders.append(oid)
+    return "POST /order LIMIT", r
+
+
+@endpoint("POST /order MARKET")
+async def market_order(client, vu: VirtualUser, ctx: Context):
+    r = await client.post("/order", headers=vu.headers, json={
+        "account_id": vu.account_id, "symbol": ctx.symbol, "side": ctx.side(),
+        "order_type": "MARKET", "qty": ctx.qty,
+    })
+    return "POST /order MARKET", r
+
+
+@endpoint("POST /order/cancel")
+async def cancel(client, vu: VirtualUser, ctx: Context):
+    if not vu.open_orders:
+        return "POST /order/cancel", None
+    ids = [vu.open_orders.popleft() for _ in range(min(len(vu.open_orders), 3))]
+    r = await client.post("/order/cancel", headers=vu.headers, json={"order_ids": ids})
+    return "POST /order/cancel", r
+
+
+# ---------------------------------------------------------
+# 조회
+# ---------------------------------------------------------
+@endpoint("GET /orderbook")
+async def orderbook(client, vu: VirtualUser, ctx: Context):
+    r = await client.get("/orderbook", params={"symbol": ctx.symbol, "depth": 20})
+    return "GET /orderbook", r
+
+
+@endpoint("GET /ticker")
+async def ticker(client, vu: VirtualUser, ctx: Context):
+    r = await client.get("/ticker", params={"symbol": ctx.symbol})
+    return "GET /ticker", r
+
+
+@endpoint("GET /trades/recent")
+async def recent_trades(client, vu: VirtualUser, ctx: Context):
+    r = await client.get("/trades/recent", params={"symbol": ctx.symbol, "limit": 50})
+    return "GET /trades/recent", r
+
+
+@endpoint("GET /trades/my")
+async def trades_my(client, vu: VirtualUser, ctx: Context):
+    r = await client.get("/trades/my", headers=vu.headers, params={"limit": 50, "days": 7})
+    return "GET /trades/my", r
+
+
+@endpoint("GET /account/summary")
+async def account_summary(client, vu: VirtualUser, ctx: Context):
+    r = await client.get("/account/summary", headers=vu.headers,
+                         params={"account_id": vu.account_id})
+    return "GET /account/summary", r
+
+
+ACTIONS = {
+    "login": login,
+    "limit_order": limit_order,
+    "market_order": market_order,
+    "cancel": cancel,
+    "orderbook": orderbook,
+    "ticker": ticker,
+    "recent_trades": recent_trades,
+    "trades_my": trades_my,
+    "account_summary": account_summary,
+}
+
+# 시나리오: 동작 이름 -> 가중치
+SCENARIOS = {
+    # 실제 트래픽 비슷하게: 조회 위주 + 주문/취소
+    "mixed": {
+        "orderbook": 35, "ticker": 10, "recent_trades": 5, "limit_order": 20, "market_order": 3,
+        "cancel": 10, "trades_my": 7, "account_summary": 8, "login": 2,
+    },
+    # 주문 폭주 (게이트웨이 / 엔진 / persister)
+    "order_storm": {"limit_order": 70, "market_order": 10, "cancel": 20},
+    # 오더북 / 체결 tape polling (스냅샷 / 직렬화 캐시)
+    "book_polling": {"orderbook": 70, "ticker": 15, "recent_trades": 15},
+    # 로그인 폭주 (토큰 발급 / 로그인 DB)
+    "logins": {"login": 100},
+    # 계좌 / 체결 조회 (DB 조회 경로)
+    "account_reads": {"trades_my": 50, "account_summary": 50},
+}
+
+
+def pick(weights: dict, rng: random.Random):
+    names = list(weights)
+    return ACTIONS[rng.choices(names, weights=[weights[n] for n in names])[0]]
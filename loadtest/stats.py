@@ -0,0 +1,153 @@
+# loadtest/stats.py
+import json
+import math
+import platform
+import time
+from collections import Counter, defaultdict
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    """nearest-rank (q: 0~100)"""
+    if not sorted_values:
+        return 0.0
+    k = max(0, math.ceil(q / 100 * len(sorted_values)) - 1)
+    return sorted_values[k]
+
+
+class Recorder:
+    """
+    엔드포인트별 지연(ms) / 상태코드 기록
+    지연은 예정 도착 시각부터 잼 (open-loop: 서버가 밀려서 늦게 보낸 시간도 포함)
+    """
+
+    PERCENTILES = (50, 90, 99, 99.9)
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.started = None
+        self.finished = None
+        self.dropped = 0
+
+    def start(self):
+        self.started = time.perf_counter()
+
+    def stop(self):
+        self.finished = time.perf_counter()
+
+    def record(self, endpoint: str, ms: float, status):
+        self.latencies[endpoint].append(ms)
+        self.statuses[endpoint][str(status)] += 1
+
+    @staticmethod
+    def _ok(status: str) -> bool:
+        return status.isdigit() and int(status) < 400
+
+    def _summary(self, values: list, statuses: Counter, elapsed: float) -> dict:
+        values = sorted(values)
+        ok = sum(n for s, n in statuses.items() if self._ok(s))
+        out = {
+            "count": len(values),
+            "ok": ok,
+            "errors": len(values) - ok,
+            "rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+            "mean_ms": round(sum(values) / len(values), 3) if values else 0.0,
+        }
+        for q in self.PERCENTILES:
+            out[f"p{q:g}_ms"] = round(percentile(values, q), 3)
+        out["max_ms"] = round(values[-1], 3) if values else 0.0
+        out["status"] = dict(statuses)
+        return out
+
+    def report(self) -> dict:
+        elapsed = (self.finished or time.perf_counter()) - (self.started or time.perf_counter())
+        endpoints = {
+            name: self._summary(values, self.statuses[name], elapsed)
+            for name, values in sorted(self.latencies.items())
+        }
+        all_values = [v for values in self.latencies.values() for v in values]
+        all_status = Counter()
+        for c in self.statuses.values():
+            all_status.update(c)
+        return {
+            "elapsed_sec": round(elapsed, 3),
+            "dropped": self.dropped,
+            "total": self._summary(all_values, all_status, elapsed),
+            "endpoints": endpoints,
+        }
+
+
+# ---------------------------------------------------------
+# 출력
+# ---------------------------------------------------------
+def format_report(report: dict) -> str:
+    cols = ("count", "errors", "rps", "p50_ms", "p90_ms", "p99_ms", "p99.9_ms", "max_ms")
+    rows = [("endpoint", *cols)]
+    for name, s in report["endpoints"].items():
+        rows.append((name, *(s[c] for c in cols)))
+    rows.append(("TOTAL", *(report["total"][c] for c in cols)))
+
+    widths = [max(len(str(r[i])) for r in rows) for i in range(len(rows[0]))]
+    lines = ["  ".join(str(v).rjust(w) if i else str(v).ljust(w)
+                       for i, (v, w) in enumerate(zip(r, widths))) for r in rows]
+    lines.insert(1, "-" * len(lines[0]))
+    lines.append(f"elapsed {report['elapsed_sec']}s, dropped arrivals {report['dropped']}")
+    return "\n".join(lines)
+
+
+# ---------------------------------------------------------
+# baseline 저장 / 비교 (릴리스 간 회귀 확인)
+# ---------------------------------------------------------
+COMPARE_METRICS = ("p50_ms", "p99_ms", "rps", "errors")
+
+
+def save_baseline(path: str, report: dict, meta: dict):
+    doc = {
+        "meta": {**meta, "saved_at": time.time(), "python": platform.python_version()},
+        "report": report,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=1)
+
+
+def load_baseline(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(report: dict, baseline: dict, tolerance: float = 0.2) -> list[dict]:
+    """
+    baseline 대비 변화율 (엔드포인트 x 지표)
+    지연/에러는 tolerance 이상 늘면, rps 는 tolerance 이상 줄면 regressed
+    """
+    base = baseline["report"]["endpoints"]
+    rows = []
+    for name, now in report["endpoints"].items():
+        old = base.get(name)
+        if old is None:
+            continue
+        for metric in COMPARE_METRICS:
+            a, b = old.get(metric, 0), now.get(metric, 0)
+            change = (b - a) / a if a else (0.0 if b == a else math.inf)
+            if metric == "rps":
+                regressed = change < -tolerance
+            elif metric == "errors":
+                regressed = b > a and change > tolerance
+            else:
+                regressed = change > tolerance
+            rows.append({
+                "endpoint": name, "metric": metric, "baseline": a, "now": b,
+                "change_pct": round(change * 100, 1) if math.isfinite(change) else None,
+                "regressed": regressed,
+            })
+    return rows
+
+
+def format_compare(rows: list[dict]) -> str:
+    lines = []
+    for r in rows:
+        mark = "REGRESSED" if r["regressed"] else "ok"
+        change = "n/a" if r["change_pct"] is None else f"{r['change_pct']:+.1f}%"
+        lines.append(f"{mark:<9} {r['endpoint']:<22} {r['metric']:<8} "
+                     f"{r['baseline']} -> {r['now']} ({change})")
+    return "\n".join(lines)
@@ -2,6 +2,8 @@
 import psycopg2
 from psycopg2.extras import DictCursor
 
+from services.fill_netting import apply_net_fills, net_fills
+
 
 class AccountRepository:
     def __init__(self, conn):
@@ -90,6 +92,41 @@ class AccountRepository:
 
         return summary
 
+    # -----------------------------------------
+    # 여러 계좌 요약 한번에 (쿼리 2번)
+    # -----------------------------------------
+    def get_account_summaries(self, account_ids: list[int]):
+        result = {aid: {"balance": 0.0, "positions": []} for aid in account_ids}
+        if not account_ids:
+            return result
+
+        with self.conn.cursor(cursor_factory=DictCursor) as cur:
+            cur.execute(
+                "SELECT id, balance FROM accounts WHERE id = ANY(%s);",
+                (list(account_ids),)
+            )
+            for r in cur.fetchall():
+                result[r["id"]]["balance"] = float(r["balance"])
+
+            cur.execute(
+                """
+                SELECT account_id, symbol, qty, avg_price, updated_at
+                FROM positions
+                WHERE account_id = ANY(%s)
+                ORDER BY account_id, symbol;
+                """,
+                (list(account_ids),)
+            )
+            for r in cur.fetchall():
+                result[r["account_id"]]["positions"].append({
+                    "symbol": r["symbol"],
+                    "qty": float(r["qty"]),
+                    "avg_price": float(r["avg_price"]),
+                    "updated_at": r["updated_at"]
+                })
+
+        return result
+
     # -----------------------------------------
     # 유저 전체 계좌 목록
     # -----------------------------------------
@@ -104,7 +141,7 @@ class AccountRepository:
                 """,
                 (user_id,),
             )
-            return cur.fetchall()
+            return [dict(r) for r in cur.fetchall()]
 
     # -----------------------------------------
     # 잔고 업데이트
@@ -171,3 +208,31 @@ class AccountRepository:
                 (account_id, symbol),
             )
         self.conn.commit()
+
+    # -----------------------------------------
+    # 매칭 배치 단위 잔고/포지션 일괄 반영
+    # -----------------------------------------
+    def apply_net_fills(self, nets, commit: bool = True):
+        """
+        commit=False 면 호출자 트랜잭션에 포함 (엔진 persist 배치)
+        """
+        try:
+            with self.conn.cursor() as cur:
+                apply_net_fills(cur, nets)
+            if commit:
+                self.conn.commit()
+        except Exception as e:
+            if commit:
+                self.conn.rollback()
+            print("[AccountRepository] apply_net_fills error:", e)
+            raise
+
+    def apply_fill_legs(self, legs, commit: bool = True):
+        """
+        체결 leg → (account_id, symbol) netting 후 반영, {key: NetFill} 반환
+        (엔진 persister 가 체결 INSERT 와 같은 트랜잭션에서 호출)
+        """
+        nets = net_fills(legs)
+        if nets:
+            self.apply_net_fills(nets.values(), commit=commit)
+        return nets
@@ -0,0 +1,205 @@
+# repositories/archive_repository.py
+
+
+class ArchiveRepository:
+    """
+    월 파티션 관리 + 종결 주문/오래된 체결을 cold(아카이브) 파티션으로 이동
+    - orders / trades           : hot (working set + 최근 N일)
+    - orders_archive / trades_archive : cold (월 파티션)
+    db_migrations 002 의 ensure_month_partition() 함수를 사용한다.
+    """
+
+    TERMINAL_STATUSES = ("FILLED", "CANCELLED", "EXPIRED")
+
+    HOT_TABLES = ("orders", "trades")
+    COLD_TABLES = ("orders_archive", "trades_archive")
+
+    # 파티션 키 (DEFAULT 파티션 정리 / legacy 이관 시 월 계산용)
+    PARTITION_KEYS = {
+        "orders": "created_at", "trades": "trade_time",
+        "orders_archive": "created_at", "trades_archive": "trade_time",
+    }
+
+    # pg_try_advisory_lock 키 (워커 여러 개 중 하나만 실행)
+    LOCK_KEY = 727_002
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    # -------------------------------------------
+    # 잡 단일 실행 보장
+    # -------------------------------------------
+    def try_lock(self) -> bool:
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT pg_try_advisory_lock(%s);", (self.LOCK_KEY,))
+            ok = cur.fetchone()[0]
+        self.conn.commit()
+        return ok
+
+    def unlock(self):
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_unlock(%s);", (self.LOCK_KEY,))
+        self.conn.commit()
+
+    # -------------------------------------------
+    # DEFAULT 파티션에 쌓인 row → 해당 월 파티션으로
+    #  (DEFAULT 에 row 가 있는 달은 PARTITION OF 로 만들 수 없으므로 ensure_partitions 전에)
+    #  ensure_month_partition() 이 그 달 row 를 새 파티션으로 옮긴 뒤 ATTACH
+    # -------------------------------------------
+    def drain_default_partitions(self) -> dict:
+        moved = {}
+        with self.conn.cursor() as cur:
+            for parent in self.HOT_TABLES + self.COLD_TABLES:
+                key = self.PARTITION_KEYS[parent]
+                cur.execute(f"""
+                    SELECT DISTINCT date_trunc('month', {key})::date
+                    FROM "{parent}_default";
+                """)
+                months = [r[0] for r in cur.fetchall()]
+                for month in months:
+                    cur.execute("SELECT ensure_month_partition(%s, %s);", (parent, month))
+                if months:
+                    moved[parent] = [m.strftime("%Y-%m") for m in months]
+        self.conn.commit()
+        return moved
+
+    # -------------------------------------------
+    # 파티션 전환 전 row (db_migrations 002 의 <tbl>_legacy) → 파티션 테이블로 배치 이관
+    #  - 배치마다 해당 월 파티션을 먼저 만들고 옮김 (DEFAULT 로 가지 않도록)
+    #  - 비면 legacy 테이블 삭제, legacy 가 없으면 None
+    # -------------------------------------------
+    def backfill_legacy(self, table: str, batch_size: int = 5000) -> int | None:
+        legacy = f"{table}_legacy"
+        key = self.PARTITION_KEYS[table]
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT to_regclass(%s);", (legacy,))
+            if cur.fetchone()[0] is None:
+                self.conn.commit()
+                return None
+
+            cur.execute(f"""
+                CREATE TEMP TABLE IF NOT EXISTS legacy_batch_{table}
+                    (LIKE "{legacy}") ON COMMIT DELETE ROWS;
+            """)
+            cur.execute(f"""
+                WITH moved AS (
+                    DELETE FROM "{legacy}"
+                    WHERE ctid = ANY(ARRAY(SELECT ctid FROM "{legacy}" LIMIT %s))
+                    RETURNING *
+                )
+                INSERT INTO legacy_batch_{table}
+                SELECT * FROM moved;
+            """, (batch_size,))
+            moved = cur.rowcount
+
+            if moved:
+                cur.execute(f"""
+                    SELECT ensure_month_partition(%s, m)
+                    FROM (SELECT DISTINCT date_trunc('month', {key})::date AS m
+                          FROM legacy_batch_{table}) months;
+                """, (table,))
+                cur.execute(f'INSERT INTO "{table}" SELECT * FROM legacy_batch_{table};')
+            else:
+                cur.execute(f'DROP TABLE "{legacy}";')
+        self.conn.commit()
+        return moved
+
+    # -------------------------------------------
+    # 이번 달 ~ months_ahead 개월 뒤까지 hot/cold 파티션 미리 생성
+    #  + cold 쪽은 hot 에 있는 모든 월 파티션을 갖추도록
+    # -------------------------------------------
+    def ensure_partitions(self, months_ahead: int = 2):
+        with self.conn.cursor() as cur:
+            for parent in self.HOT_TABLES + self.COLD_TABLES:
+                cur.execute("""
+                    SELECT ensure_month_partition(
+                        %s, (date_trunc('month', now()) + make_interval(months => g))::date
+                    )
+                    FROM generate_series(0, %s) AS g;
+                """, (parent, months_ahead))
+
+            for hot, cold in zip(self.HOT_TABLES, self.COLD_TABLES):
+                cur.execute(r"""
+                    SELECT ensure_month_partition(
+                        %s, to_date(substring(c.relname from '_p(\d{4}_\d{2})$'), 'YYYY_MM')
+                    )
+                    FROM pg_inherits i
+                    JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = %s::regclass
+                      AND c.relname ~ '_p\d{4}_\d{2}$';
+                """, (cold, hot))
+        self.conn.commit()
+
+    # -------------------------------------------
+    # 종결 주문 이동 (종결 시각 updated_at 기준)
+    #  - 종결 후 N일 지난 주문은 그 체결도 모두 N일 이전 → 체결과 함께 cold 로 감
+    # -------------------------------------------
+    def archive_orders(self, cutoff, batch_size: int = 5000) -> int:
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                WITH victims AS (
+                    SELECT id, created_at
+                    FROM orders
+                    WHERE status = ANY(%s)
+                      AND updated_at < %s
+                    LIMIT %s
+                ),
+                moved AS (
+                    DELETE FROM orders o
+                    USING victims v
+                    WHERE o.id = v.id AND o.created_at = v.created_at
+                    RETURNING o.*
+                )
+                INSERT INTO orders_archive
+                SELECT * FROM moved;
+            """, (list(self.TERMINAL_STATUSES), cutoff, batch_size))
+            moved = cur.rowcount
+        self.conn.commit()
+        return moved
+
+    def archive_trades(self, cutoff, batch_size: int = 5000) -> int:
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                WITH victims AS (
+                    SELECT id, trade_time
+                    FROM trades
+                    WHERE trade_time < %s
+                    LIMIT %s
+                ),
+                moved AS (
+                    DELETE FROM trades t
+                    USING victims v
+                    WHERE t.id = v.id AND t.trade_time = v.trade_time
+                    RETURNING t.*
+                )
+                INSERT INTO trades_archive
+                SELECT * FROM moved;
+            """, (cutoff, batch_size))
+            moved = cur.rowcount
+        self.conn.commit()
+        return moved
+
+    # -------------------------------------------
+    # cutoff 이전 달의 빈 hot 파티션 제거
+    #  (남아있는 미체결 주문이 있으면 유지)
+    # -------------------------------------------
+    def drop_empty_partitions(self, cutoff) -> list[str]:
+        dropped = []
+        with self.conn.cursor() as cur:
+            for parent in self.HOT_TABLES:
+                cur.execute(r"""
+                    SELECT c.relname
+                    FROM pg_inherits i
+                    JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = %s::regclass
+                      AND c.relname ~ '_p\d{4}_\d{2}$'
+                      AND to_date(substring(c.relname from '_p(\d{4}_\d{2})$'), 'YYYY_MM')
+                          < date_trunc('month', %s::timestamptz)::date;
+                """, (parent, cutoff))
+                for (part,) in cur.fetchall():
+                    cur.execute(f'SELECT 1 FROM "{part}" LIMIT 1;')
+                    if cur.fetchone() is None:
+                        cur.execute(f'DROP TABLE "{part}";')
+                        dropped.append(part)
+        self.conn.commit()
+        return dropped
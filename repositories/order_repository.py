@@ -1,20 +1,76 @@
 # repositories/order_repository.py
 import psycopg2
-from psycopg2.extras import DictCursor
+from psycopg2.extras import DictCursor, execute_values
+
+from repositories.pg_copy import copy_rows
 
 
 class OrderRepository:
+    # -------------------------------------------
+    # working set 조회 SQL
+    #  - status IN ('WORKING','PARTIAL') 조건이 있어야 partial index 를 탄다
+    #  - db_migrations.check_index_usage 에서 EXPLAIN 으로 검사
+    # -------------------------------------------
+    BUCKET_BY_PRICE_SQL = """
+        SELECT price, side, SUM(remaining_qty) AS qty, COUNT(*) AS cnt
+        FROM orders
+        WHERE symbol = %s
+          AND status IN ('WORKING','PARTIAL')
+          AND remaining_qty > 0
+        GROUP BY price, side
+    """
+
+    PRICE_STATS_SQL = """
+        SELECT price,
+               SUM(remaining_qty) AS qty,
+               COUNT(*) AS cnt
+        FROM orders
+        WHERE symbol = %s
+          AND status IN ('WORKING', 'PARTIAL')
+        GROUP BY price
+    """
+
+    # book_levels 상위 N 레벨 (PK (symbol, side, price) range scan, BUY 는 역방향)
+    #  depth=NULL 이면 전체
+    GROUPED_ORDERBOOK_SQL = """
+        (SELECT side, price, qty, cnt
+         FROM book_levels
+         WHERE symbol = %(symbol)s AND side = 'BUY'
+         ORDER BY price DESC
+         LIMIT %(depth)s)
+        UNION ALL
+        (SELECT side, price, qty, cnt
+         FROM book_levels
+         WHERE symbol = %(symbol)s AND side = 'SELL'
+         ORDER BY price ASC
+         LIMIT %(depth)s)
+    """
+
+    # book_levels 재구성용 집계 (마이그레이션 / rebuild_book_levels)
+    BOOK_LEVELS_REBUILD_SQL = """
+        INSERT INTO book_levels (symbol, side, price, qty, cnt)
+        SELECT symbol, side, price, SUM(remaining_qty), COUNT(*)
+        FROM orders
+        WHERE status IN ('WORKING','PARTIAL')
+          AND remaining_qty > 0
+        GROUP BY symbol, side, price
+    """
+
+    WORKING_BY_USER_SQL = """
+        SELECT id, symbol, side, price,
+               quantity, remaining_qty, created_at
+        FROM orders
+        WHERE user_id=%s
+          AND status IN ('WORKING','PARTIAL')
+        ORDER BY created_at DESC
+        LIMIT %s;
+    """
+
     def __init__(self, conn):
         self.conn = conn
 
     def bucket_by_price(self, symbol: str):
-        sql = """
-            SELECT price, side, SUM(remaining_qty) AS qty, COUNT(*) AS cnt
-            FROM orders
-            WHERE symbol = %s
-              AND remaining_qty > 0
-            GROUP BY price, side
-        """
+        sql = self.BUCKET_BY_PRICE_SQL
         with self.conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cur:
             cur.execute(sql, (symbol,))
             return cur.fetchall()
@@ -22,15 +78,7 @@ class OrderRepository:
     # repositories/order_repository.py
 
     def get_price_stats(self, symbol):
-        sql = """
-            SELECT price,
-                   SUM(remaining_qty) AS qty,
-                   COUNT(*) AS cnt
-            FROM orders
-            WHERE symbol = %s
-              AND status IN ('WORKING', 'PARTIAL')
-            GROUP BY price
-        """
+        sql = self.PRICE_STATS_SQL
         try:
             with self.conn.cursor() as cur:
                 cur.execute(sql, (symbol,))
@@ -51,21 +99,11 @@ class OrderRepository:
 
     # repositories/order_repository.py (추가)
 
-    def get_grouped_orderbook(self, symbol: str):
-        sql = """
-            SELECT side,
-                   price,
-                   SUM(remaining_qty) AS qty,
-                   COUNT(*) AS cnt
-            FROM orders
-            WHERE symbol = %s
-              AND status IN ('WORKING','PARTIAL')
-              AND remaining_qty > 0
-            GROUP BY side, price
-        """
+    def get_grouped_orderbook(self, symbol: str, depth: int | None = None):
+        sql = self.GROUPED_ORDERBOOK_SQL
         try:
             with self.conn.cursor(cursor_factory=DictCursor) as cur:
-                cur.execute(sql, (symbol,))
+                cur.execute(sql, {"symbol": symbol, "depth": depth})
                 return [dict(r) for r in cur.fetchall()]
         except Exception as e:
             print("[OrderRepository] get_grouped_orderbook error:", e)
@@ -88,6 +126,12 @@ class OrderRepository:
                     kwargs["remaining_qty"], kwargs["status"],
                 ))
                 order_id = cur.fetchone()["id"]
+
+                if kwargs["status"] in ("WORKING", "PARTIAL") and kwargs["remaining_qty"] > 0:
+                    self.apply_level_deltas([(
+                        kwargs["symbol"], kwargs["side"], kwargs["price"],
+                        kwargs["remaining_qty"], 1,
+                    )])
             self.conn.commit()
             return order_id
 
@@ -97,6 +141,164 @@ class OrderRepository:
             print("🔥 SQL DATA:", kwargs)
             raise
 
+    # -------------------------------------------
+    # 주문 id 블록 예약 (엔진 id 할당용)
+    # -------------------------------------------
+    def reserve_order_ids(self, count: int):
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                SELECT nextval(pg_get_serial_sequence('orders', 'id'))
+                FROM generate_series(1, %s);
+            """, (count,))
+            ids = [r[0] for r in cur.fetchall()]
+        self.conn.commit()
+        return ids
+
+    # -------------------------------------------
+    # 엔진 배치: 신규 주문 일괄 INSERT (id 는 엔진 할당)
+    #  row: (id, user_id, account_id, symbol, side, price,
+    #        quantity, remaining_qty, status, created_at, order_type, stop_price, expire_at)
+    #  - 커밋은 호출자(EnginePersister)
+    #  - 이미 있는 주문은 건너뜀 (재시도) → 실제로 들어간 id 목록 반환
+    # -------------------------------------------
+    def insert_orders(self, rows):
+        with self.conn.cursor() as cur:
+            inserted = execute_values(cur, """
+                INSERT INTO orders (id, user_id, account_id, symbol, side, price,
+                                    quantity, remaining_qty, status, created_at,
+                                    order_type, stop_price, expire_at, updated_at)
+                VALUES %s
+                ON CONFLICT (id, created_at) DO NOTHING
+                RETURNING id;
+            """, rows,
+               template="(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())",
+               page_size=len(rows),
+               fetch=True)
+        return [r[0] for r in inserted]
+
+    # -------------------------------------------
+    # 엔진 배치: 잔량/상태 일괄 UPDATE
+    #  row: (id, remaining_qty, status, created_at)
+    #  - 커밋은 호출자(EnginePersister)
+    #  - 이미 같은 값이면 건너뜀 (재시도) → 실제로 바뀐 row 수 반환
+    # -------------------------------------------
+    def update_orders(self, rows):
+        with self.conn.cursor() as cur:
+            execute_values(cur, """
+                UPDATE orders AS o
+                SET remaining_qty = v.remaining_qty,
+                    status        = v.status,
+                    updated_at    = NOW()
+                FROM (VALUES %s) AS v(id, remaining_qty, status, created_at)
+                WHERE o.id = v.id
+                  AND o.created_at = COALESCE(v.created_at, o.created_at)
+                  AND (o.remaining_qty, o.status) IS DISTINCT FROM (v.remaining_qty, v.status);
+            """, rows,
+               template="(%s::bigint, %s::numeric, %s, %s::timestamptz)",
+               page_size=len(rows))
+            return cur.rowcount
+
+    # -------------------------------------------
+    # 가격 레벨 집계 delta 반영 (커밋은 호출자)
+    #  row: (symbol, side, price, dqty, dcnt)
+    #  - cnt 가 0 이 된 레벨은 삭제
+    # -------------------------------------------
+    def apply_level_deltas(self, rows):
+        with self.conn.cursor() as cur:
+            emptied = execute_values(cur, """
+                INSERT INTO book_levels AS b (symbol, side, price, qty, cnt)
+                VALUES %s
+                ON CONFLICT (symbol, side, price) DO UPDATE
+                SET qty        = b.qty + EXCLUDED.qty,
+                    cnt        = b.cnt + EXCLUDED.cnt,
+                    updated_at = NOW()
+                RETURNING symbol, side, price, cnt;
+            """, rows,
+               template="(%s, %s, %s::numeric, %s::numeric, %s)",
+               page_size=len(rows),
+               fetch=True)
+
+            emptied = [r for r in emptied if r[3] <= 0]
+            if emptied:
+                cur.execute("""
+                    DELETE FROM book_levels b
+                    USING unnest(%s::text[], %s::text[], %s::numeric[]) AS d(symbol, side, price)
+                    WHERE b.symbol = d.symbol AND b.side = d.side AND b.price = d.price
+                      AND b.cnt <= 0;
+                """, (
+                    [r[0] for r in emptied],
+                    [r[1] for r in emptied],
+                    [r[2] for r in emptied],
+                ))
+
+    # -------------------------------------------
+    # book_levels 전체 재구성 (복구용)
+    # -------------------------------------------
+    def rebuild_book_levels(self):
+        with self.conn.cursor() as cur:
+            cur.execute("LOCK TABLE book_levels IN EXCLUSIVE MODE;")
+            cur.execute("DELETE FROM book_levels;")
+            cur.execute(self.BOOK_LEVELS_REBUILD_SQL)
+        self.conn.commit()
+
+    # -------------------------------------------
+    # 대량 모드: staging 테이블에 COPY 후 INSERT ... ON CONFLICT 1회
+    #  → 실제로 들어간 id 목록 반환
+    # -------------------------------------------
+    def copy_orders(self, rows):
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS order_copy_stage
+                    (LIKE orders INCLUDING DEFAULTS) ON COMMIT DELETE ROWS;
+            """)
+            copy_rows(cur, """
+                COPY order_copy_stage (id, user_id, account_id, symbol, side, price,
+                                       quantity, remaining_qty, status, created_at,
+                                       order_type, stop_price, expire_at)
+                FROM STDIN WITH (FORMAT csv)
+            """, rows)
+            cur.execute("""
+                INSERT INTO orders (id, user_id, account_id, symbol, side, price,
+                                    quantity, remaining_qty, status, created_at,
+                                    order_type, stop_price, expire_at, updated_at)
+                SELECT id, user_id, account_id, symbol, side, price,
+                       quantity, remaining_qty, status, created_at,
+                       order_type, stop_price, expire_at, NOW()
+                FROM order_copy_stage
+                ON CONFLICT (id, created_at) DO NOTHING
+                RETURNING id;
+            """)
+            return [r[0] for r in cur.fetchall()]
+
+    # -------------------------------------------
+    # 대량 모드: 주문 상태를 staging 테이블에 COPY 후 UPDATE 1회로 merge
+    # -------------------------------------------
+    def merge_order_states(self, rows):
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS order_state_stage (
+                    id            bigint,
+                    remaining_qty numeric,
+                    status        text,
+                    created_at    timestamptz
+                ) ON COMMIT DELETE ROWS;
+            """)
+            copy_rows(cur, """
+                COPY order_state_stage (id, remaining_qty, status, created_at)
+                FROM STDIN WITH (FORMAT csv)
+            """, rows)
+            cur.execute("""
+                UPDATE orders AS o
+                SET remaining_qty = s.remaining_qty,
+                    status        = s.status,
+                    updated_at    = NOW()
+                FROM order_state_stage s
+                WHERE o.id = s.id
+                  AND o.created_at = COALESCE(s.created_at, o.created_at)
+                  AND (o.remaining_qty, o.status) IS DISTINCT FROM (s.remaining_qty, s.status);
+            """)
+            return cur.rowcount
+
     # -------------------------------------------
     # 주문 조회 (MatchingEngine 용)
     # -------------------------------------------
@@ -122,8 +324,18 @@ class OrderRepository:
                 "price": float(r["price"]),
                 "remaining_qty": float(r["remaining_qty"]),
                 "qty": float(r["quantity"]),  # optional
+                "status": r["status"],
+                "created_at": r["created_at"],
             }
 
+    def get_order_owners(self, order_ids) -> dict:
+        """{order_id: user_id} (취소 소유권 확인용, 한 번에 조회)"""
+        if not order_ids:
+            return {}
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT id, user_id FROM orders WHERE id = ANY(%s)", (list(order_ids),))
+            return dict(cur.fetchall())
+
     # -------------------------------------------
     # 잔량 / 상태 업데이트
     # -------------------------------------------
@@ -154,18 +366,7 @@ class OrderRepository:
     # -------------------------------------------
     def get_working_orders_by_user(self, user_id, limit=100):
         with self.conn.cursor(cursor_factory=DictCursor) as cur:
-            cur.execute(
-                """
-                SELECT id, symbol, side, price,
-                       quantity, remaining_qty, created_at
-                FROM orders
-                WHERE user_id=%s
-                  AND status IN ('WORKING','PARTIAL')
-                ORDER BY created_at DESC
-                LIMIT %s;
-                """,
-                (user_id, limit)
-            )
+            cur.execute(self.WORKING_BY_USER_SQL, (user_id, limit))
             return [dict(r) for r in cur.fetchall()]
 
     # -------------------------------------------
@@ -178,13 +379,32 @@ class OrderRepository:
         with self.conn.cursor() as cur:
             cur.execute(
                 """
-                UPDATE orders
+                UPDATE orders o
                 SET status='CANCELLED', remaining_qty=0, updated_at=NOW()
-                WHERE id = ANY(%s)
-                  AND status IN ('WORKING','PARTIAL');
+                FROM (
+                    SELECT id, remaining_qty, status
+                    FROM orders
+                    WHERE id = ANY(%s)
+                      AND status IN ('WORKING','PARTIAL','PENDING')
+                    FOR UPDATE
+                ) prev
+                WHERE o.id = prev.id
+                RETURNING o.symbol, o.side, o.price, prev.remaining_qty, prev.status;
                 """,
                 (order_ids,)
             )
-            affected = cur.rowcount
+            rows = cur.fetchall()
+
+            # 취소된 잔량만큼 가격 레벨 차감 (발동 전 stop 은 레벨에 없음)
+            levels = {}
+            for sym, side, price, qty, status in rows:
+                if status == "PENDING":
+                    continue
+                d = levels.setdefault((sym, side, price), [0, 0])
+                d[0] -= qty
+                d[1] -= 1
+            if levels:
+                self.apply_level_deltas([k + tuple(v) for k, v in levels.items()])
+
             self.conn.commit()
-            return affected
+            return len(rows)
@@ -0,0 +1,26 @@
+# repositories/pg_copy.py
+import csv
+import io
+from datetime import datetime
+
+
+def _csv_value(v):
+    if v is None:
+        return None
+    if isinstance(v, datetime):
+        return v.isoformat()
+    return v
+
+
+def copy_rows(cur, copy_sql: str, rows):
+    """
+    row 튜플 목록을 CSV 로 만들어 COPY ... FROM STDIN 으로 스트리밍
+    - None 은 빈 값(따옴표 없음) → NULL
+    copy_sql 예: "COPY trades (a, b, c) FROM STDIN WITH (FORMAT csv)"
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    for row in rows:
+        writer.writerow(["" if v is None else _csv_value(v) for v in row])
+    buf.seek(0)
+    cur.copy_expert(copy_sql, buf)
@@ -1,6 +1,8 @@
 # repositories/trade_repositories.py
 
-from psycopg2.extras import DictCursor
+from psycopg2.extras import DictCursor, execute_values
+
+from repositories.pg_copy import copy_rows
 
 class TradeRepository:
     """
@@ -9,6 +11,40 @@ class TradeRepository:
     - 매칭 로직 없음
     """
 
+    # 종결 주문 / 오래된 체결은 orders_archive / trades_archive 로 옮겨지므로 hot / cold 를 합쳐서 조회
+    TRADES_BY_USER_SQL = """
+        SELECT
+            a.account_no AS account_no,
+            t.symbol      AS symbol,
+            CASE
+                WHEN ob.user_id = %(user_id)s THEN 'BUY'
+                WHEN os.user_id = %(user_id)s THEN 'SELL'
+                ELSE 'N/A'
+            END AS side,
+            t.price       AS price,
+            t.quantity    AS quantity,
+            t.trade_time  AS trade_time,
+            ''::text      AS remark
+        FROM (SELECT symbol, price, quantity, trade_time, buy_order_id, sell_order_id FROM trades
+              UNION ALL
+              SELECT symbol, price, quantity, trade_time, buy_order_id, sell_order_id
+              FROM trades_archive) t
+        JOIN (SELECT id, user_id, account_id FROM orders
+              UNION ALL
+              SELECT id, user_id, account_id FROM orders_archive) ob ON t.buy_order_id  = ob.id
+        JOIN (SELECT id, user_id, account_id FROM orders
+              UNION ALL
+              SELECT id, user_id, account_id FROM orders_archive) os ON t.sell_order_id = os.id
+        JOIN accounts a ON (
+            (ob.user_id = %(user_id)s AND ob.account_id = a.id)
+            OR (os.user_id = %(user_id)s AND os.account_id = a.id)
+        )
+        WHERE (ob.user_id = %(user_id)s OR os.user_id = %(user_id)s)
+          AND (%(since)s::timestamptz IS NULL OR t.trade_time >= %(since)s)
+        ORDER BY t.trade_time DESC
+        LIMIT %(limit)s
+    """
+
     def __init__(self, conn):
         self.conn = conn
 
@@ -45,36 +81,80 @@ class TradeRepository:
             return None
 
     # ---------------------------
-    # SELECT - 내 체결 목록
+    # 체결 id 블록 예약 (엔진 id 할당용)
+    # ---------------------------
+    def reserve_trade_ids(self, count: int):
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                SELECT nextval(pg_get_serial_sequence('trades', 'id'))
+                FROM generate_series(1, %s);
+            """, (count,))
+            ids = [r[0] for r in cur.fetchall()]
+        self.conn.commit()
+        return ids
+
     # ---------------------------
-    def get_trades_by_user(self, user_id, limit=100):
+    # 엔진 배치 INSERT (커밋은 호출자)
+    #  row: (id, user_id, account_id, symbol, side, price, qty,
+    #        trade_time, buy_order_id, sell_order_id, remark)
+    #  - id 는 엔진 할당, 이미 있는 체결은 건너뜀 → 실제로 들어간 id 목록 반환
+    # ---------------------------
+    def insert_trades(self, rows):
         sql = """
-            SELECT 
-                    a.account_no AS account_no,
-                    t.symbol      AS symbol,
-                    CASE
-                        WHEN ob.user_id = %(user_id)s THEN 'BUY'
-                        WHEN os.user_id = %(user_id)s THEN 'SELL'
-                        ELSE 'N/A'
-                    END AS side,
-                    t.price       AS price,
-                    t.quantity    AS quantity,
-                    t.trade_time  AS trade_time,
-                    ''::text      AS remark
-                FROM trades t
-                JOIN orders ob ON t.buy_order_id  = ob.id
-                JOIN orders os ON t.sell_order_id = os.id
-                JOIN accounts a ON (
-                    (ob.user_id = %(user_id)s AND ob.account_id = a.id)
-                    OR (os.user_id = %(user_id)s AND os.account_id = a.id)
-                )
-                WHERE ob.user_id = %(user_id)s OR os.user_id = %(user_id)s
-                ORDER BY t.trade_time DESC
-                LIMIT %(limit)s
+            INSERT INTO trades (
+                id, user_id, account_id, symbol, side,
+                price, quantity, trade_time,
+                buy_order_id, sell_order_id, remark
+            )
+            VALUES %s
+            ON CONFLICT (id, trade_time) DO NOTHING
+            RETURNING id
         """
+        with self.conn.cursor() as cur:
+            inserted = execute_values(cur, sql, rows, page_size=len(rows), fetch=True)
+        return [r[0] for r in inserted]
+
+    # ---------------------------
+    # 대량 모드: staging 테이블에 COPY 후 INSERT ... ON CONFLICT 1회 (커밋은 호출자)
+    # ---------------------------
+    def copy_trades(self, rows):
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                CREATE TEMP TABLE IF NOT EXISTS trade_copy_stage
+                    (LIKE trades INCLUDING DEFAULTS) ON COMMIT DELETE ROWS;
+            """)
+            copy_rows(cur, """
+                COPY trade_copy_stage (
+                    id, user_id, account_id, symbol, side,
+                    price, quantity, trade_time,
+                    buy_order_id, sell_order_id, remark
+                )
+                FROM STDIN WITH (FORMAT csv)
+            """, rows)
+            cur.execute("""
+                INSERT INTO trades (
+                    id, user_id, account_id, symbol, side,
+                    price, quantity, trade_time,
+                    buy_order_id, sell_order_id, remark
+                )
+                SELECT id, user_id, account_id, symbol, side,
+                       price, quantity, trade_time,
+                       buy_order_id, sell_order_id, remark
+                FROM trade_copy_stage
+                ON CONFLICT (id, trade_time) DO NOTHING
+                RETURNING id;
+            """)
+            return [r[0] for r in cur.fetchall()]
+
+    # ---------------------------
+    # SELECT - 내 체결 목록
+    #  since: 이 시각 이후만 (hot 월 파티션만 스캔하도록)
+    # ---------------------------
+    def get_trades_by_user(self, user_id, limit=100, since=None):
+        sql = self.TRADES_BY_USER_SQL
         try:
             with self.conn.cursor(cursor_factory=DictCursor) as cur:
-                cur.execute(sql, {"user_id": user_id, "limit": limit})
+                cur.execute(sql, {"user_id": user_id, "limit": limit, "since": since})
                 return [dict(r) for r in cur.fetchall()]
         except Exception as e:
             print("[TradeRepository] get_trades_by_user error:", e)
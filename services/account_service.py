@@ -1,9 +1,27 @@
 # services/account_service.py
+import os
+
+from services.ttl_cache import TTLCache
+
 
 class AccountService:
-    def __init__(self, account_repo):
+    def __init__(self, account_repo,
+                 cache_size: int | None = None,
+                 cache_ttl: float | None = None):
         self.acc_repo = account_repo
 
+        cache_size = cache_size or int(os.getenv("ACCOUNT_CACHE_SIZE", "10000"))
+        cache_ttl = cache_ttl or float(os.getenv("ACCOUNT_CACHE_TTL", "30"))
+
+        # 조회 캐시 (체결/계좌 이벤트 때 무효화)
+        #  - TTL 은 다른 프로세스(엔진 서버)에서 잔고가 바뀌는 경우 대비용 상한
+        self.summary_cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)  # account_id -> summary
+        self.list_cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)     # user_id -> [accounts]
+        self.caching = True
+
+        # 무효화 구독자: fn([(user_id, account_id), ...]) (엔진 서버 → API 워커 push)
+        self.listeners = []
+
     # -----------------------------------
     # 기본 계좌 조회
     # -----------------------------------
@@ -11,54 +29,89 @@ class AccountService:
         return self.acc_repo.get_primary_account_id(user_id)
 
     # -----------------------------------
-    # 체결 후 계좌/포지션 업데이트
+    # 계좌 개설
     # -----------------------------------
-    def apply_fill(self, user_id: int, account_id: int,
-                   symbol: str, side: str, price: float, qty: float):
-
-        summary = self.acc_repo.get_account_summary(account_id)
-        balance = summary["balance"]
-        trade_value = price * qty
-
-        # ----------------------------- #
-        # 1) 현금 잔고 업데이트
-        # ----------------------------- #
-        if side == "BUY":
-            balance -= trade_value
-        else:  # SELL
-            balance += trade_value
-
-        self.acc_repo.update_balance(account_id, balance)
-
-        # ----------------------------- #
-        # 2) 포지션 업데이트
-        # ----------------------------- #
-        pos = self.acc_repo.get_position(account_id, symbol)
-
-        if side == "BUY":
-            if not pos:
-                # 신규 포지션
-                self.acc_repo.insert_position(
-                    account_id, symbol, qty, price
-                )
+    def create_account(self, user_id: int, account_no: str):
+        new_id = self.acc_repo.create_account(user_id=user_id, account_no=account_no)
+        self.list_cache.pop(user_id)
+        return new_id
+
+    # -----------------------------------
+    # 계좌 요약 (read-through 캐시)
+    # -----------------------------------
+    def get_account_summary(self, account_id: int):
+        if not self.caching:
+            return self.acc_repo.get_account_summary(account_id)
+        summary = self.summary_cache.get(account_id)
+        if summary is None:
+            summary = self.acc_repo.get_account_summary(account_id)
+            self.summary_cache.set(account_id, summary)
+        return summary
+
+    def get_account_summaries(self, account_ids: list[int]):
+        """
+        여러 계좌 요약. 캐시에 없는 계좌만 모아서 DB 한번에 조회
+        """
+        if not self.caching:
+            return self.acc_repo.get_account_summaries(list(dict.fromkeys(account_ids)))
+        result = {}
+        missing = []
+        for aid in dict.fromkeys(account_ids):
+            summary = self.summary_cache.get(aid)
+            if summary is None:
+                missing.append(aid)
             else:
-                old_qty = pos["qty"]
-                old_avg = pos["avg_price"]
-                new_qty = old_qty + qty
-                new_avg = (old_qty * old_avg + qty * price) / new_qty
+                result[aid] = summary
 
-                self.acc_repo.update_position(account_id, symbol, new_qty, new_avg)
+        if missing:
+            for aid, summary in self.acc_repo.get_account_summaries(missing).items():
+                self.summary_cache.set(aid, summary)
+                result[aid] = summary
 
-        else:  # SELL
-            if not pos:
-                return
+        return result
 
-            old_qty = pos["qty"]
-            new_qty = old_qty - qty
+    # -----------------------------------
+    # 유저 계좌 목록 (read-through 캐시)
+    # -----------------------------------
+    def get_accounts_by_user(self, user_id: int):
+        if not self.caching:
+            return self.acc_repo.get_accounts_by_user(user_id)
+        rows = self.list_cache.get(user_id)
+        if rows is None:
+            rows = self.acc_repo.get_accounts_by_user(user_id)
+            self.list_cache.set(user_id, rows)
+        return rows
 
-            if new_qty <= 0:
-                self.acc_repo.delete_position(account_id, symbol)
-            else:
-                self.acc_repo.update_position(
-                    account_id, symbol, new_qty, pos["avg_price"]
-                )
+    # -----------------------------------
+    # 캐시 무효화 / 통계
+    # -----------------------------------
+    def invalidate(self, user_id: int | None, account_id: int):
+        self.summary_cache.pop(account_id)
+        if user_id is not None:
+            self.list_cache.pop(user_id)   # 목록에 balance 가 포함됨
+
+    def invalidate_nets(self, nets):
+        keys = [(n.user_id, n.account_id) for n in nets]
+        for user_id, account_id in keys:
+            self.invalidate(user_id, account_id)
+        for fn in self.listeners:
+            try:
+                fn(keys)
+            except Exception as e:
+                print("[AccountService] listener error:", e)
+
+    def set_caching(self, enabled: bool):
+        """
+        무효화를 못 받는 동안(원격 엔진 연결 끊김 등)은 캐시 없이 DB 조회
+        켜고 끌 때 모두 기존 캐시 비움
+        """
+        self.caching = enabled
+        self.summary_cache.clear()
+        self.list_cache.clear()
+
+    def cache_stats(self) -> dict:
+        return {
+            "caching": self.caching,
+            "summary": self.summary_cache.stats(),
+            "list": self.list_cache.stats(),
+        }
@@ -0,0 +1,103 @@
+# services/archive_job.py
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+
+class ArchiveJob:
+    """
+    백그라운드 아카이브 잡
+      0) DEFAULT 파티션에 쌓인 row 를 월 파티션으로 (이게 남아 있으면 1 에서 파티션 생성 실패)
+      1) 앞으로 쓸 월 파티션 미리 생성 (DEFAULT 파티션에 쌓이지 않도록)
+      2) 파티션 전환 전 row (*_legacy) 를 배치로 이관, 다 옮기면 legacy 삭제
+      3) 종결 후 retain_days 지난 주문 / 체결 → *_archive (cold) 로 이동
+      4) 비어버린 과거 hot 파티션 제거
+    hot 테이블에는 working set + 최근 N일만 남으므로
+    오더북/미체결 조회 비용이 전체 이력 크기와 무관해진다.
+
+    매칭 경로와 커넥션을 공유하지 않도록 전용 커넥션의 repo 를 받는다.
+    """
+
+    def __init__(self, archive_repo,
+                 retain_days: int | None = None,
+                 interval: float | None = None,
+                 batch_size: int = 5000):
+        self.repo = archive_repo
+        self.retain_days = retain_days or int(os.getenv("ARCHIVE_RETAIN_DAYS", "30"))
+        self.interval = interval or float(os.getenv("ARCHIVE_INTERVAL_SEC", "3600"))
+        self.batch_size = batch_size
+
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_result = None
+
+    # ---------------------------------------------------------
+    # 1회 실행
+    # ---------------------------------------------------------
+    def run_once(self) -> dict:
+        if not self.repo.try_lock():
+            return {"skipped": True}
+
+        try:
+            cutoff = datetime.now(timezone.utc) - timedelta(days=self.retain_days)
+            drained = self.repo.drain_default_partitions()
+            self.repo.ensure_partitions()
+
+            backfilled = {}
+            for table in self.repo.HOT_TABLES:
+                while not self._stop.is_set():
+                    n = self.repo.backfill_legacy(table, self.batch_size)
+                    if n is None:
+                        break
+                    backfilled[table] = backfilled.get(table, 0) + n
+                    if n == 0:
+                        break
+
+            orders = trades = 0
+            while not self._stop.is_set():
+                n = self.repo.archive_orders(cutoff, self.batch_size)
+                orders += n
+                if n < self.batch_size:
+                    break
+            while not self._stop.is_set():
+                n = self.repo.archive_trades(cutoff, self.batch_size)
+                trades += n
+                if n < self.batch_size:
+                    break
+
+            dropped = self.repo.drop_empty_partitions(cutoff)
+
+            self.last_result = {
+                "cutoff": cutoff.isoformat(),
+                "default_drained": drained,
+                "legacy_backfilled": backfilled,
+                "orders_archived": orders,
+                "trades_archived": trades,
+                "partitions_dropped": dropped,
+            }
+            return self.last_result
+
+        finally:
+            self.repo.unlock()
+
+    # ---------------------------------------------------------
+    # 주기 실행
+    # ---------------------------------------------------------
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="archive-job", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                result = self.run_once()
+                print("[ArchiveJob]", result)
+            except Exception as e:
+                self.repo.conn.rollback()
+                print("[ArchiveJob] error:", e)
+            self._stop.wait(self.interval)
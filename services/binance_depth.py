@@ -4,6 +4,7 @@ import requests
 class BinanceDepthService:
     def __init__(self):
         self.base = "https://api.binance.com/api/v3/depth"
+        self.info_url = "https://api.binance.com/api/v3/exchangeInfo"
 
     def get_depth(self, symbol: str, limit=15):
         symbol = symbol.upper()
@@ -31,3 +32,20 @@ class BinanceDepthService:
         except Exception as e:
             print("[BinanceDepthService] error:", e)
             return {"bids": [], "asks": [], "mid": 0}
+
+    # ---------------------------------------------------
+    # 심볼 tick size (PRICE_FILTER), 실패 시 None
+    # ---------------------------------------------------
+    def get_tick_size(self, symbol: str):
+        try:
+            r = requests.get(self.info_url, params={"symbol": symbol.upper()}, timeout=2)
+            r.raise_for_status()
+
+            for f in r.json()["symbols"][0]["filters"]:
+                if f["filterType"] == "PRICE_FILTER":
+                    return float(f["tickSize"])
+            return None
+
+        except Exception as e:
+            print("[BinanceDepthService] tick size error:", e)
+            return None
@@ -0,0 +1,101 @@
+# services/call_auction.py
+try:
+    import numpy as np
+except ImportError:  # call auction 은 numpy 필수 (엔진 연속 매칭은 무관)
+    np = None
+
+# 수량은 1e-8 단위 정수로 바꿔서 계산 (누적합/동점 비교에 float 오차 없음)
+QTY_SCALE = 10 ** 8
+
+
+def uncross(bids: list, asks: list, reference_price: float | None = None) -> dict | None:
+    """
+    단일가(call auction) 체결 계산
+
+    bids / asks : 가격-시간 우선순위로 정렬된 주문 dict 리스트 (OrderBook.bids / asks)
+    reference_price : 마지막 체결가 등 (tie-breaker 3단계)
+
+    1) 호가 가격 격자 위에서 누적 수요(가격 이상 매수) / 누적 공급(가격 이하 매도) 곡선
+    2) 체결량 = min(수요, 공급) 이 최대인 가격
+       동점이면 ① 잔량 불균형 최소 ② 시장 압력 (전부 매수 우위면 높은 가격, 전부 매도 우위면 낮은 가격)
+       ③ reference_price 에 가장 가까운 가격 (없으면 후보 구간 중앙)
+    3) 체결 가능 주문은 정렬 순서상 prefix → 누적합으로 시간 우선 배분을 한번에 계산
+    4) 매수/매도 누적 배분 경계를 합쳐서 체결 쌍 (buy idx, sell idx, qty) 생성
+
+    반환: None (교차 없음) 또는
+      {price, volume, imbalance, buy_fill, sell_fill, pairs}
+      buy_fill/sell_fill : 주문별 체결 수량 (정렬 순서, 청산가격 조건을 만족하는 prefix 길이까지만)
+      pairs              : [(bid index, ask index, qty)]
+    """
+    if np is None:
+        raise RuntimeError("call auction requires numpy")
+    if not bids or not asks or bids[0]["price"] < asks[0]["price"]:
+        return None
+
+    bp = np.fromiter((o["price"] for o in bids), dtype=np.float64, count=len(bids))
+    ap = np.fromiter((o["price"] for o in asks), dtype=np.float64, count=len(asks))
+    bq = np.rint(np.fromiter((o["remaining_qty"] for o in bids), dtype=np.float64,
+                             count=len(bids)) * QTY_SCALE).astype(np.int64)
+    aq = np.rint(np.fromiter((o["remaining_qty"] for o in asks), dtype=np.float64,
+                             count=len(asks)) * QTY_SCALE).astype(np.int64)
+
+    # ---------- 가격 격자 위 누적 수요/공급 ----------
+    #  bids 는 가격 DESC, asks 는 가격 ASC 이므로 누적합 + searchsorted 로 끝 (정수 연산)
+    grid = np.unique(np.concatenate((bp, ap)))
+    cum_b = np.concatenate(([0], bq.cumsum()))
+    cum_a = np.concatenate(([0], aq.cumsum()))
+    demand = cum_b[np.searchsorted(-bp, -grid, side="right")]
+    supply = cum_a[np.searchsorted(ap, grid, side="right")]
+
+    executable = np.minimum(demand, supply)
+    volume = int(executable.max())
+    if volume <= 0:
+        return None
+
+    # ---------- 청산 가격 선택 ----------
+    cand = np.flatnonzero(executable == volume)
+
+    surplus = demand[cand] - supply[cand]
+    imbalance = np.abs(surplus)
+    cand = cand[imbalance == imbalance.min()]
+    surplus = demand[cand] - supply[cand]
+
+    if len(cand) == 1:
+        idx = cand[0]
+    elif (surplus > 0).all():
+        idx = cand[-1]
+    elif (surplus < 0).all():
+        idx = cand[0]
+    else:
+        ref = reference_price if reference_price is not None else (grid[cand[0]] + grid[cand[-1]]) / 2
+        idx = cand[np.argmin(np.abs(grid[cand] - ref))]
+
+    price = float(grid[idx])
+
+    # ---------- 시간 우선 배분 (prefix 누적합) ----------
+    buy_fill = _allocate(bq[: int(np.count_nonzero(bp >= price))], volume)
+    sell_fill = _allocate(aq[: int(np.count_nonzero(ap <= price))], volume)
+
+    # ---------- 체결 쌍 ----------
+    cb = buy_fill.cumsum()
+    cs = sell_fill.cumsum()
+    cuts = np.union1d(cb, cs)
+    cuts = cuts[cuts > 0]
+    seg = np.diff(cuts, prepend=0)
+    bi = np.searchsorted(cb, cuts)
+    si = np.searchsorted(cs, cuts)
+
+    return {
+        "price": price,
+        "volume": volume / QTY_SCALE,
+        "imbalance": int(demand[idx] - supply[idx]) / QTY_SCALE,
+        "buy_fill": buy_fill / QTY_SCALE,
+        "sell_fill": sell_fill / QTY_SCALE,
+        "pairs": list(zip(bi.tolist(), si.tolist(), (seg / QTY_SCALE).tolist())),
+    }
+
+
+def _allocate(qty, volume: int):
+    """우선순위 순서대로 volume 을 채울 때 주문별 체결 수량"""
+    before = qty.cumsum() - qty
+    return np.clip(volume - before, 0, qty)
@@ -2,6 +2,7 @@
 import os
 import random
 import hashlib
+from contextlib import contextmanager
 from decimal import Decimal
 
 import psycopg2
@@ -12,24 +13,17 @@ class LoginDB:
     """
     - 회원가입 / 로그인 / 계좌개설 전용 DB 헬퍼
     - HTS 쪽 DBService에서 쓰던 로직을 API 서버용으로 옮긴 버전
+    - 커넥션은 공용 풀(DBPool)에서 조회마다 빌려 씀 (생성 시 접속하지 않음)
     """
 
-    def __init__(
-        self,
-        host: str = "postgres",     # 도커 내에서는 서비스 이름
-        dbname: str = "myhts",
-        user: str = "myhts",
-        password: str = "myhts_pw",
-        port: int = 5432,
-    ):
-        self.conn = psycopg2.connect(
-            host=host,
-            dbname=dbname,
-            user=user,
-            password=password,
-            port=port,
-        )
-        self.conn.autocommit = True
+    def __init__(self, pool):
+        self.pool = pool
+
+    @contextmanager
+    def _cursor(self):
+        with self.pool.connection(autocommit=True) as conn:
+            with conn.cursor() as cur:
+                yield cur
 
     # -----------------------------
     # 회원 관련
@@ -39,7 +33,7 @@ class LoginDB:
         새 유저 생성 (회원가입)
         """
         pw_hash = hashlib.sha256(password.encode()).hexdigest()
-        with self.conn.cursor() as cur:
+        with self._cursor() as cur:
             try:
                 cur.execute(
                     """
@@ -57,7 +51,7 @@ class LoginDB:
         """
         이메일로 user_id 조회
         """
-        with self.conn.cursor() as cur:
+        with self._cursor() as cur:
             cur.execute("SELECT id FROM users WHERE email=%s", (email,))
             row = cur.fetchone()
             return row[0] if row else None
@@ -67,7 +61,7 @@ class LoginDB:
         로그인용: 이메일 + 비밀번호 검증 후 user_id 반환 (실패 시 None)
         """
         pw_hash = hashlib.sha256(password.encode()).hexdigest()
-        with self.conn.cursor() as cur:
+        with self._cursor() as cur:
             cur.execute(
                 "SELECT id, pw_hash FROM users WHERE email=%s",
                 (email,),
@@ -85,8 +79,19 @@ class LoginDB:
     # -----------------------------
     # 계좌 관련
     # -----------------------------
+    def get_account_ids_by_user(self, user_id: int) -> list[int]:
+        """
+        유저가 보유한 계좌 id 목록 (토큰 claims 용)
+        """
+        with self._cursor() as cur:
+            cur.execute(
+                "SELECT id FROM accounts WHERE user_id=%s ORDER BY id",
+                (user_id,),
+            )
+            return [row[0] for row in cur.fetchall()]
+
     def _account_no_exists(self, account_no: str) -> bool:
-        with self.conn.cursor() as cur:
+        with self._cursor() as cur:
             cur.execute(
                 "SELECT 1 FROM accounts WHERE account_no=%s",
                 (account_no,),
@@ -103,6 +108,3 @@ class LoginDB:
             if not self._account_no_exists(acc):
                 print("[LoginDB] generate_account_no:", acc)
                 return acc
-
-    def close(self):
-        self.conn.close()
@@ -12,6 +12,34 @@ class MatchingDB:
     - orders / trades / accounts / positions 테이블만 다룸
     """
 
+    # working set 조회 (partial index 대상, db_migrations.check_index_usage 참고)
+    ACTIVE_SYMBOLS_SQL = """
+        SELECT symbol
+        FROM orders
+        WHERE status IN ('WORKING','PARTIAL')
+        UNION
+        SELECT symbol
+        FROM orders
+        WHERE status = 'PENDING';
+    """
+
+    WORKING_ORDERS_SQL = """
+        SELECT *
+        FROM orders
+        WHERE symbol = %s
+          AND status IN ('WORKING','PARTIAL')
+        ORDER BY created_at ASC;
+    """
+
+    # 발동 대기 stop 주문 (ix_orders_pending_stop)
+    PENDING_STOPS_SQL = """
+        SELECT *
+        FROM orders
+        WHERE symbol = %s
+          AND status = 'PENDING'
+        ORDER BY id ASC;
+    """
+
     def __init__(
         self,
         host: str | None = None,
@@ -19,6 +47,7 @@ class MatchingDB:
         user: str | None = None,
         password: str | None = None,
         port: int | None = None,
+        conn=None,
     ):
         self.host = host or os.getenv("DB_HOST", "host.docker.internal")
         self.dbname = dbname or os.getenv("DB_NAME", "myhts")
@@ -26,7 +55,8 @@ class MatchingDB:
         self.password = password or os.getenv("DB_PASSWORD", "myhts_pw")
         self.port = port or int(os.getenv("DB_PORT", "5432"))
 
-        self.conn = psycopg2.connect(
+        # conn 을 받으면 그대로 사용 (DBPool 에서 빌린 커넥션)
+        self.conn = conn or psycopg2.connect(
             host=self.host,
             dbname=self.dbname,
             user=self.user,
@@ -88,17 +118,11 @@ class MatchingDB:
     # ---------- 공용 유틸 ----------
 
     def get_active_symbols(self) -> list[str]:
-        """WORKING/PARTIAL 주문이 존재하는 심볼 목록"""
+        """WORKING/PARTIAL 주문 또는 발동 대기 stop 주문이 존재하는 심볼 목록"""
         from psycopg2.extras import DictCursor
 
         with self.conn.cursor(cursor_factory=DictCursor) as cur:
-            cur.execute(
-                """
-                SELECT DISTINCT symbol
-                FROM orders
-                WHERE status IN ('WORKING','PARTIAL');
-                """
-            )
+            cur.execute(self.ACTIVE_SYMBOLS_SQL)
             return [row["symbol"] for row in cur.fetchall()]
 
     # ---------- 매칭에 필요한 쿼리들 ----------
@@ -110,16 +134,13 @@ class MatchingDB:
          MatchingEngine 쪽에서 side별로 나눠서 처리)
         """
         with self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-            cur.execute(
-                """
-                SELECT *
-                FROM orders
-                WHERE symbol = %s
-                  AND status IN ('WORKING','PARTIAL')
-                ORDER BY created_at ASC;
-                """,
-                (symbol,),
-            )
+            cur.execute(self.WORKING_ORDERS_SQL, (symbol,))
+            return cur.fetchall()
+
+    def fetch_pending_stops(self, symbol: str):
+        """해당 심볼의 발동 대기(PENDING) stop / stop-limit 주문 (접수 순)"""
+        with self.conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            cur.execute(self.PENDING_STOPS_SQL, (symbol,))
             return cur.fetchall()
 
     def insert_trade_record(self, buy, sell, symbol: str, price: float, qty: float):
@@ -152,83 +173,6 @@ class MatchingDB:
                 (remaining_qty, status, order_id),
             )
 
-    def update_account_balance(self, account_id: int, delta: float):
-        """accounts.balance += delta"""
-        with self.conn.cursor() as cur:
-            cur.execute(
-                "UPDATE accounts SET balance = balance + %s WHERE id = %s;",
-                (delta, account_id),
-            )
-
-    def update_position_on_trade(
-        self,
-        account_id: int,
-        user_id: int,
-        symbol: str,
-        side: str,
-        price: float,
-        qty: float,
-    ):
-        """
-        DBService.update_position_on_trade 를 거의 그대로 가져온 버전.
-        (SimAccount 없이 순수 DB만 갱신)
-        """
-        conn = self.conn
-        side = side.upper()
-        try:
-            with conn.cursor() as cur:
-                # 기존 포지션 조회
-                cur.execute(
-                    "SELECT qty, avg_price FROM positions WHERE account_id=%s AND symbol=%s;",
-                    (account_id, symbol),
-                )
-                row = cur.fetchone()
-
-                if row:
-                    old_qty, old_avg = float(row[0]), float(row[1])
-                else:
-                    old_qty, old_avg = 0.0, 0.0
-
-                new_qty = old_qty
-                new_avg = old_avg
-
-                if side == "BUY":
-                    total_cost = old_qty * old_avg + qty * price
-                    new_qty = old_qty + qty
-                    new_avg = total_cost / new_qty if new_qty > 0 else 0.0
-                elif side == "SELL":
-                    new_qty = old_qty - qty
-                    if new_qty < 0:
-                        new_qty = 0.0  # 공매도 미지원 가정
-                    # 평균단가는 매도 시 유지
-
-                if row:
-                    if new_qty > 0:
-                        cur.execute(
-                            """
-                            UPDATE positions
-                            SET qty=%s, avg_price=%s, updated_at=now()
-                            WHERE account_id=%s AND symbol=%s;
-                            """,
-                            (new_qty, new_avg, account_id, symbol),
-                        )
-                    else:
-                        cur.execute(
-                            "DELETE FROM positions WHERE account_id=%s AND symbol=%s;",
-                            (account_id, symbol),
-                        )
-                else:
-                    cur.execute(
-                        """
-                        INSERT INTO positions (user_id, account_id, symbol, qty, avg_price, updated_at)
-                        VALUES (%s, %s, %s, %s, %s, now());
-                        """,
-                        (user_id, account_id, symbol, qty, price),
-                    )
-        except Exception as e:
-            print("[MatchingDB] update_position_on_trade error:", e)
-            raise
-
     # def get_trades_by_user(self, user_id: int, limit: int = 100):
     #     """
     #     trades 테이블 기준으로 특정 사용자의 체결내역 조회
@@ -0,0 +1,418 @@
+# services/db_migrations.py
+"""
+버전 관리되는 스키마 마이그레이션.
+- schema_migrations 테이블에 적용된 버전을 기록
+- 서버 시작 시 apply_migrations(conn) 으로 미적용분만 순서대로 실행
+- 여러 워커가 동시에 떠도 advisory lock 으로 한 곳에서만 적용
+
+사용 예:
+    python -m services.db_migrations            # 마이그레이션 적용
+    python -m services.db_migrations --check    # working set 쿼리 EXPLAIN 검사
+"""
+import json
+import os
+import sys
+
+import psycopg2
+
+from repositories.order_repository import OrderRepository
+from repositories.trade_repositories import TradeRepository
+from services.db_matching import MatchingDB
+
+# pg_advisory_xact_lock 키 (임의 상수)
+MIGRATION_LOCK_KEY = 727_001
+
+
+# ---------------------------------------------------------
+# 마이그레이션 목록 (version, name, sql) — 추가만 하고 수정하지 않는다
+# ---------------------------------------------------------
+MIGRATIONS = [
+    (1, "working_set_partial_indexes", """
+        -- 체결 netting upsert (ON CONFLICT (account_id, symbol)) 용
+        CREATE UNIQUE INDEX IF NOT EXISTS ux_positions_account_symbol
+            ON positions (account_id, symbol);
+
+        -- 오더북 집계 / 활성 심볼: 미체결 주문만 대상
+        CREATE INDEX IF NOT EXISTS ix_orders_working_book
+            ON orders (symbol, side, price)
+            WHERE status IN ('WORKING','PARTIAL');
+
+        -- 매칭엔진 working order 로딩 (심볼별 시간순)
+        CREATE INDEX IF NOT EXISTS ix_orders_working_symbol_time
+            ON orders (symbol, created_at)
+            WHERE status IN ('WORKING','PARTIAL');
+
+        -- 유저 미체결 조회
+        CREATE INDEX IF NOT EXISTS ix_orders_working_user
+            ON orders (user_id, created_at DESC)
+            WHERE status IN ('WORKING','PARTIAL');
+
+        -- 체결내역 조회 경로: 유저 주문 → trades
+        CREATE INDEX IF NOT EXISTS ix_orders_user
+            ON orders (user_id);
+        CREATE INDEX IF NOT EXISTS ix_trades_buy_order
+            ON trades (buy_order_id);
+        CREATE INDEX IF NOT EXISTS ix_trades_sell_order
+            ON trades (sell_order_id);
+        CREATE INDEX IF NOT EXISTS ix_trades_time
+            ON trades (trade_time DESC);
+    """),
+
+    (2, "monthly_partitions_and_archive", """
+        -- 월 단위 파티션 생성 헬퍼 (아카이브 잡에서도 사용)
+        --  DEFAULT 파티션에 이 달 row 가 있으면 PARTITION OF 로 바로 만들 수 없으므로
+        --  빈 테이블로 만들어 DEFAULT 의 해당 월 row 를 옮긴 뒤 ATTACH
+        CREATE OR REPLACE FUNCTION ensure_month_partition(parent text, month date)
+        RETURNS void AS $fn$
+        DECLARE
+            start_d  date := date_trunc('month', month)::date;
+            end_d    date := (date_trunc('month', month) + interval '1 month')::date;
+            part     text := format('%s_p%s', parent, to_char(start_d, 'YYYY_MM'));
+            dflt     text := parent || '_default';
+            key      text;
+            has_rows boolean := false;
+        BEGIN
+            IF to_regclass(part) IS NOT NULL THEN
+                RETURN;
+            END IF;
+
+            IF to_regclass(dflt) IS NOT NULL THEN
+                SELECT a.attname INTO key
+                FROM pg_partitioned_table pt
+                JOIN pg_attribute a ON a.attrelid = pt.partrelid AND a.attnum = pt.partattrs[0]
+                WHERE pt.partrelid = parent::regclass;
+
+                EXECUTE format('SELECT EXISTS (SELECT 1 FROM %I WHERE %I >= %L AND %I < %L)',
+                               dflt, key, start_d, key, end_d) INTO has_rows;
+            END IF;
+
+            IF NOT has_rows THEN
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                    part, parent, start_d, end_d
+                );
+                RETURN;
+            END IF;
+
+            EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                           part, parent);
+            EXECUTE format(
+                'WITH moved AS (DELETE FROM %I WHERE %I >= %L AND %I < %L RETURNING *) '
+                'INSERT INTO %I SELECT * FROM moved',
+                dflt, key, start_d, key, end_d, part);
+            EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                           parent, part, start_d, end_d);
+        END
+        $fn$ LANGUAGE plpgsql;
+
+        -- 기존 일반 테이블 → RANGE 파티션 테이블로 교체
+        --  (PK 는 파티션 키 포함: (id, created_at) / (id, trade_time))
+        --  - 이 테이블을 참조하던 FK (예: trades.buy_order_id → orders.id) 는 제거한다.
+        --    파티션 테이블에서는 id 단독 unique 를 만들 수 없어 다시 걸 수 없음 (NOTICE 로 남김)
+        --  - 이 테이블이 참조하던 FK (accounts / users 등) 는 새 테이블에 다시 생성
+        --  - 기동 트랜잭션에서는 hot_where 에 맞는 row (미체결 주문 / 최근 체결) 만 옮기고
+        --    나머지는 <tbl>_legacy 에 남겨 ArchiveJob 이 배치로 옮긴 뒤 삭제
+        --    (그 사이 과거 체결/종결 주문 조회에는 아직 안 옮겨진 row 가 빠질 수 있음)
+        CREATE OR REPLACE FUNCTION _partition_table(tbl text, key text, hot_where text)
+        RETURNS void AS $fn$
+        DECLARE
+            legacy text := tbl || '_legacy';
+            seq    text;
+            fk     record;
+            idx    record;
+            m      date;
+            last_m date := (date_trunc('month', now()) + interval '2 month')::date;
+        BEGIN
+            IF (SELECT relkind FROM pg_class WHERE oid = tbl::regclass) = 'p' THEN
+                RETURN;
+            END IF;
+
+            FOR fk IN
+                SELECT conname, conrelid::regclass AS src
+                FROM pg_constraint
+                WHERE confrelid = tbl::regclass AND contype = 'f'
+            LOOP
+                RAISE NOTICE 'dropping FK %.% (references %, not recreatable after partitioning)',
+                    fk.src, fk.conname, tbl;
+                EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', fk.src, fk.conname);
+            END LOOP;
+
+            EXECUTE format('ALTER TABLE %I RENAME TO %I', tbl, legacy);
+            EXECUTE format(
+                'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+                'PARTITION BY RANGE (%I)', tbl, legacy, key);
+
+            seq := pg_get_serial_sequence(legacy, 'id');
+            IF seq IS NOT NULL THEN
+                EXECUTE format('ALTER SEQUENCE %s OWNED BY %I.id', seq, tbl);
+            END IF;
+
+            m := date_trunc('month', now())::date;
+            WHILE m <= last_m LOOP
+                PERFORM ensure_month_partition(tbl, m);
+                m := (m + interval '1 month')::date;
+            END LOOP;
+            EXECUTE format('CREATE TABLE %I PARTITION OF %I DEFAULT', tbl || '_default', tbl);
+
+            IF hot_where IS NOT NULL THEN
+                FOR m IN EXECUTE format(
+                    'SELECT DISTINCT date_trunc(''month'', %I)::date FROM %I WHERE %s',
+                    key, legacy, hot_where)
+                LOOP
+                    PERFORM ensure_month_partition(tbl, m);
+                END LOOP;
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM %I WHERE %s RETURNING *) '
+                    'INSERT INTO %I SELECT * FROM moved', legacy, hot_where, tbl);
+            END IF;
+
+            -- 아래 CREATE INDEX IF NOT EXISTS 가 새 테이블에 만들어지도록 legacy 인덱스 제거
+            --  (legacy 는 ArchiveJob 이 ctid 로 옮기므로 인덱스 불필요)
+            FOR idx IN
+                SELECT i.indexrelid::regclass AS name
+                FROM pg_index i
+                WHERE i.indrelid = legacy::regclass
+                  AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+            LOOP
+                EXECUTE format('DROP INDEX %s', idx.name);
+            END LOOP;
+
+            -- PK 이름이 기존 테이블과 겹치지 않도록 legacy 의 PK 는 이름을 바꿔 둠
+            IF to_regclass(tbl || '_pkey') IS NOT NULL THEN
+                EXECUTE format('ALTER INDEX %I RENAME TO %I', tbl || '_pkey', legacy || '_pkey');
+            END IF;
+            EXECUTE format('ALTER TABLE %I ALTER COLUMN %I SET NOT NULL', tbl, key);
+            EXECUTE format('ALTER TABLE %I ADD PRIMARY KEY (id, %I)', tbl, key);
+
+            FOR fk IN
+                SELECT conname, pg_get_constraintdef(oid) AS def
+                FROM pg_constraint
+                WHERE conrelid = legacy::regclass AND contype = 'f'
+            LOOP
+                EXECUTE format('ALTER TABLE %I ADD CONSTRAINT %I %s', tbl, fk.conname, fk.def);
+            END LOOP;
+        END
+        $fn$ LANGUAGE plpgsql;
+
+        SELECT _partition_table('orders', 'created_at',
+                                $$status IN ('WORKING','PARTIAL','PENDING')$$);
+        SELECT _partition_table('trades', 'trade_time',
+                                $$trade_time >= now() - interval '7 days'$$);
+        DROP FUNCTION _partition_table(text, text, text);
+
+        -- 001 의 인덱스를 파티션 부모에 다시 생성 (각 파티션으로 전파)
+        CREATE INDEX IF NOT EXISTS ix_orders_working_book
+            ON orders (symbol, side, price)
+            WHERE status IN ('WORKING','PARTIAL');
+        CREATE INDEX IF NOT EXISTS ix_orders_working_symbol_time
+            ON orders (symbol, created_at)
+            WHERE status IN ('WORKING','PARTIAL');
+        CREATE INDEX IF NOT EXISTS ix_orders_working_user
+            ON orders (user_id, created_at DESC)
+            WHERE status IN ('WORKING','PARTIAL');
+        CREATE INDEX IF NOT EXISTS ix_orders_user
+            ON orders (user_id);
+        CREATE INDEX IF NOT EXISTS ix_trades_buy_order
+            ON trades (buy_order_id);
+        CREATE INDEX IF NOT EXISTS ix_trades_sell_order
+            ON trades (sell_order_id);
+        CREATE INDEX IF NOT EXISTS ix_trades_time
+            ON trades (trade_time DESC);
+
+        -- 아카이브(cold) 테이블: 종결 주문 / 오래된 체결을 월 파티션으로 보관
+        CREATE TABLE IF NOT EXISTS orders_archive (LIKE orders INCLUDING DEFAULTS)
+            PARTITION BY RANGE (created_at);
+        CREATE TABLE IF NOT EXISTS orders_archive_default PARTITION OF orders_archive DEFAULT;
+        CREATE INDEX IF NOT EXISTS ix_orders_archive_id ON orders_archive (id);
+        CREATE INDEX IF NOT EXISTS ix_orders_archive_user ON orders_archive (user_id, created_at);
+
+        CREATE TABLE IF NOT EXISTS trades_archive (LIKE trades INCLUDING DEFAULTS)
+            PARTITION BY RANGE (trade_time);
+        CREATE TABLE IF NOT EXISTS trades_archive_default PARTITION OF trades_archive DEFAULT;
+        CREATE INDEX IF NOT EXISTS ix_trades_archive_buy_order ON trades_archive (buy_order_id);
+        CREATE INDEX IF NOT EXISTS ix_trades_archive_sell_order ON trades_archive (sell_order_id);
+        CREATE INDEX IF NOT EXISTS ix_trades_archive_time ON trades_archive (trade_time DESC);
+    """),
+
+    (3, "book_levels", """
+        -- 가격 레벨 집계: 엔진 배치가 delta upsert, 오더북 조회는 PK range scan
+        CREATE TABLE IF NOT EXISTS book_levels (
+            symbol     text        NOT NULL,
+            side       text        NOT NULL,
+            price      numeric     NOT NULL,
+            qty        numeric     NOT NULL,
+            cnt        integer     NOT NULL,
+            updated_at timestamptz NOT NULL DEFAULT now(),
+            PRIMARY KEY (symbol, side, price)
+        );
+
+        -- 현재 미체결 주문으로 초기값 구성
+        --  (OrderRepository.BOOK_LEVELS_REBUILD_SQL 과 같은 내용, 마이그레이션은 고정이라 복사해 둠)
+        DELETE FROM book_levels;
+        INSERT INTO book_levels (symbol, side, price, qty, cnt)
+        SELECT symbol, side, price, SUM(remaining_qty), COUNT(*)
+        FROM orders
+        WHERE status IN ('WORKING','PARTIAL')
+          AND remaining_qty > 0
+        GROUP BY symbol, side, price;
+    """),
+
+    (4, "stop_orders", """
+        -- 주문 유형 / stop 가격 (archive 도 같은 순서로 추가 → INSERT ... SELECT * 호환)
+        ALTER TABLE orders
+            ADD COLUMN IF NOT EXISTS order_type text NOT NULL DEFAULT 'LIMIT',
+            ADD COLUMN IF NOT EXISTS stop_price numeric;
+        ALTER TABLE orders_archive
+            ADD COLUMN IF NOT EXISTS order_type text NOT NULL DEFAULT 'LIMIT',
+            ADD COLUMN IF NOT EXISTS stop_price numeric;
+
+        -- 발동 대기 stop 주문 (status PENDING)
+        CREATE INDEX IF NOT EXISTS ix_orders_pending_stop
+            ON orders (symbol, side, stop_price)
+            WHERE status = 'PENDING';
+    """),
+
+    (5, "order_expiry", """
+        -- GTT/GTD 만료 시각 (NULL = GTC). 만료 처리는 엔진 타이머 휠이 하고 DB 는 기록만
+        ALTER TABLE orders         ADD COLUMN IF NOT EXISTS expire_at timestamptz;
+        ALTER TABLE orders_archive ADD COLUMN IF NOT EXISTS expire_at timestamptz;
+    """),
+]
+
+
+# ---------------------------------------------------------
+# 적용
+# ---------------------------------------------------------
+def apply_migrations(conn) -> list[int]:
+    """
+    미적용 마이그레이션을 버전 순서대로 실행하고 적용한 버전 목록을 반환
+    (버전마다 별도 트랜잭션)
+    """
+    applied_now = []
+    prev_autocommit = conn.autocommit
+    conn.autocommit = False
+
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version    integer PRIMARY KEY,
+                    name       text NOT NULL,
+                    applied_at timestamptz NOT NULL DEFAULT now()
+                );
+            """)
+        conn.commit()
+
+        for version, name, sql in MIGRATIONS:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_xact_lock(%s);", (MIGRATION_LOCK_KEY,))
+                cur.execute("SELECT 1 FROM schema_migrations WHERE version=%s;", (version,))
+                if cur.fetchone():
+                    conn.commit()
+                    continue
+
+                cur.execute(sql)
+                cur.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (%s, %s);",
+                    (version, name),
+                )
+            conn.commit()
+            applied_now.append(version)
+            print(f"[db_migrations] applied {version:03d}_{name}")
+
+    except Exception as e:
+        conn.rollback()
+        print("[db_migrations] migration error:", e)
+        raise
+
+    finally:
+        conn.autocommit = prev_autocommit
+
+    return applied_now
+
+
+# ---------------------------------------------------------
+# EXPLAIN 기반 인덱스 사용 검사
+# ---------------------------------------------------------
+# (이름, SQL, 파라미터, 기대 인덱스 중 하나)
+INDEX_CHECKS = [
+    ("get_grouped_orderbook", OrderRepository.GROUPED_ORDERBOOK_SQL,
+     {"symbol": "SOLUSDT", "depth": 20},
+     {"book_levels_pkey"}),
+    ("get_price_stats", OrderRepository.PRICE_STATS_SQL, ("SOLUSDT",),
+     {"ix_orders_working_book"}),
+    ("bucket_by_price", OrderRepository.BUCKET_BY_PRICE_SQL, ("SOLUSDT",),
+     {"ix_orders_working_book"}),
+    ("fetch_working_orders", MatchingDB.WORKING_ORDERS_SQL, ("SOLUSDT",),
+     {"ix_orders_working_symbol_time", "ix_orders_working_book"}),
+    ("fetch_pending_stops", MatchingDB.PENDING_STOPS_SQL, ("SOLUSDT",),
+     {"ix_orders_pending_stop"}),
+    ("get_active_symbols", MatchingDB.ACTIVE_SYMBOLS_SQL, None,
+     {"ix_orders_working_book", "ix_orders_working_symbol_time"}),
+    ("get_working_orders_by_user", OrderRepository.WORKING_BY_USER_SQL, (1, 100),
+     {"ix_orders_working_user"}),
+    ("get_trades_by_user", TradeRepository.TRADES_BY_USER_SQL,
+     {"user_id": 1, "limit": 100, "since": None},
+     {"ix_trades_buy_order", "ix_trades_sell_order", "ix_trades_time"}),
+]
+
+
+def _plan_indexes(node, found: set):
+    name = node.get("Index Name")
+    if name:
+        found.add(name)
+    for child in node.get("Plans", []):
+        _plan_indexes(child, found)
+
+
+def check_index_usage(conn) -> list[dict]:
+    """
+    working set 쿼리들이 partial index 를 쓸 수 있는지 EXPLAIN 으로 확인.
+    데이터가 적은 개발 DB 에서는 seq scan 이 더 싸게 나오므로
+    enable_seqscan=off 로 "인덱스를 탈 수 있는지(조건이 맞는지)"를 본다.
+    """
+    results = []
+    with conn.cursor() as cur:
+        cur.execute("SET LOCAL enable_seqscan = off;")
+        for name, sql, params, expected in INDEX_CHECKS:
+            cur.execute("EXPLAIN (FORMAT JSON) " + sql.strip().rstrip(";"), params)
+            plan = cur.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+
+            used = set()
+            _plan_indexes(plan[0]["Plan"], used)
+            results.append({
+                "query": name,
+                "ok": bool(used & expected),
+                "indexes": sorted(used),
+                "expected": sorted(expected),
+            })
+    conn.rollback()
+    return results
+
+
+def _connect():
+    return psycopg2.connect(
+        host=os.getenv("DB_HOST", "localhost"),
+        dbname=os.getenv("DB_NAME", "myhts"),
+        user=os.getenv("DB_USER", "myhts"),
+        password=os.getenv("DB_PASSWORD", "myhts_pw"),
+        port=int(os.getenv("DB_PORT", "5432")),
+    )
+
+
+if __name__ == "__main__":
+    conn = _connect()
+    try:
+        apply_migrations(conn)
+
+        if "--check" in sys.argv:
+            failed = 0
+            for r in check_index_usage(conn):
+                mark = "OK  " if r["ok"] else "FAIL"
+                print(f"{mark} {r['query']:<28} uses={r['indexes']} expected={r['expected']}")
+                failed += 0 if r["ok"] else 1
+            sys.exit(1 if failed else 0)
+    finally:
+        conn.close()
@@ -0,0 +1,195 @@
+# services/db_pool.py
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+
+from services.request_trace import TracingConnection
+
+
+class PoolTimeout(RuntimeError):
+    """풀 커넥션을 timeout 안에 못 빌림"""
+
+
+class DBPool:
+    """
+    프로세스 공용 Postgres 커넥션 풀
+    - 생성만으로는 접속하지 않음 → open() 에서 접속 (import 시점 DB I/O 없음)
+    - connection() : 요청 단위로 빌려 쓰고 반납 (로그인 / 워밍업 조회 등)
+    - reserve()    : 트랜잭션을 길게 쥐는 전용 커넥션 (엔진 repo, 아카이브 잡)
+    - repo()       : 메서드 호출마다 connection() 으로 빌려 쓰는 repo (API 조회)
+    - 풀이 다 차면 timeout 까지 대기 후 PoolTimeout
+    - 커넥션은 TracingConnection (느린 요청 기록 시 SQL 문 수집)
+    """
+
+    def __init__(self, minconn: int | None = None, maxconn: int | None = None,
+                 timeout: float | None = None,
+                 host: str | None = None, dbname: str | None = None,
+                 user: str | None = None, password: str | None = None,
+                 port: int | None = None):
+        self.minconn = minconn or int(os.getenv("DB_POOL_MIN", "1"))
+        self.maxconn = maxconn or int(os.getenv("DB_POOL_MAX", "10"))
+        self.timeout = timeout or float(os.getenv("DB_POOL_TIMEOUT", "5"))
+
+        self.dsn = {
+            "host": host or os.getenv("DB_HOST", "host.docker.internal"),
+            "dbname": dbname or os.getenv("DB_NAME", "myhts"),
+            "user": user or os.getenv("DB_USER", "myhts"),
+            "password": password or os.getenv("DB_PASSWORD", "myhts_pw"),
+            "port": port or int(os.getenv("DB_PORT", "5432")),
+            "connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", "5")),
+        }
+
+        self.pool = None
+        self._slots = threading.BoundedSemaphore(self.maxconn)
+        self._open_lock = threading.Lock()
+
+        # 모니터링
+        self.in_use = 0
+        self.reserved = 0
+        self.waits = 0
+
+    # ---------------------------------------------------------
+    # 접속
+    # ---------------------------------------------------------
+    def open(self, retries: int = 0, backoff: float = 1.0):
+        """minconn 개 접속 (실패 시 retries 번까지 backoff 간격으로 재시도)"""
+        with self._open_lock:
+            if self.pool is not None:
+                return
+            attempt = 0
+            while True:
+                try:
+                    self.pool = ThreadedConnectionPool(
+                        self.minconn, self.maxconn,
+                        connection_factory=TracingConnection, **self.dsn,
+                    )
+                    return
+                except psycopg2.OperationalError as e:
+                    attempt += 1
+                    if attempt > retries:
+                        raise
+                    print(f"[DBPool] connect failed ({attempt}/{retries}):", e)
+                    time.sleep(backoff)
+
+    @property
+    def is_open(self) -> bool:
+        return self.pool is not None
+
+    def _get(self):
+        if self.pool is None:
+            raise ConnectionError("db pool is not open")
+        if not self._slots.acquire(blocking=False):
+            self.waits += 1
+            if not self._slots.acquire(timeout=self.timeout):
+                raise PoolTimeout(f"no free db connection in {self.timeout}s")
+        try:
+            conn = self.pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+        return conn
+
+    def _put(self, conn, close: bool = False):
+        try:
+            self.pool.putconn(conn, close=close or conn.closed != 0)
+        finally:
+            self._slots.release()
+
+    # ---------------------------------------------------------
+    # 빌려 쓰기
+    # ---------------------------------------------------------
+    @contextmanager
+    def connection(self, autocommit: bool = False):
+        conn = self._get()
+        self.in_use += 1
+        broken = False
+        try:
+            if conn.autocommit != autocommit:
+                conn.autocommit = autocommit
+            yield conn
+            if not autocommit:
+                conn.commit()
+        except psycopg2.InterfaceError:
+            broken = True
+            raise
+        except Exception:
+            if not autocommit and not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            self.in_use -= 1
+            self._put(conn, close=broken)
+
+    def reserve(self, autocommit: bool = False):
+        """전용 커넥션 (release() 전까지 풀로 돌아오지 않음)"""
+        conn = self._get()
+        conn.autocommit = autocommit
+        self.reserved += 1
+        return conn
+
+    def release(self, conn):
+        self.reserved -= 1
+        if not conn.closed and not conn.autocommit:
+            conn.rollback()
+        self._put(conn)
+
+    def repo(self, repo_cls):
+        """repo_cls(conn) 를 호출 1건 단위로 풀 커넥션에서 실행하는 프록시"""
+        return PooledRepository(self, repo_cls)
+
+    # ---------------------------------------------------------
+    # 상태
+    # ---------------------------------------------------------
+    def ping(self) -> bool:
+        try:
+            with self.connection(autocommit=True) as conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+                    cur.fetchone()
+            return True
+        except Exception as e:
+            print("[DBPool] ping error:", e)
+            return False
+
+    def stats(self) -> dict:
+        return {
+            "open": self.is_open,
+            "max": self.maxconn,
+            "in_use": self.in_use,
+            "reserved": self.reserved,
+            "waits": self.waits,
+        }
+
+    def close(self):
+        with self._open_lock:
+            if self.pool is not None:
+                self.pool.closeall()
+                self.pool = None
+
+
+class PooledRepository:
+    """
+    repo 메서드 호출 1건 = 풀 커넥션 1개 (호출 끝나면 커밋 후 반납)
+    - 요청 스레드끼리 커넥션/트랜잭션을 공유하지 않음
+    - 여러 호출을 한 트랜잭션으로 묶어야 하면 pool.connection() 으로 직접 repo 생성
+    """
+
+    def __init__(self, pool: DBPool, repo_cls):
+        self.pool = pool
+        self.repo_cls = repo_cls
+
+    def __getattr__(self, name):
+        attr = getattr(self.repo_cls, name)
+        if not callable(attr):
+            return attr         # SQL 상수 등
+
+        def call(*args, **kwargs):
+            with self.pool.connection() as conn:
+                return getattr(self.repo_cls(conn), name)(*args, **kwargs)
+
+        call.__name__ = name
+        return call
@@ -0,0 +1,260 @@
+# services/depth_aggregator.py
+import os
+import threading
+
+try:
+    import numpy as np
+except ImportError:  # numpy 없으면 순수 파이썬 merge 만 사용
+    np = None
+
+from services.request_trace import stage
+from services.ttl_cache import TTLCache
+
+# Binance depth API 가 허용하는 limit 값
+BINANCE_LIMITS = (5, 10, 20, 50, 100, 500, 1000, 5000)
+
+
+class DepthAggregator:
+    """
+    Binance depth + 로컬 가격 레벨(book_levels) → 병합 오더북
+
+    - 두 소스의 가격을 심볼 tick 격자의 정수 index 로 snap (float 키 비교 없음)
+    - 둘 다 이미 가격 우선순위 순서로 정렬되어 있으므로 한 번의 선형 merge (O(n+m))
+    - 레벨 수가 numpy_min 이상이면 NumPy 로 merge / 합산 (정렬 없이 searchsorted 로 위치 계산)
+    - 결과는 (symbol, depth) 단위로 캐시 → /orderbook/merged 계열 엔드포인트가 공유
+      · Binance depth 는 ttl 동안 재사용
+      · 로컬 레벨은 version_fn(symbol) (엔진 book seq 등) 이 바뀔 때만 다시 읽음
+
+    레벨 dict: {price, qty, cnt, binance_qty, db_qty}
+      qty/cnt 는 로컬 잔량 (기존 응답 호환), binance_qty 는 외부 잔량
+    """
+
+    def __init__(self, order_repo, binance,
+                 depth: int | None = None,
+                 venues: tuple | None = None,
+                 ttl: float | None = None,
+                 numpy_min: int | None = None,
+                 default_tick: float | None = None,
+                 version_fn=None):
+        self.order_repo = order_repo
+        self.binance = binance
+        self.version_fn = version_fn
+
+        self.depth = depth or int(os.getenv("DEPTH_LEVELS", "20"))
+        self.venues = venues or tuple(
+            v.strip() for v in os.getenv("DEPTH_VENUES", "binance,local").split(",") if v.strip()
+        )
+        self.numpy_min = numpy_min or int(os.getenv("DEPTH_NUMPY_MIN", "200"))
+        self.default_tick = default_tick or float(os.getenv("DEFAULT_TICK_SIZE", "0.01"))
+
+        ttl = ttl or float(os.getenv("DEPTH_CACHE_TTL", "0.5"))
+        self.ext_cache = TTLCache(maxsize=1000, ttl=ttl)
+        self.cache = TTLCache(maxsize=1000, ttl=ttl if version_fn is None else 60.0)
+        self._ticks = {}
+        # 조회 실패로 기본 tick 을 쓴 심볼은 잠깐만 기억했다가 다시 조회
+        self._fallback_ticks = TTLCache(maxsize=1000, ttl=float(os.getenv("TICK_RETRY_SEC", "60")))
+        self._ext_stamp = 0
+
+        # 같은 심볼 캐시 miss 가 몰려도 소스 조회는 1번만
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    # ---------------------------------------------------------
+    # 병합 오더북 (캐시)
+    # ---------------------------------------------------------
+    def get(self, symbol: str, depth: int | None = None) -> dict:
+        return self.get_versioned(symbol, depth)[1]
+
+    def get_versioned(self, symbol: str, depth: int | None = None) -> tuple:
+        """
+        (version, book) — version 이 같으면 book 도 같은 객체
+        (직렬화 캐시가 version 으로 무효화 판단)
+        """
+        symbol = symbol.upper()
+        depth = depth or self.depth
+        key = (symbol, depth)
+
+        with self._symbol_lock(symbol):
+            ext = self._external(symbol, depth)
+            local_version = self.version_fn(symbol) if self.version_fn else None
+            version = (ext[0], local_version)
+
+            entry = self.cache.get(key)
+            if entry is None or entry[0] != version:
+                entry = (version, self.build(symbol, depth, ext))
+                self.cache.set(key, entry)
+        return entry
+
+    # ---------------------------------------------------------
+    # Binance depth (ttl 캐시, stamp 로 변경 판단)
+    # ---------------------------------------------------------
+    def _external(self, symbol: str, depth: int) -> tuple:
+        if "binance" not in self.venues:
+            return (0, [], [], 0.0)
+
+        limit = next((n for n in BINANCE_LIMITS if n >= depth), BINANCE_LIMITS[-1])
+        ext = self.ext_cache.get((symbol, limit))
+        if ext is None:
+            with stage("binance"):
+                b = self.binance.get_depth(symbol, limit=limit)
+            self._ext_stamp += 1
+            ext = (
+                self._ext_stamp,
+                [(p, q, 0) for p, q in b["bids"]],
+                [(p, q, 0) for p, q in b["asks"]],
+                b.get("mid", 0),
+            )
+            self.ext_cache.set((symbol, limit), ext)
+        return ext
+
+    # ---------------------------------------------------------
+    # 소스 조회 + merge (캐시 없이)
+    # ---------------------------------------------------------
+    def build(self, symbol: str, depth: int, ext: tuple | None = None) -> dict:
+        tick = self.tick_size(symbol)
+        _, ext_bids, ext_asks, mid = ext or self._external(symbol, depth)
+
+        loc_bids, loc_asks = [], []
+        if "local" in self.venues:
+            for r in self.order_repo.get_grouped_orderbook(symbol, depth):
+                row = (float(r["price"]), float(r["qty"]), int(r["cnt"]))
+                (loc_bids if r["side"].upper() == "BUY" else loc_asks).append(row)
+
+        bids = self.merge_side(ext_bids, loc_bids, tick, "BUY", depth)
+        asks = self.merge_side(ext_asks, loc_asks, tick, "SELL", depth)
+
+        if not mid and bids and asks:
+            mid = (bids[0]["price"] + asks[0]["price"]) / 2
+
+        return {
+            "symbol": symbol,
+            "tick": tick,
+            "bids": bids,
+            "asks": asks,
+            "mid": mid,
+        }
+
+    # ---------------------------------------------------------
+    # side 하나 merge
+    #  ext / loc : [(price, qty, cnt)] 가격 우선순위 순서 (BUY 내림차순, SELL 오름차순)
+    # ---------------------------------------------------------
+    def merge_side(self, ext, loc, tick: float, side: str, depth: int) -> list[dict]:
+        if np is not None and len(ext) + len(loc) >= self.numpy_min:
+            return self._merge_numpy(ext, loc, tick, side, depth)
+        return self._merge_linear(ext, loc, tick, side, depth)
+
+    def _merge_linear(self, ext, loc, tick, side, depth):
+        # BUY 는 tick index 를 음수로 바꿔서 양쪽 모두 "작을수록 우선" 으로 비교
+        sign = -1 if side == "BUY" else 1
+        ext_k = [sign * round(p / tick) for p, _, _ in ext]
+        loc_k = [sign * round(p / tick) for p, _, _ in loc]
+
+        out = []
+        i = j = 0
+        n, m = len(ext), len(loc)
+
+        while (i < n or j < m) and len(out) <= depth:
+            if j >= m or (i < n and ext_k[i] < loc_k[j]):
+                k, bq, dq, c = ext_k[i], ext[i][1], 0.0, 0
+                i += 1
+            elif i >= n or loc_k[j] < ext_k[i]:
+                k, bq, dq, c = loc_k[j], 0.0, loc[j][1], loc[j][2]
+                j += 1
+            else:
+                k, bq, dq, c = ext_k[i], ext[i][1], loc[j][1], loc[j][2]
+                i += 1
+                j += 1
+
+            # snap 후 같은 tick 으로 모인 인접 레벨은 합산
+            if out and out[-1][0] == k:
+                last = out[-1]
+                last[1] += bq
+                last[2] += dq
+                last[3] += c
+            else:
+                out.append([k, bq, dq, c])
+
+        return [
+            self._level(round(sign * k * tick, 10), bq, dq, c)
+            for k, bq, dq, c in out[:depth]
+        ]
+
+    def _merge_numpy(self, ext, loc, tick, side, depth):
+        sign = -1 if side == "BUY" else 1
+
+        def arrays(rows):
+            price = np.fromiter((r[0] for r in rows), dtype=np.float64, count=len(rows))
+            qty = np.fromiter((r[1] for r in rows), dtype=np.float64, count=len(rows))
+            cnt = np.fromiter((r[2] for r in rows), dtype=np.int64, count=len(rows))
+            return sign * np.rint(price / tick).astype(np.int64), qty, cnt
+
+        ext_k, ext_q, ext_c = arrays(ext)
+        loc_k, loc_q, loc_c = arrays(loc)
+
+        # 양쪽 다 정렬돼 있으므로 merge 후 위치 = 자기 index + 상대편에서 앞서는 개수
+        #  (같은 key 는 ext 가 먼저) → 정렬 없이 두 배열을 한 줄로
+        ext_pos = np.arange(len(ext_k)) + np.searchsorted(loc_k, ext_k, side="left")
+        loc_pos = np.arange(len(loc_k)) + np.searchsorted(ext_k, loc_k, side="right")
+
+        merged = np.empty(len(ext_k) + len(loc_k), dtype=np.int64)
+        merged[ext_pos] = ext_k
+        merged[loc_pos] = loc_k
+
+        # 같은 tick 으로 모인 인접 레벨 → 같은 group
+        start = np.empty(len(merged), dtype=bool)
+        start[:1] = True
+        np.not_equal(merged[1:], merged[:-1], out=start[1:])
+        group = np.cumsum(start) - 1
+
+        uniq = merged[start][:depth]
+        size = len(uniq)
+        ext_g = group[ext_pos]
+        loc_g = group[loc_pos]
+        ext_keep = ext_g < size
+        loc_keep = loc_g < size
+
+        bq = np.bincount(ext_g[ext_keep], weights=ext_q[ext_keep], minlength=size)
+        dq = np.bincount(loc_g[loc_keep], weights=loc_q[loc_keep], minlength=size)
+        c = (np.bincount(ext_g[ext_keep], weights=ext_c[ext_keep], minlength=size)
+             + np.bincount(loc_g[loc_keep], weights=loc_c[loc_keep], minlength=size))
+
+        prices = np.round(sign * uniq * tick, 10)
+        return [
+            self._level(float(prices[x]), float(bq[x]), float(dq[x]), int(c[x]))
+            for x in range(size)
+        ]
+
+    @staticmethod
+    def _level(price, binance_qty, db_qty, cnt) -> dict:
+        return {
+            "price": price,
+            "qty": db_qty,
+            "cnt": cnt,
+            "binance_qty": binance_qty,
+            "db_qty": db_qty,
+        }
+
+    # ---------------------------------------------------------
+    # tick size (심볼별 1회 조회)
+    #  - 실제 tick 만 계속 캐시, 조회 실패 시 기본 tick 은 TICK_RETRY_SEC 동안만
+    # ---------------------------------------------------------
+    def tick_size(self, symbol: str) -> float:
+        tick = self._ticks.get(symbol) or self._fallback_ticks.get(symbol)
+        if tick is not None:
+            return tick
+
+        if "binance" in self.venues:
+            tick = self.binance.get_tick_size(symbol)
+        if tick:
+            self._ticks[symbol] = tick
+            return tick
+
+        self._fallback_ticks.set(symbol, self.default_tick)
+        return self.default_tick
+
+    def _symbol_lock(self, symbol: str) -> threading.Lock:
+        with self._locks_guard:
+            lock = self._locks.get(symbol)
+            if lock is None:
+                lock = self._locks[symbol] = threading.Lock()
+            return lock
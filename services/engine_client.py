@@ -0,0 +1,274 @@
+# services/engine_client.py
+import itertools
+import os
+import socket
+import threading
+from concurrent.futures import Future
+
+from services.engine_protocol import (
+    ERROR, EVENT, REQUEST, encode_frame, parse_address, read_frame,
+)
+from services.order_book import BookSnapshot
+from services.order_gateway import Overloaded
+
+
+class EngineError(RuntimeError):
+    """엔진 서버에서 난 예외 (이름/메시지만 전달됨)"""
+
+    def __init__(self, name: str, message: str):
+        super().__init__(f"{name}: {message}")
+        self.name = name
+
+
+class EngineClient:
+    """
+    매칭엔진 서버(engine/engine_server.py) 클라이언트
+
+    - 프로세스당 연결 1개를 여러 스레드가 같이 씀 (요청 id 로 응답 매칭)
+    - call_async 는 보내기만 하고 Future 반환 → 응답을 기다리지 않고 다음 요청 전송 (pipelining)
+    - reader 스레드가 응답을 받아 Future 를 채움
+    - 연결이 끊기면 대기 중인 요청은 ConnectionError, 다음 호출 때 다시 연결
+    - 서버 push(EVENT) 와 연결/끊김은 subscribe(fn) 구독자에게 fn(이름, payload)
+      ("connected" / "disconnected" 는 payload None)
+    """
+
+    def __init__(self, url: str | None = None, timeout: float | None = None):
+        self.url = url or os.getenv("ENGINE_URL", "tcp://127.0.0.1:9100")
+        self.timeout = timeout or float(os.getenv("ENGINE_TIMEOUT_SEC", "5"))
+        self.family, self.address = parse_address(self.url)
+
+        self._sock = None
+        self._send_lock = threading.Lock()
+        self._pending = {}               # req_id -> Future
+        self._ids = itertools.count(1)
+        self._listeners = []
+
+        # 모니터링
+        self.requests = 0
+        self.reconnects = 0
+
+    # ---------------------------------------------------------
+    # 연결
+    # ---------------------------------------------------------
+    def _connect(self):
+        sock = socket.socket(self.family, socket.SOCK_STREAM)
+        if self.family == socket.AF_INET:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.connect(self.address)
+
+        self._sock = sock
+        self.reconnects += 1
+        self._emit("connected", None)
+        threading.Thread(target=self._read_loop, args=(sock,),
+                         name="engine-client-reader", daemon=True).start()
+
+    def subscribe(self, fn):
+        self._listeners.append(fn)
+
+    def _emit(self, event: str, payload):
+        for fn in self._listeners:
+            try:
+                fn(event, payload)
+            except Exception as e:
+                print("[EngineClient] listener error:", e)
+
+    @property
+    def connected(self) -> bool:
+        return self._sock is not None
+
+    def close(self):
+        with self._send_lock:
+            if self._sock is not None:
+                self._sock.close()
+                self._sock = None
+
+    # ---------------------------------------------------------
+    # 요청
+    # ---------------------------------------------------------
+    def call_async(self, method: str, *args) -> Future:
+        fut = Future()
+        req_id = next(self._ids) & 0xFFFFFFFF
+        frame = encode_frame(req_id, REQUEST, [method, list(args)])
+
+        with self._send_lock:
+            if self._sock is None:
+                self._connect()
+            self._pending[req_id] = fut
+            try:
+                self._sock.sendall(frame)
+            except OSError:
+                self._pending.pop(req_id, None)
+                self._sock.close()
+                self._sock = None
+                raise
+            self.requests += 1
+        return fut
+
+    def call(self, method: str, *args, timeout: float | None = None):
+        return self.call_async(method, *args).result(timeout or self.timeout)
+
+    # ---------------------------------------------------------
+    # 응답 수신
+    # ---------------------------------------------------------
+    def _read_loop(self, sock):
+        rfile = sock.makefile("rb")
+        try:
+            while True:
+                frame = read_frame(rfile)
+                if frame is None:
+                    break
+                req_id, kind, obj = frame
+                if kind == EVENT:
+                    self._emit(*obj)
+                    continue
+                fut = self._pending.pop(req_id, None)
+                if fut is None:
+                    continue
+                if kind == ERROR:
+                    fut.set_exception(self._error(obj))
+                else:
+                    fut.set_result(obj)
+        except Exception as e:
+            print("[EngineClient] read error:", e)
+        finally:
+            rfile.close()
+            pending = {}
+            with self._send_lock:
+                if self._sock is sock:
+                    self._sock.close()
+                    self._sock = None
+                    # 이 연결로 보낸 요청 실패 처리
+                    pending, self._pending = self._pending, {}
+                    self._emit("disconnected", None)
+            for fut in pending.values():
+                fut.set_exception(ConnectionError("engine connection closed"))
+
+    @staticmethod
+    def _error(obj) -> Exception:
+        name, message, retry_after = obj
+        if name == "Overloaded":
+            return Overloaded(message, retry_after)
+        return EngineError(name, message)
+
+    def stats(self) -> dict:
+        return {
+            "url": self.url,
+            "connected": self._sock is not None,
+            "in_flight": len(self._pending),
+            "requests": self.requests,
+            "reconnects": self.reconnects,
+        }
+
+
+# ---------------------------------------------------------
+# 엔진 프로세스 체결 → 이 프로세스 계좌 캐시 무효화
+# ---------------------------------------------------------
+def sync_account_cache(client: EngineClient, account_service):
+    """
+    엔진 서버가 push 하는 "accounts" 이벤트로 AccountService 캐시 무효화
+    연결 전 / 끊긴 동안은 이벤트를 놓치므로 캐시를 끄고 DB 로 조회
+    """
+    def on_event(event, payload):
+        if event == "accounts":
+            for user_id, account_id in payload:
+                account_service.invalidate(user_id, account_id)
+        elif event == "connected":
+            account_service.set_caching(True)
+        elif event == "disconnected":
+            account_service.set_caching(False)
+
+    account_service.set_caching(client.connected)
+    client.subscribe(on_event)
+
+
+# ---------------------------------------------------------
+# API 쪽에서 MatchingEngine / OrderGateway 대신 쓰는 원격 대역
+# ---------------------------------------------------------
+class RemoteEngine:
+    """
+    오더북 조회 (MatchingEngine 조회 메서드와 같은 모양)
+    shm(ShmBookReader) 이 있으면 스냅샷/티커는 공유메모리에서 바로 읽고, 없는 심볼만 엔진 호출
+    """
+
+    def __init__(self, client: EngineClient, shm=None):
+        self.client = client
+        self.shm = shm
+        self._epoch = None      # (연결 번호, 엔진 epoch)
+
+    @property
+    def epoch(self) -> str:
+        """엔진 기동 id (재연결 = 엔진 재시작일 수 있으므로 연결마다 다시 조회)"""
+        cached = self._epoch
+        if cached is None or not self.client.connected or cached[0] != self.client.reconnects:
+            epoch = self.client.call("epoch")
+            cached = self._epoch = (self.client.reconnects, epoch)
+        return cached[1]
+
+    def _read_shm(self, symbol: str, n: int | None = None):
+        if self.shm is None:
+            return None
+        if n is None or n > self.shm.depth:
+            return None     # 전체 / 공유메모리보다 깊은 조회는 엔진에서
+        return self.shm.read(symbol)
+
+    def snapshot(self, symbol: str, n: int | None = None) -> BookSnapshot:
+        """n 은 필요한 레벨 수 (None 이거나 공유메모리 depth 를 넘으면 엔진에서)"""
+        hit = self._read_shm(symbol, n)
+        if hit is not None:
+            return hit[0]
+        seq, bids, asks = self.client.call("snapshot", symbol, n)
+        return BookSnapshot(seq, tuple(map(tuple, bids)), tuple(map(tuple, asks)))
+
+    def ticker(self, symbol: str) -> dict:
+        hit = self._read_shm(symbol, 1)
+        if hit is not None:
+            snap, last = hit
+            return snap.ticker(last)
+        return self.client.call("ticker", symbol)
+
+    def depth(self, symbol: str, n: int | None = None, snap: BookSnapshot | None = None) -> dict:
+        return (snap or self.snapshot(symbol, n)).depth(n)
+
+    def depth_since(self, symbol: str, since: int, upto: int | None = None) -> dict | None:
+        return self.client.call("depth_since", symbol, since, upto)
+
+    def book_seq(self, symbol: str) -> int:
+        return self.client.call("book_seq", symbol)
+
+    def recent_trades(self, symbol: str, limit: int | None = None, since: int = 0) -> tuple:
+        seq, trades = self.client.call("recent_trades", symbol, limit, since)
+        return seq, [tuple(t) for t in trades]
+
+    def persisted_version(self, symbol: str) -> tuple:
+        return tuple(self.client.call("persisted_version", symbol))
+
+
+class RemoteGateway:
+    """주문 접수 (OrderGateway / OrderService 접수 메서드와 같은 모양, Future 반환)"""
+
+    def __init__(self, client: EngineClient):
+        self.client = client
+
+    def place_limit(self, user_id, account_id, symbol, side, price, qty, good_till=None,
+                    client_order_id=None) -> Future:
+        return self.client.call_async("place_limit", user_id, account_id, symbol, side,
+                                      price, qty, good_till, client_order_id)
+
+    def place_market(self, user_id, account_id, symbol, side, qty,
+                     client_order_id=None) -> Future:
+        return self.client.call_async("place_market", user_id, account_id, symbol, side,
+                                      qty, client_order_id)
+
+    def place_stop(self, user_id, account_id, symbol, side, stop_price, qty,
+                   price=None, good_till=None, client_order_id=None) -> Future:
+        return self.client.call_async("place_stop", user_id, account_id, symbol, side,
+                                      stop_price, qty, price, good_till, client_order_id)
+
+    def cancel_orders(self, order_ids) -> Future:
+        return self.client.call_async("cancel_orders", list(order_ids))
+
+    def owned_order_ids(self, user_id, order_ids) -> list:
+        return self.client.call("owned_order_ids", user_id, list(order_ids))
+
+    def stats(self) -> dict:
+        return {**self.client.call("gateway_stats"), "client": self.client.stats()}
@@ -0,0 +1,377 @@
+# services/engine_persister.py
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+class PersistBatch:
+    """
+    엔진 명령 1건(주문/취소)을 처리하면서 쌓인 DB 반영 내용
+    - new_orders    : 엔진에서 id 를 할당한 신규 주문 (최종 상태로 INSERT)
+    - order_updates : 기존 주문의 잔량/상태 변경 (id 별 마지막 상태만)
+    - trades        : 체결 기록 row (엔진 할당 체결 id 포함)
+    - fill_legs     : 계좌/포지션 반영용 체결 leg (netting 대상, trade_id 로 체결 row 와 짝)
+    - levels        : (symbol, side, price) -> [dqty, dcnt]  book_levels 변경분
+    """
+
+    __slots__ = ("new_orders", "order_updates", "trades", "fill_legs", "levels")
+
+    def __init__(self):
+        self.new_orders = {}
+        self.order_updates = {}
+        self.trades = []
+        self.fill_legs = []
+        self.levels = {}
+
+    def is_empty(self) -> bool:
+        return not (self.new_orders or self.order_updates or self.trades
+                    or self.fill_legs or self.levels)
+
+    def freeze(self) -> "PendingWrites":
+        """
+        엔진 스레드에서 호출 → 주문 dict 의 현재 값을 row 로 고정
+        (writer 스레드가 엔진이 계속 바꾸는 dict 를 읽지 않도록)
+        """
+        w = PendingWrites()
+        for oid, o in self.new_orders.items():
+            w.order_rows[oid] = (
+                o["id"], o["user_id"], o["account_id"], o["symbol"], o["side"],
+                o["price"], o["qty"], max(o["remaining_qty"], 0), o["status"],
+                o["created_at"], o.get("order_type", "LIMIT"), o.get("stop_price"),
+                o.get("expire_at"),
+            )
+        for oid, o in self.order_updates.items():
+            if oid not in self.new_orders:
+                w.update_rows[oid] = (
+                    oid, max(o["remaining_qty"], 0), o["status"], o.get("created_at"),
+                )
+        w.trade_rows = self.trades
+        w.fill_legs = self.fill_legs
+        w.level_deltas = self.levels
+        return w
+
+
+class PendingWrites:
+    """
+    row 로 고정된 DB 반영분. 여러 개를 merge 해서 한번에 쓸 수 있다.
+    - order_rows  : id -> INSERT row
+    - update_rows : id -> (id, remaining_qty, status, created_at)  (나중 값이 이김)
+                    created_at 은 월 파티션 pruning 용 (없으면 None)
+    - level_deltas: (symbol, side, price) -> [dqty, dcnt]  (merge 시 합산)
+    """
+
+    __slots__ = ("order_rows", "update_rows", "trade_rows", "fill_legs", "level_deltas")
+
+    def __init__(self):
+        self.order_rows = {}
+        self.update_rows = {}
+        self.trade_rows = []
+        self.fill_legs = []
+        self.level_deltas = {}
+
+    def merge(self, other: "PendingWrites"):
+        self.order_rows.update(other.order_rows)
+        self.update_rows.update(other.update_rows)
+        self.trade_rows.extend(other.trade_rows)
+        self.fill_legs.extend(other.fill_legs)
+        for key, (dqty, dcnt) in other.level_deltas.items():
+            d = self.level_deltas.get(key)
+            if d is None:
+                self.level_deltas[key] = [dqty, dcnt]
+            else:
+                d[0] += dqty
+                d[1] += dcnt
+
+    def level_rows(self) -> list:
+        """변화 없는 레벨은 제외한 (symbol, side, price, dqty, dcnt) row"""
+        return [
+            (sym, side, price, dqty, dcnt)
+            for (sym, side, price), (dqty, dcnt) in self.level_deltas.items()
+            if dqty or dcnt
+        ]
+
+    def row_count(self) -> int:
+        return (len(self.order_rows) + len(self.update_rows)
+                + len(self.trade_rows) + len(self.level_deltas))
+
+
+class EnginePersister:
+    """
+    엔진 배치를 한 트랜잭션으로 DB 에 반영
+      1) 신규 주문 INSERT (엔진 할당 id, 이미 있으면 건너뜀)
+      2) 체결 INSERT (엔진 할당 id, 이미 있으면 건너뜀)
+      3) 기존 주문 잔량/상태 UPDATE (값이 같으면 건너뜀)
+      4) book_levels 가격 레벨 delta upsert (1~3 에서 바뀐 row 가 있을 때만)
+      5) 계좌/포지션 netting 반영 (2 에서 실제로 들어간 체결만)
+      → commit 1회
+    커밋 응답을 못 받고 같은 배치를 다시 써도 두 번 반영되지 않는다.
+
+    - 동기 모드(기본): submit 즉시 flush, 실패하면 writer 스레드를 띄워 재시도로 넘김
+    - 비동기 모드(ENGINE_PERSIST_ASYNC=1): writer 스레드가 쌓인 배치를 모아서 기록
+      엔진은 DB 를 기다리지 않음
+    - 실패한 배치는 새 배치와 합치지 않고 그대로 max_retries 번까지 재시도
+      → 그래도 실패하면 dead letter 로 옮기고 다음 배치 진행 (stats / health 에 노출,
+        ENGINE_PERSIST_DEADLETTER_PATH 가 있으면 JSONL 로도 기록)
+    - 대기 row 수가 copy_threshold 이상이면 COPY FROM STDIN 경로로 전환
+      (staging 테이블에 COPY 후 INSERT ... ON CONFLICT / UPDATE 1회로 merge)
+
+    pool 을 주면 전용 커넥션을 reserve 해서 쓰고, 끊기면 다시 reserve
+    (엔진 / API 스레드가 커밋하는 커넥션과 트랜잭션이 섞이지 않도록)
+    repos=(order_repo, trade_repo, account_repo) 는 DB 없는 리플레이 등에서 직접 지정
+    """
+
+    def __init__(self, account_service, pool=None, repos=None,
+                 async_mode: bool | None = None,
+                 copy_threshold: int | None = None,
+                 max_retries: int | None = None,
+                 retry_backoff: float = 1.0,
+                 dead_letter_path: str | None = None):
+        self.account_service = account_service
+        self.pool = pool
+
+        self.conn = None
+        if repos is not None:
+            self.order_repo, self.trade_repo, self.account_repo = repos
+            self.conn = self.order_repo.conn
+
+        if async_mode is None:
+            async_mode = os.getenv("ENGINE_PERSIST_ASYNC", "0") == "1"
+        self.copy_threshold = copy_threshold or int(os.getenv("PERSIST_COPY_THRESHOLD", "2000"))
+        self.max_retries = max_retries or int(os.getenv("ENGINE_PERSIST_MAX_RETRIES", "5"))
+        self.retry_backoff = retry_backoff
+        self.dead_letter_path = dead_letter_path or os.getenv("ENGINE_PERSIST_DEADLETTER_PATH")
+
+        self._pending = deque()
+        self._pending_rows = 0
+        self._retry = None          # 실패해서 다시 쓸 배치 (하나만, 순서 유지)
+        self._attempts = 0
+        self._cond = threading.Condition()
+        self._writer = None
+        self._stopping = False
+
+        # 모니터링
+        self.flushes = 0
+        self.copy_flushes = 0
+        self.rows_written = 0
+        self.replayed = 0           # 이미 반영돼 있던 배치 (재시도)
+        self.errors = 0
+        self.last_error = None
+        self.dead_letters = []      # [(시각, 에러, PendingWrites)]
+
+        if async_mode:
+            self.start()
+
+    # ---------------------------------------------------------
+    # 전용 커넥션
+    # ---------------------------------------------------------
+    def _connect(self):
+        if self.pool is None:
+            return
+        # psycopg2 의존 → DB 없는 리플레이(repos 지정)에서는 import 하지 않도록 여기서
+        from repositories.account_repository import AccountRepository
+        from repositories.order_repository import OrderRepository
+        from repositories.trade_repositories import TradeRepository
+
+        if self.conn is not None and not self.conn.closed:
+            return
+        if self.conn is not None:
+            self.pool.release(self.conn)
+        self.conn = self.pool.reserve()
+        self.order_repo = OrderRepository(self.conn)
+        self.trade_repo = TradeRepository(self.conn)
+        self.account_repo = AccountRepository(self.conn)
+
+    def _rollback(self):
+        try:
+            if self.conn is not None and not self.conn.closed:
+                self.conn.rollback()
+        except Exception as e:
+            print("[EnginePersister] rollback error:", e)
+
+    # ---------------------------------------------------------
+    # 엔진 → persister
+    # ---------------------------------------------------------
+    def submit(self, batch: PersistBatch):
+        if batch.is_empty():
+            return
+
+        writes = batch.freeze()
+
+        if self._writer is None:
+            try:
+                self._write(writes)
+            except Exception:
+                # 엔진은 계속 진행, 이 배치부터는 writer 스레드가 순서대로 재시도
+                with self._cond:
+                    self._retry = writes
+                    self._attempts = 1
+                self.start()
+            return
+
+        with self._cond:
+            self._pending.append(writes)
+            self._pending_rows += writes.row_count()
+            self._cond.notify()
+
+    # ---------------------------------------------------------
+    # writer 스레드
+    # ---------------------------------------------------------
+    def start(self):
+        if self._writer is not None:
+            return
+        self._stopping = False
+        self._writer = threading.Thread(target=self._run, name="engine-persister", daemon=True)
+        self._writer.start()
+
+    def stop(self, timeout: float = 10.0):
+        """남은 배치를 모두 기록하고 writer 종료"""
+        if self._writer is not None:
+            with self._cond:
+                self._stopping = True
+                self._cond.notify()
+            self._writer.join(timeout)
+            self._writer = None
+        if self.pool is not None and self.conn is not None:
+            self.pool.release(self.conn)
+            self.conn = None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._retry is None and not self._pending and not self._stopping:
+                    self._cond.wait()
+                if self._retry is None and not self._pending:
+                    return
+
+                if self._retry is not None:
+                    # 실패한 배치는 그대로 다시 (새 배치와 합치면 재시도 판정이 섞임)
+                    batch = self._retry
+                else:
+                    # 쌓인 배치를 한번에 꺼내서 merge
+                    batch = self._pending.popleft()
+                    while self._pending:
+                        batch.merge(self._pending.popleft())
+                    self._pending_rows = 0
+
+            try:
+                self._write(batch)
+                self._retry = None
+                self._attempts = 0
+            except Exception:
+                self._attempts += 1
+                if self._attempts > self.max_retries:
+                    self._dead_letter(batch)
+                    self._retry = None
+                    self._attempts = 0
+                else:
+                    self._retry = batch
+                    time.sleep(self.retry_backoff * self._attempts)
+
+    def _dead_letter(self, w: PendingWrites):
+        """재시도를 다 써버린 배치 → 보관 후 다음 배치로 (수동 복구 대상)"""
+        self.dead_letters.append((time.time(), self.last_error, w))
+        print(f"[EnginePersister] batch moved to dead letter after {self._attempts} attempts "
+              f"({w.row_count()} rows):", self.last_error)
+
+        if not self.dead_letter_path:
+            return
+        try:
+            with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({
+                    "ts": time.time(),
+                    "error": self.last_error,
+                    "orders": list(w.order_rows.values()),
+                    "updates": list(w.update_rows.values()),
+                    "trades": w.trade_rows,
+                    "fill_legs": w.fill_legs,
+                    "levels": w.level_rows(),
+                }, default=str) + "\n")
+        except OSError as e:
+            print("[EnginePersister] dead letter write error:", e)
+
+    # ---------------------------------------------------------
+    # 실제 DB 기록 (한 트랜잭션, 재시도에 안전)
+    # ---------------------------------------------------------
+    def _write(self, w: PendingWrites):
+        use_copy = w.row_count() >= self.copy_threshold
+
+        nets = None
+        try:
+            self._connect()
+            order_rows = list(w.order_rows.values())
+            update_rows = list(w.update_rows.values())
+
+            new_orders, new_trades, changed = [], [], 0
+            if use_copy:
+                if order_rows:
+                    new_orders = self.order_repo.copy_orders(order_rows)
+                if w.trade_rows:
+                    new_trades = self.trade_repo.copy_trades(w.trade_rows)
+                if update_rows:
+                    changed = self.order_repo.merge_order_states(update_rows)
+            else:
+                if order_rows:
+                    new_orders = self.order_repo.insert_orders(order_rows)
+                if w.trade_rows:
+                    new_trades = self.trade_repo.insert_trades(w.trade_rows)
+                if update_rows:
+                    changed = self.order_repo.update_orders(update_rows)
+
+            # 바뀐 row 가 하나도 없으면 이미 커밋된 배치 (커밋 응답 유실 후 재시도)
+            fresh = bool(new_orders or new_trades or changed)
+
+            level_rows = w.level_rows()
+            if fresh and level_rows:
+                self.order_repo.apply_level_deltas(level_rows)
+
+            # 잔고/포지션은 이번에 실제로 들어간 체결분만 (같은 트랜잭션)
+            if len(new_trades) == len(w.trade_rows):
+                legs = w.fill_legs
+            else:
+                inserted = set(new_trades)
+                legs = [leg for leg in w.fill_legs if leg["trade_id"] in inserted]
+            if legs:
+                nets = self.account_repo.apply_fill_legs(legs, commit=False)
+
+            self.conn.commit()
+
+            self.flushes += 1
+            self.copy_flushes += 1 if use_copy else 0
+            self.rows_written += w.row_count()
+            self.replayed += 0 if fresh else 1
+
+        except Exception as e:
+            self._rollback()
+            self.errors += 1
+            self.last_error = f"{type(e).__name__}: {e}"
+            print("[EnginePersister] flush error:", e)
+            raise
+
+        # 커밋 이후 기준으로 조회 캐시 무효화
+        if nets:
+            self.account_service.invalidate_nets(nets.values())
+
+    # ---------------------------------------------------------
+    # 모니터링
+    # ---------------------------------------------------------
+    def healthy(self) -> bool:
+        """dead letter 가 없으면 True (readiness check)"""
+        return not self.dead_letters
+
+    def stats(self) -> dict:
+        return {
+            "async": self._writer is not None,
+            "pending_batches": len(self._pending),
+            "pending_rows": self._pending_rows,
+            "retrying": self._attempts if self._retry is not None else 0,
+            "copy_threshold": self.copy_threshold,
+            "flushes": self.flushes,
+            "copy_flushes": self.copy_flushes,
+            "rows_written": self.rows_written,
+            "replayed": self.replayed,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "dead_letters": len(self.dead_letters),
+        }
@@ -0,0 +1,134 @@
+# services/engine_protocol.py
+"""
+API ↔ 매칭엔진 바이너리 프레이밍
+
+frame = header(9 bytes) + body
+  header : struct "!IIB" = (body 길이, 요청 id, kind)
+  kind   : REQUEST / RESULT / ERROR / EVENT, 최상위 비트(JSON_FLAG) 가 켜져 있으면 body 가 JSON
+  body   : msgpack (없으면 JSON fallback)
+    REQUEST : [method, args]
+    RESULT  : 반환값
+    ERROR   : [예외 이름, 메시지, retry_after | None]
+    EVENT   : [이벤트 이름, payload]  서버 → 모든 연결 push (요청 id 0)
+
+요청 id 로 응답을 짝지으므로 한 연결에 요청을 연달아 보내고(pipelining) 응답은 끝나는 순서대로 받는다.
+"""
+import json
+import socket
+import struct
+from datetime import date, datetime
+
+try:
+    import msgpack
+except ImportError:  # msgpack 없으면 JSON body
+    msgpack = None
+
+HEADER = struct.Struct("!IIB")
+
+REQUEST = 0
+RESULT = 1
+ERROR = 2
+EVENT = 3
+JSON_FLAG = 0x80
+
+MAX_FRAME = 64 * 1024 * 1024
+
+# msgpack ext type (datetime / date 는 ISO 문자열로)
+_EXT_DATETIME = 1
+_EXT_DATE = 2
+
+
+# ---------------------------------------------------------
+# body 인코딩
+# ---------------------------------------------------------
+def _msgpack_default(obj):
+    if isinstance(obj, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, obj.isoformat().encode())
+    if isinstance(obj, date):
+        return msgpack.ExtType(_EXT_DATE, obj.isoformat().encode())
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"cannot serialize {type(obj).__name__}")
+
+
+def _msgpack_ext(code, data):
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == _EXT_DATE:
+        return date.fromisoformat(data.decode())
+    return msgpack.ExtType(code, data)
+
+
+def _json_default(obj):
+    if isinstance(obj, datetime):
+        return {"$dt": obj.isoformat()}
+    if isinstance(obj, date):
+        return {"$date": obj.isoformat()}
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"cannot serialize {type(obj).__name__}")
+
+
+def _json_hook(d):
+    if len(d) == 1:
+        if "$dt" in d:
+            return datetime.fromisoformat(d["$dt"])
+        if "$date" in d:
+            return date.fromisoformat(d["$date"])
+    return d
+
+
+def encode_frame(req_id: int, kind: int, obj) -> bytes:
+    if msgpack is not None:
+        body = msgpack.packb(obj, default=_msgpack_default, use_bin_type=True)
+    else:
+        body = json.dumps(obj, default=_json_default, separators=(",", ":")).encode()
+        kind |= JSON_FLAG
+    return HEADER.pack(len(body), req_id, kind) + body
+
+
+def decode_body(kind: int, body: bytes):
+    if kind & JSON_FLAG:
+        return json.loads(body, object_hook=_json_hook)
+    if msgpack is None:
+        raise RuntimeError("msgpack frame received but msgpack is not installed")
+    return msgpack.unpackb(body, ext_hook=_msgpack_ext, raw=False, strict_map_key=False)
+
+
+# ---------------------------------------------------------
+# 소켓 입출력
+# ---------------------------------------------------------
+def read_frame(rfile):
+    """
+    (req_id, kind, obj) 반환, 연결이 닫혔으면 None
+    rfile 은 sock.makefile("rb") (버퍼링된 read)
+    """
+    header = rfile.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+
+    length, req_id, kind = HEADER.unpack(header)
+    if length > MAX_FRAME:
+        raise ValueError(f"frame too large: {length}")
+
+    body = rfile.read(length)
+    if len(body) < length:
+        return None
+    return req_id, kind & ~JSON_FLAG, decode_body(kind, body)
+
+
+def parse_address(url: str):
+    """
+    unix:///run/engine.sock → (AF_UNIX, "/run/engine.sock")
+    tcp://engine:9100       → (AF_INET, ("engine", 9100))
+    """
+    if url.startswith("unix://"):
+        return socket.AF_UNIX, url[len("unix://"):]
+    if url.startswith("tcp://"):
+        host, _, port = url[len("tcp://"):].rpartition(":")
+        return socket.AF_INET, (host or "0.0.0.0", int(port))
+    raise ValueError(f"unsupported engine address: {url}")
+
+
+def is_engine_address(url: str | None) -> bool:
+    return bool(url) and url.startswith(("unix://", "tcp://"))
@@ -0,0 +1,139 @@
+# services/fill_netting.py
+from psycopg2.extras import execute_values
+
+
+class NetFill:
+    """
+    한 매칭 배치 안에서 (account_id, symbol) 단위로 합산한 체결
+    - buy_qty / buy_cost : 평균단가(VWAP) 재계산용
+    - sell_qty           : 포지션 감소분 (매도 시 평균단가 유지)
+    - cash_delta         : 매도대금 - 매수대금
+    """
+
+    __slots__ = ("user_id", "account_id", "symbol",
+                 "buy_qty", "buy_cost", "sell_qty", "sell_value")
+
+    def __init__(self, user_id, account_id, symbol):
+        self.user_id = user_id
+        self.account_id = account_id
+        self.symbol = symbol
+        self.buy_qty = 0.0
+        self.buy_cost = 0.0
+        self.sell_qty = 0.0
+        self.sell_value = 0.0
+
+    @property
+    def cash_delta(self) -> float:
+        return self.sell_value - self.buy_cost
+
+
+def net_fills(legs) -> dict:
+    """
+    체결 leg 목록 → {(account_id, symbol): NetFill}
+    leg: {"user_id", "account_id", "symbol", "side", "price", "qty"}
+
+    한 번의 스윕에서 한 계좌는 보통 한쪽 방향으로만 체결되므로
+    매수분을 먼저 반영하고 매도분을 빼는 순서로 계산해도 건별 적용과 결과가 같다.
+    (자기체결로 양방향이 섞이는 경우만 평균단가가 근사치)
+    """
+    nets = {}
+    for leg in legs:
+        key = (leg["account_id"], leg["symbol"])
+        net = nets.get(key)
+        if net is None:
+            net = nets[key] = NetFill(leg["user_id"], leg["account_id"], leg["symbol"])
+
+        qty = float(leg["qty"])
+        value = float(leg["price"]) * qty
+        if leg["side"].upper() == "BUY":
+            net.buy_qty += qty
+            net.buy_cost += value
+        else:
+            net.sell_qty += qty
+            net.sell_value += value
+
+    return nets
+
+
+# ---------------------------------------------------------
+# 배치 적용 SQL
+# ---------------------------------------------------------
+BALANCE_SQL = """
+    UPDATE accounts AS a
+    SET balance = a.balance + v.delta
+    FROM (VALUES %s) AS v(account_id, delta)
+    WHERE a.id = v.account_id;
+"""
+
+POSITION_SQL = """
+    WITH v(user_id, account_id, symbol, buy_qty, buy_cost, sell_qty) AS (
+        VALUES %s
+    ),
+    calc AS (
+        SELECT v.*,
+               COALESCE(p.qty, 0)       AS old_qty,
+               COALESCE(p.avg_price, 0) AS old_avg
+        FROM v
+        LEFT JOIN positions p
+               ON p.account_id = v.account_id AND p.symbol = v.symbol
+    )
+    INSERT INTO positions (user_id, account_id, symbol, qty, avg_price, updated_at)
+    SELECT user_id, account_id, symbol,
+           GREATEST(old_qty + buy_qty - sell_qty, 0),
+           CASE WHEN buy_qty > 0
+                THEN (old_qty * old_avg + buy_cost) / (old_qty + buy_qty)
+                ELSE old_avg
+           END,
+           now()
+    FROM calc
+    ON CONFLICT (account_id, symbol) DO UPDATE
+    SET qty        = EXCLUDED.qty,
+        avg_price  = EXCLUDED.avg_price,
+        updated_at = EXCLUDED.updated_at;
+"""
+
+CLOSE_SQL = """
+    DELETE FROM positions p
+    USING unnest(%s::bigint[], %s::text[]) AS d(account_id, symbol)
+    WHERE p.account_id = d.account_id
+      AND p.symbol = d.symbol
+      AND p.qty <= 0;
+"""
+
+
+def apply_net_fills(cur, nets):
+    """
+    NetFill 목록을 set-based 로 반영 (커밋은 호출자 책임)
+      1) accounts 잔고 UPDATE ... FROM (VALUES ...) 1회
+      2) positions INSERT ... ON CONFLICT DO UPDATE 1회
+      3) 매도로 0 이 된 포지션 DELETE 1회 (매도분이 있을 때만)
+    positions(account_id, symbol) 에 unique 인덱스가 있어야 한다.
+    """
+    nets = list(nets)
+    if not nets:
+        return
+
+    deltas = {}
+    for n in nets:
+        deltas[n.account_id] = deltas.get(n.account_id, 0.0) + n.cash_delta
+
+    execute_values(
+        cur, BALANCE_SQL,
+        list(deltas.items()),
+        template="(%s::bigint, %s::numeric)",
+        page_size=len(deltas),
+    )
+
+    execute_values(
+        cur, POSITION_SQL,
+        [(n.user_id, n.account_id, n.symbol, n.buy_qty, n.buy_cost, n.sell_qty) for n in nets],
+        template="(%s::bigint, %s::bigint, %s::text, %s::numeric, %s::numeric, %s::numeric)",
+        page_size=len(nets),
+    )
+
+    closing = [n for n in nets if n.sell_qty > 0]
+    if closing:
+        cur.execute(
+            CLOSE_SQL,
+            ([n.account_id for n in closing], [n.symbol for n in closing]),
+        )
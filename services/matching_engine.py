@@ -1,62 +1,510 @@
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
 from typing import List, Dict
 
+from services import call_auction
+from services.engine_persister import EnginePersister, PersistBatch
+from services.order_book import EMPTY_SNAPSHOT, BookSnapshot, OrderBook
+from services.order_id_allocator import OrderIdAllocator
+from services.shm_book import ShmBookWriter
+from services.risk_manager import RiskManager
+from services.timer_wheel import TimerWheel
+from services.trade_tape import TradeTape
+
 
 class MatchingEngine:
-    def __init__(self, order_repo, trade_repo, account_service):
+    def __init__(self, order_repo, trade_repo, account_service, persister=None):
         self.order_repo = order_repo
         self.trade_repo = trade_repo
         self.account_service = account_service
 
-        # 메모리 오더북
-        self.orderbook = {
-            "bids": [],  # BUY
-            "asks": [],  # SELL
+        # 사전 리스크 체크 (가용잔고 / 매도가능수량, 메모리)
+        self.risk = RiskManager(account_service)
+
+        # 메모리 오더북 (심볼별, 가격 레벨 집계 + seq/delta ring)
+        self.books: Dict[str, OrderBook] = {}
+        # 엔진 기동 id: seq 는 재시작하면 0 부터 다시 → ETag / 캐시 버전에 같이 넣음
+        self.epoch = format(time.time_ns() // 1_000_000, "x")
+        self.delta_ring = int(os.getenv("BOOK_DELTA_RING", "1024"))
+        self.snapshot_depth = int(os.getenv("ENGINE_SNAPSHOT_DEPTH", "100"))
+
+        # 심볼별 최근 체결 tape (메모리 ring, /trades/recent)
+        self.tapes: Dict[str, TradeTape] = {}
+        self.tape_size = int(os.getenv("ENGINE_TAPE_SIZE", "1000"))
+
+        # 공유메모리 top-of-book (ENGINE_SHM_PATH 설정 시, API 워커가 mmap 으로 직접 읽음)
+        self.shm = ShmBookWriter.from_env()
+
+        # 주문 id 는 엔진이 시퀀스 블록에서 할당
+        self.id_allocator = OrderIdAllocator(order_repo)
+        # 체결 id 도 엔진 할당 (persister 재시도 시 ON CONFLICT 로 중복 방지)
+        self.trade_ids = OrderIdAllocator(trade_repo, reserve=trade_repo.reserve_trade_ids)
+
+        # 명령 1건 처리 중 쌓이는 DB 반영분 → 끝에서 한 트랜잭션으로 flush
+        #  persister 는 보통 전용 커넥션으로 (EnginePersister(account_service, pool=pool))
+        self.persister = persister or EnginePersister(
+            account_service, repos=(order_repo, trade_repo, account_service.acc_repo),
+        )
+        self._batch = PersistBatch()
+
+        # 엔진 명령은 한 번에 하나 (API threadpool / 만료 ticker 가 같이 호출)
+        self.lock = threading.RLock()
+
+        # 오더북/stop 대기 중인 주문 id -> 주문 (취소/만료 시 위치 찾기용)
+        self._live: Dict[int, dict] = {}
+
+        # GTT/GTD 만료 타이머
+        self.timers = TimerWheel(
+            tick_ms=int(os.getenv("ENGINE_TIMER_TICK_MS", "100")),
+            start_ms=int(time.time() * 1000),
+        )
+        self._ticker = None
+        self._ticker_stop = threading.Event()
+
+    # ---------------------------------------------------------
+    # 심볼 오더북
+    # ---------------------------------------------------------
+    def get_book(self, symbol: str) -> OrderBook:
+        book = self.books.get(symbol)
+        if book is None:
+            book = self.books[symbol] = OrderBook(symbol, self.delta_ring, self.snapshot_depth)
+        return book
+
+    def _publish(self, book: OrderBook):
+        """명령 끝: 새 스냅샷 publish + 공유메모리 slot 갱신 (엔진 락 안에서)"""
+        book.publish()
+        if self.shm is not None:
+            self.shm.write(book.symbol, book.snapshot, book.last_price)
+
+    # ---------------------------------------------------------
+    # 조회 (API 스레드): publish 된 불변 스냅샷만 읽음, 엔진 락 없음
+    # ---------------------------------------------------------
+    def snapshot(self, symbol: str, n: int | None = None) -> BookSnapshot:
+        """
+        n 레벨까지 담긴 스냅샷: snapshot_depth 이내면 publish 된 스냅샷 (락 없음)
+        n 이 None(전체) 이거나 더 깊으면 엔진 락 안에서 전체 레벨 스냅샷
+        """
+        book = self.books.get(symbol)
+        if book is None:
+            return EMPTY_SNAPSHOT
+        if n is not None and n <= book.snapshot_depth:
+            return book.snapshot
+        with self.lock:
+            return book.full_snapshot()
+
+    def recent_trades(self, symbol: str, limit: int | None = None, since: int = 0) -> tuple:
+        """(tape seq, [(seq, ts_ms, price, qty, aggressor), ...] 최신순)"""
+        tape = self.tapes.get(symbol)
+        if tape is None:
+            return 0, []
+        return tape.recent(limit, since)
+
+    def live_order(self, order_id: int) -> dict | None:
+        """오더북/stop 대기 중인 주문 (읽기 전용으로만 사용)"""
+        return self._live.get(order_id)
+
+    def depth(self, symbol: str, n: int | None = None, snap: BookSnapshot | None = None) -> dict:
+        """
+        가격 레벨 상위 n 개 + seq (없는 심볼은 빈 오더북, 생성하지 않음), n=None 이면 전체
+        """
+        return (snap or self.snapshot(symbol, n)).depth(n)
+
+    def book_seq(self, symbol: str) -> int:
+        book = self.books.get(symbol)
+        return book.snapshot.seq if book is not None else 0
+
+    def ticker(self, symbol: str) -> dict:
+        book = self.books.get(symbol)
+        if book is None:
+            return EMPTY_SNAPSHOT.ticker()
+        return book.snapshot.ticker(book.last_price)
+
+    def persisted_version(self, symbol: str) -> tuple:
+        """DB(book_levels) 기반 조회의 캐시 버전: 엔진 epoch + book seq + persister 커밋 횟수"""
+        return (self.epoch, self.book_seq(symbol), self.persister.flushes)
+
+    def depth_since(self, symbol: str, since: int, upto: int | None = None) -> dict | None:
+        """
+        since 이후 레벨 변경분만 (cnt=0 은 삭제된 레벨)
+        ring buffer 를 벗어났으면 None → 호출자가 전체 스냅샷으로 대체
+        """
+        book = self.books.get(symbol)
+        if book is None:
+            return {"seq": 0, "since": since, "deltas": []} if since == 0 else None
+
+        seq = book.snapshot.seq if upto is None else upto
+        changes = book.changes_since(since, seq)
+        if changes is None:
+            return None
+        return {
+            "seq": seq,
+            "since": since,
+            "deltas": [
+                {"side": side, "price": price, "qty": qty, "cnt": cnt}
+                for side, price, qty, cnt in changes
+            ],
+        }
+
+    # ---------------------------------------------------------
+    # 신규 주문 생성 (DB 미접근, id 는 엔진 할당)
+    #  order_type: LIMIT / MARKET / STOP (발동 시 시장가) / STOP_LIMIT (발동 시 지정가)
+    #  expire_at : GTT/GTD 만료 시각 (UTC datetime), None 이면 GTC
+    # ---------------------------------------------------------
+    def create_order(self, user_id, account_id, symbol, side, price, qty,
+                     order_type: str = "LIMIT", stop_price: float | None = None,
+                     expire_at: datetime | None = None) -> dict:
+        is_stop = stop_price is not None
+        return {
+            "id": self.id_allocator.next_id(),
+            "user_id": user_id,
+            "account_id": account_id,
+            "symbol": symbol.upper(),
+            "side": side.upper(),
+            "price": float(price),
+            "remaining_qty": float(qty),
+            "qty": float(qty),
+            "order_type": order_type,
+            "stop_price": float(stop_price) if is_stop else None,
+            "status": "PENDING" if is_stop else "WORKING",
+            "expire_at": expire_at,
+            "created_at": datetime.now(timezone.utc),
         }
 
     # ---------------------------------------------------------
     # 지정가 주문
     # ---------------------------------------------------------
-    def process_limit_order(self, order: dict):
-        side = order["side"].upper()
-        fills = []
+    def process_limit_order(self, order: dict, is_new: bool = False):
+        """
+        is_new=True 면 create_order 로 만든 주문 → 체결과 함께 INSERT
+        """
+        with self.lock:
+            book = self.get_book(order["symbol"])
+
+            if is_new:
+                self._batch.new_orders[order["id"]] = order
+
+            try:
+                fills = self._execute(order, book)
+                fills += self._trigger_stops(book)
+            finally:
+                self._publish(book)
+                self._flush_batch()
+
+            return fills
+
+    # ---------------------------------------------------------
+    # 시장가 주문
+    # ---------------------------------------------------------
+    def process_market_order(self, order: dict, is_new: bool = False):
+        with self.lock:
+            book = self.get_book(order["symbol"])
+
+            if is_new:
+                self._batch.new_orders[order["id"]] = order
+
+            try:
+                fills = self._execute(order, book, is_market=True)
+                fills += self._trigger_stops(book)
+            finally:
+                self._publish(book)
+                self._flush_batch()
+
+            return fills
+
+    # ---------------------------------------------------------
+    # stop / stop-limit 주문
+    #  - 발동 전에는 심볼 trigger index 에만 있고 오더북/레벨에는 없음 (status PENDING)
+    #  - 이미 last price 가 stop 을 넘었으면 즉시 발동
+    # ---------------------------------------------------------
+    def process_stop_order(self, order: dict, is_new: bool = False):
+        with self.lock:
+            book = self.get_book(order["symbol"])
+
+            if is_new:
+                self._batch.new_orders[order["id"]] = order
+
+            try:
+                book.add_stop(order)
+                self._track(order)
+                fills = self._trigger_stops(book)
+            finally:
+                self._publish(book)
+                self._flush_batch()
+
+            return fills
+
+    # ---------------------------------------------------------
+    # 주문 취소 (메모리 오더북에서 제거 + 레벨/상태 배치 반영 + 예약 해제)
+    # ---------------------------------------------------------
+    def cancel_orders(self, order_ids):
+        with self.lock:
+            return self._remove_orders(order_ids, "CANCELLED")
+
+    # ---------------------------------------------------------
+    # GTT/GTD 만료 (타이머 휠 tick)
+    #  now_ms 미지정 시 현재 시각, 리플레이는 기록 시각을 넘김
+    # ---------------------------------------------------------
+    def expire_due(self, now_ms: int | None = None):
+        with self.lock:
+            if now_ms is None:
+                now_ms = int(time.time() * 1000)
+            expired = self.timers.advance(now_ms)
+            if not expired:
+                return []
+            return self._remove_orders(expired, "EXPIRED")
+
+    def start_ticker(self):
+        """타이머 휠을 tick 간격으로 돌리는 백그라운드 스레드"""
+        if self._ticker is not None:
+            return
+        self._ticker_stop.clear()
+        self._ticker = threading.Thread(target=self._tick_loop, name="engine-ticker", daemon=True)
+        self._ticker.start()
+
+    def stop_ticker(self):
+        self._ticker_stop.set()
+        self._ticker = None
+
+    def _tick_loop(self):
+        interval = self.timers.tick_ms / 1000
+        while not self._ticker_stop.wait(interval):
+            try:
+                self.expire_due()
+            except Exception as e:
+                print("[MatchingEngine] expire error:", e)
+
+    # ---------------------------------------------------------
+    # 주문 제거 (취소/만료 공통): 오더북 또는 stop 대기열에서 빼고 상태 배치 반영
+    # ---------------------------------------------------------
+    def _remove_orders(self, order_ids, status: str) -> list:
+        removed = []
+        touched = {}
+
+        try:
+            for oid in order_ids:
+                o = self._live.get(oid)
+                if o is None:
+                    continue
+                self._forget(o)
+
+                book = self.books[o["symbol"]]
+                if o["status"] == "PENDING":
+                    book.remove_stop_ids({oid})
+                else:
+                    book.remove_order(o)
+                    self._level_change(book, o, -o["remaining_qty"], -1)
+
+                o["remaining_qty"] = 0
+                o["status"] = status
+                self._batch.order_updates[oid] = o
+                removed.append(o)
+                touched[book.symbol] = book
+        finally:
+            for book in touched.values():
+                self._publish(book)
+            self._flush_batch()
 
-        if side == "BUY":
-            fills += self._match_order(order, self.orderbook["asks"])
+        for o in removed:
+            self.risk.release(o)
+
+        return [o["id"] for o in removed]
+
+    # ---------------------------------------------------------
+    # DB 미체결 주문으로 심볼 오더북 적재 (MatchingDB.fetch_working_orders 결과)
+    #  stops 는 발동 대기 stop 주문 (MatchingDB.fetch_pending_stops) → trigger index
+    #  기존 메모리 오더북/stop 대기열은 버림, book_levels 는 DB 와 이미 같으므로 배치 delta 없음
+    #  적재한 주문의 남은 잔량은 리스크 예약으로 다시 잡음 (재시작 직후 초과 매수/매도 방지)
+    # ---------------------------------------------------------
+    def load_symbol(self, symbol: str, rows, stops=()) -> int:
+        with self.lock:
+            book = self.get_book(symbol)
+            for o in book.bids + book.asks + list(book.stops.values()):
+                self._forget(o)
+                self.risk.release(o)
+            book.reset()
+
+            for r in rows:
+                order = self._order_from_row(symbol, r)
+                book.side_book(order["side"]).append(order)
+                book.level_change(order["side"], order["price"], order["remaining_qty"], 1)
+                self._track(order)
+                self.risk.adopt(order)
+
+            for r in stops:
+                order = self._order_from_row(symbol, r)
+                book.add_stop(order)
+                self._track(order)
+                self.risk.adopt(order)
+
+            book.bids.sort(key=book._bid_key)
+            book.asks.sort(key=book._ask_key)
+            self._publish(book)
+            return len(book.bids) + len(book.asks) + len(book.stops)
+
+    @staticmethod
+    def _order_from_row(symbol: str, r) -> dict:
+        stop_price = r.get("stop_price")
+        return {
+            "id": r["id"],
+            "user_id": r["user_id"],
+            "account_id": r["account_id"],
+            "symbol": symbol,
+            "side": r["side"].upper(),
+            "price": float(r["price"] or 0),
+            "qty": float(r["quantity"]),
+            "remaining_qty": float(r["remaining_qty"]),
+            "order_type": r.get("order_type") or "LIMIT",
+            "stop_price": float(stop_price) if stop_price is not None else None,
+            "status": r["status"],
+            "expire_at": r.get("expire_at"),
+            "created_at": r["created_at"],
+        }
+
+    # ---------------------------------------------------------
+    # 단일가 재교차 (장 시작 / 거래 정지 해제 후)
+    #  - 교차된 오더북 전체를 call auction 한 가격으로 체결 (services/call_auction.py)
+    #  - 체결/잔량/레벨 변경은 한 배치로 저장
+    # ---------------------------------------------------------
+    def match_symbol(self, symbol: str, reference_price: float | None = None) -> dict:
+        with self.lock:
+            book = self.get_book(symbol)
+            if reference_price is None:
+                reference_price = book.last_price
+
+            result = call_auction.uncross(book.bids, book.asks, reference_price)
+            if result is None:
+                return {"price": None, "volume": 0.0, "trades": 0, "imbalance": 0.0}
+
+            price = result["price"]
+            fills = []
+            try:
+                for bi, si, qty in result["pairs"]:
+                    fills.append(self._execute_fill(book.bids[bi], book.asks[si], price, qty, symbol))
+
+                book.bids = self._apply_auction_fills(book, book.bids, result["buy_fill"])
+                book.asks = self._apply_auction_fills(book, book.asks, result["sell_fill"])
+
+                fills += self._trigger_stops(book)
+            finally:
+                self._publish(book)
+                self._flush_batch()
+
+            return {
+                "price": price,
+                "volume": result["volume"],
+                "trades": len(fills),
+                "imbalance": result["imbalance"],
+            }
+
+    def _apply_auction_fills(self, book: OrderBook, orders: list, filled) -> list:
+        """
+        배분된 수량만큼 잔량/상태/레벨 반영 → 남은 주문 리스트
+        (체결은 우선순위 prefix 라서 완전 체결분은 앞에서 잘라내면 됨)
+        """
+        done = 0
+        for o, qty in zip(orders, filled.tolist()):
+            if qty <= 0:
+                break
+            o["remaining_qty"] -= qty
+            if o["remaining_qty"] <= 1e-12:
+                o["remaining_qty"] = 0
+                done += 1
+                self._forget(o)
+                self._level_change(book, o, -qty, -1)
+                self.risk.release(o)
+            else:
+                self._level_change(book, o, -qty, 0)
+            self._update_order_status(o)
+        return orders[done:]
+
+    # ---------------------------------------------------------
+    # 시장가 매수 예상 금액 (리스크 예약용)
+    # ---------------------------------------------------------
+    def estimate_market_cost(self, symbol: str, qty: float) -> float:
+        """
+        매도 주문 전체를 walk 해서 qty 를 쓸어올 금액 (잔량이 모자라면 있는 만큼만)
+        매도호가가 없으면 0.0. 호출자가 엔진 락을 잡고 바로 주문까지 넣어야 예약이 맞음
+        """
+        with self.lock:
+            book = self.books.get(symbol)
+            if book is None:
+                return 0.0
+            cost = 0.0
+            left = qty
+            for o in book.asks:
+                take = min(left, o["remaining_qty"])
+                cost += take * o["price"]
+                left -= take
+                if left <= 0:
+                    break
+            return cost
+
+    def has_liquidity(self, symbol: str, side: str) -> bool:
+        """side 주문이 체결될 반대편 주문이 있는지 (엔진 락 안에서)"""
+        book = self.books.get(symbol)
+        return book is not None and bool(book.opposite_book(side))
+
+    # ---------------------------------------------------------
+    # 주문 1건 실행: 매칭 → 지정가 잔량은 오더북, 시장가 잔량은 취소
+    # ---------------------------------------------------------
+    def _execute(self, order: dict, book: OrderBook, is_market: bool = False,
+                 budget: float | None = None) -> List[dict]:
+        fills = self._match_order(order, book, is_market=is_market, budget=budget)
+
+        if is_market:
             if order["remaining_qty"] > 0:
-                self._add_to_orderbook(order, "bids")
+                order["remaining_qty"] = 0
+                order["status"] = "CANCELLED"
+                self._batch.order_updates[order["id"]] = order
+            self.risk.release(order)
+
+        elif order["remaining_qty"] > 0:
+            self._add_to_orderbook(order, book)
+
         else:
-            fills += self._match_order(order, self.orderbook["bids"])
-            if order["remaining_qty"] > 0:
-                self._add_to_orderbook(order, "asks")
+            self.risk.release(order)
 
         return fills
 
     # ---------------------------------------------------------
-    # 시장가 주문
+    # stop 발동 처리 (재귀 없이 큐로)
+    #  발동된 주문의 체결이 다시 last price 를 바꾸면 이어서 발동 → 큐 뒤에 추가
     # ---------------------------------------------------------
-    def process_market_order(self, order: dict):
-        side = order["side"].upper()
+    def _trigger_stops(self, book: OrderBook) -> List[dict]:
+        fills = []
+        queue = deque(book.pop_triggered())
 
-        if side == "BUY":
-            self._match_order(order, self.orderbook["asks"], is_market=True)
-        else:
-            self._match_order(order, self.orderbook["bids"], is_market=True)
-
-        # 시장가는 잔량 있으면 자동 취소
-        if order["remaining_qty"] > 0:
-            self.order_repo.update_order_remaining(
-                order_id=order["id"],
-                remaining_qty=0,
-                status="CANCELLED"
-            )
+        while queue:
+            order = queue.popleft()
+            self._forget(order)
+            order["status"] = "WORKING"
+            self._batch.order_updates[order["id"]] = order
+
+            is_market = order["order_type"] == "STOP"
+            budget = None
+            if is_market and order["side"] == "BUY":
+                # 접수 때는 stop 가격 기준 예약 → 발동 시점 매도호가로 다시 예약 (가용 잔고 안에서)
+                #  예약 금액을 넘는 잔량은 체결하지 않고 시장가 잔량처럼 취소
+                budget = self.risk.top_up(order, self.estimate_market_cost(book.symbol, order["remaining_qty"]))
+
+            fills += self._execute(order, book, is_market=is_market, budget=budget)
+            queue.extend(book.pop_triggered())
+
+        return fills
 
     # ---------------------------------------------------------
     # 핵심 매칭 로직
     # ---------------------------------------------------------
-    def _match_order(self, incoming: dict, opposite_book: List[dict], is_market: bool = False):
+    def _match_order(self, incoming: dict, book: OrderBook, is_market: bool = False,
+                     budget: float | None = None) -> List[dict]:
+        """budget: 매수 체결 금액 한도 (발동된 stop 시장가 매수), None 이면 제한 없음"""
         fills = []
         symbol = incoming["symbol"]
         side = incoming["side"].upper()
+        opposite_book = book.opposite_book(side)
 
         i = 0
         while incoming["remaining_qty"] > 0 and i < len(opposite_book):
@@ -73,13 +521,20 @@ class MatchingEngine:
             trade_qty = min(incoming["remaining_qty"], top["remaining_qty"])
             trade_price = top["price"]  # maker price
 
+            if budget is not None:
+                trade_qty = min(trade_qty, budget / trade_price)
+                if trade_qty <= 1e-12:
+                    break
+                budget -= trade_qty * trade_price
+
             # 체결 처리
             fill = self._execute_fill(
                 buy=incoming if side == "BUY" else top,
                 sell=top if side == "BUY" else incoming,
                 price=trade_price,
                 qty=trade_qty,
-                symbol=symbol
+                symbol=symbol,
+                aggressor=side,
             )
             fills.append(fill)
 
@@ -87,65 +542,58 @@ class MatchingEngine:
             incoming["remaining_qty"] -= trade_qty
             top["remaining_qty"] -= trade_qty
 
+            # 주문 상태 업데이트 (배치 flush 때 반영)
+            self._update_order_status(incoming)
+            self._update_order_status(top)
+
             if top["remaining_qty"] <= 0:
                 opposite_book.pop(i)
+                self._forget(top)
+                self._level_change(book, top, -trade_qty, -1)
+                self.risk.release(top)
             else:
+                self._level_change(book, top, -trade_qty, 0)
                 i += 1
 
         return fills
 
     # ---------------------------------------------------------
-    # 체결 처리: DB + 계좌 + 주문상태
+    # 체결 처리: 체결기록 + 계좌 (DB 반영은 배치)
     # ---------------------------------------------------------
-    def _execute_fill(self, buy, sell, price, qty, symbol):
+    def _execute_fill(self, buy, sell, price, qty, symbol, aggressor=None):
 
-        # --- BUY 체결 기록 ---
-        self.trade_repo.insert_trade(
-            user_id=buy["user_id"],
-            account_id=buy["account_id"],
-            symbol=symbol,
-            side="BUY",
-            price=price,
-            qty=qty,
-            order_id=buy["id"],
-            exchange="LOCAL",
-            remark=None,
-        )
+        # --- 심볼 last price (stop trigger 기준) ---
+        self.books[symbol].last_price = price
 
-        # --- SELL 체결 기록 ---
-        self.trade_repo.insert_trade(
-            user_id=sell["user_id"],
-            account_id=sell["account_id"],
-            symbol=symbol,
-            side="SELL",
-            price=price,
-            qty=qty,
-            order_id=sell["id"],
-            exchange="LOCAL",
-            remark=None,
-        )
+        # --- BUY / SELL 체결 기록 (배치 끝에서 일괄 INSERT) ---
+        ts = datetime.now(timezone.utc)
+        self._tape(symbol).append(price, qty, aggressor, int(ts.timestamp() * 1000))
+        buy_tid = self.trade_ids.next_id()
+        sell_tid = self.trade_ids.next_id()
+        self._batch.trades.append((
+            buy_tid, buy["user_id"], buy["account_id"], symbol, "BUY", price, qty,
+            ts, buy["id"], sell["id"], None,
+        ))
+        self._batch.trades.append((
+            sell_tid, sell["user_id"], sell["account_id"], symbol, "SELL", price, qty,
+            ts, buy["id"], sell["id"], None,
+        ))
 
-        # --- 계좌 반영 ---
-        self.account_service.apply_fill(
-            user_id=buy["user_id"],
-            account_id=buy["account_id"],
-            symbol=symbol,
-            side="BUY",
-            price=price,
-            qty=qty
-        )
-        self.account_service.apply_fill(
-            user_id=sell["user_id"],
-            account_id=sell["account_id"],
-            symbol=symbol,
-            side="SELL",
-            price=price,
-            qty=qty
-        )
+        # --- 리스크 상태 반영 (메모리) ---
+        self.risk.on_fill(buy, price, qty)
+        self.risk.on_fill(sell, price, qty)
 
-        # --- 주문 상태 업데이트 ---
-        self._update_order_status(buy)
-        self._update_order_status(sell)
+        # --- 계좌 반영 (배치 끝에서 netting 후 일괄 반영) ---
+        self._batch.fill_legs.append({
+            "trade_id": buy_tid,
+            "user_id": buy["user_id"], "account_id": buy["account_id"],
+            "symbol": symbol, "side": "BUY", "price": price, "qty": qty,
+        })
+        self._batch.fill_legs.append({
+            "trade_id": sell_tid,
+            "user_id": sell["user_id"], "account_id": sell["account_id"],
+            "symbol": symbol, "side": "SELL", "price": price, "qty": qty,
+        })
 
         # UI 에 전달할 fill 구조
         return {
@@ -156,26 +604,60 @@ class MatchingEngine:
             "sell_order_id": sell["id"],
         }
 
+    def _tape(self, symbol: str) -> TradeTape:
+        tape = self.tapes.get(symbol)
+        if tape is None:
+            tape = self.tapes[symbol] = TradeTape(self.tape_size)
+        return tape
+
+    # ---------------------------------------------------------
+    # 배치 DB 반영 (주문 + 체결 + 계좌, 한 트랜잭션)
+    # ---------------------------------------------------------
+    def _flush_batch(self):
+        if self._batch.is_empty():
+            return
+
+        batch, self._batch = self._batch, PersistBatch()
+        self.persister.submit(batch)
+
     # ---------------------------------------------------------
     # 주문상태 업데이트
     # ---------------------------------------------------------
     def _update_order_status(self, order):
-        remaining = order["remaining_qty"]
-        status = "FILLED" if remaining <= 0 else "PARTIAL"
-
-        self.order_repo.update_order_remaining(
-            order_id=order["id"],
-            remaining_qty=max(remaining, 0),
-            status=status
-        )
+        order["status"] = "FILLED" if order["remaining_qty"] <= 0 else "PARTIAL"
+        self._batch.order_updates[order["id"]] = order
 
     # ---------------------------------------------------------
     # 오더북 등록
     # ---------------------------------------------------------
-    def _add_to_orderbook(self, order, side: str):
-        self.orderbook[side].append(order)
+    def _add_to_orderbook(self, order, book: OrderBook):
+        book.add(order)
+        self._track(order)
+        self._level_change(book, order, order["remaining_qty"], 1)
 
-        if side == "bids":   # DESC
-            self.orderbook[side].sort(key=lambda x: (-x["price"], x["id"]))
-        else:                # ASC
-            self.orderbook[side].sort(key=lambda x: (x["price"], x["id"]))
+    # ---------------------------------------------------------
+    # live 주문 등록/해제 (+ 만료 타이머)
+    # ---------------------------------------------------------
+    def _track(self, order):
+        self._live[order["id"]] = order
+        if order.get("expire_at") is not None:
+            self.timers.schedule(order["id"], int(order["expire_at"].timestamp() * 1000))
+
+    def _forget(self, order):
+        if self._live.pop(order["id"], None) is not None and order.get("expire_at") is not None:
+            self.timers.cancel(order["id"])
+
+    # ---------------------------------------------------------
+    # 가격 레벨 변경 (메모리 + book_levels 배치 delta)
+    # ---------------------------------------------------------
+    def _level_change(self, book: OrderBook, order, dqty: float, dcnt: int):
+        side, price = order["side"], order["price"]
+        book.level_change(side, price, dqty, dcnt)
+
+        key = (book.symbol, side, price)
+        d = self._batch.levels.get(key)
+        if d is None:
+            self._batch.levels[key] = [dqty, dcnt]
+        else:
+            d[0] += dqty
+            d[1] += dcnt
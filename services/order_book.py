@@ -0,0 +1,272 @@
+# services/order_book.py
+import heapq
+from bisect import bisect_left, insort
+from collections import deque
+from typing import NamedTuple
+
+
+class BookSnapshot(NamedTuple):
+    """
+    publish 시점의 상위 N 레벨 (불변)
+    bids / asks : ((price, qty, cnt), ...) 가격 우선순위 순서
+    """
+    seq: int
+    bids: tuple
+    asks: tuple
+
+    def depth(self, n: int | None = None) -> dict:
+        return {
+            "seq": self.seq,
+            "bids": [{"price": p, "qty": q, "cnt": c} for p, q, c in self.bids[:n]],
+            "asks": [{"price": p, "qty": q, "cnt": c} for p, q, c in self.asks[:n]],
+        }
+
+    def ticker(self, last_price: float | None = None) -> dict:
+        """최우선 호가 / mid / spread (한쪽이 비어 있으면 None)"""
+        bid = self.bids[0] if self.bids else None
+        ask = self.asks[0] if self.asks else None
+        both = bid is not None and ask is not None
+        return {
+            "seq": self.seq,
+            "bid": bid[0] if bid else None,
+            "bid_qty": bid[1] if bid else None,
+            "ask": ask[0] if ask else None,
+            "ask_qty": ask[1] if ask else None,
+            "mid": (bid[0] + ask[0]) / 2 if both else None,
+            "spread": ask[0] - bid[0] if both else None,
+            "last": last_price,
+        }
+
+
+EMPTY_SNAPSHOT = BookSnapshot(0, (), ())
+
+
+class OrderBook:
+    """
+    심볼 1개의 메모리 오더북
+    - bids : 가격 DESC, id ASC (가격-시간 우선)
+    - asks : 가격 ASC,  id ASC
+    - levels[side][price] = [qty, cnt] : 가격 레벨 집계 (book_levels 테이블과 동일한 값)
+    - seq    : 레벨이 바뀐 엔진 명령마다 1 증가
+    - deltas : (seq, [(side, price, qty, cnt)]) ring buffer, cnt=0 이면 레벨 삭제
+    - buy_stops  : (stop_price, id) min-heap  → last >= stop 이면 발동
+      sell_stops : (-stop_price, id) max-heap → last <= stop 이면 발동
+      stops      : id -> 대기 중인 stop 주문 (취소는 여기서만 빼고 heap 은 lazy 삭제)
+
+    레벨 변경은 level_change() 로만 하고, 호출자(엔진)가 변경분을 DB 배치에 싣는다.
+    명령 1건이 끝나면 publish() 로 seq 를 올리고 delta 를 남긴다.
+
+    snapshot : publish 마다 교체되는 상위 snapshot_depth 레벨 BookSnapshot
+      조회 스레드는 이 참조 하나만 읽는다 (락 없음, 엔진이 바꾸는 list/dict 를 직접 보지 않음)
+      그보다 깊은 조회는 full_snapshot() (엔진 락 안에서, seq 가 같으면 재사용)
+      바뀐 레벨이 모두 현재 스냅샷 범위 밖이면 해당 side 는 이전 tuple 을 그대로 재사용
+    """
+
+    __slots__ = ("symbol", "bids", "asks", "levels", "seq", "deltas", "_dirty",
+                 "buy_stops", "sell_stops", "stops", "last_price",
+                 "snapshot", "snapshot_depth", "_full")
+
+    def __init__(self, symbol: str, ring_size: int = 1024, snapshot_depth: int = 100):
+        self.symbol = symbol
+        self.bids = []
+        self.asks = []
+        self.levels = {"BUY": {}, "SELL": {}}
+
+        self.seq = 0
+        self.deltas = deque(maxlen=ring_size)
+        self._dirty = set()
+
+        self.buy_stops = []
+        self.sell_stops = []
+        self.stops = {}
+        self.last_price = None
+
+        self.snapshot = EMPTY_SNAPSHOT
+        self.snapshot_depth = snapshot_depth
+        self._full = None
+
+    # ---------------------------------------------------------
+    # side 별 리스트
+    # ---------------------------------------------------------
+    def side_book(self, side: str) -> list:
+        return self.bids if side == "BUY" else self.asks
+
+    def opposite_book(self, side: str) -> list:
+        return self.asks if side == "BUY" else self.bids
+
+    # ---------------------------------------------------------
+    # 주문 등록 / 제거 (레벨 집계는 level_change 로 따로)
+    # ---------------------------------------------------------
+    @staticmethod
+    def _bid_key(o):
+        return (-o["price"], o["id"])
+
+    @staticmethod
+    def _ask_key(o):
+        return (o["price"], o["id"])
+
+    def add(self, order: dict):
+        if order["side"] == "BUY":
+            insort(self.bids, order, key=self._bid_key)
+        else:
+            insort(self.asks, order, key=self._ask_key)
+
+    def reset(self):
+        """오더북 / stop 대기열 재적재 전 비우기 (사라진 레벨은 다음 publish 에 cnt=0 delta 로 나감)"""
+        for side in ("BUY", "SELL"):
+            for price in self.levels[side]:
+                self._dirty.add((side, price))
+        self.bids, self.asks = [], []
+        self.levels = {"BUY": {}, "SELL": {}}
+        self.buy_stops, self.sell_stops, self.stops = [], [], {}
+        self.snapshot = BookSnapshot(self.seq, (), ())
+
+    def remove_order(self, order: dict) -> bool:
+        """(가격, id) 정렬 위치를 이분 탐색해서 제거"""
+        if order["side"] == "BUY":
+            book, key = self.bids, self._bid_key
+        else:
+            book, key = self.asks, self._ask_key
+
+        i = bisect_left(book, key(order), key=key)
+        if i < len(book) and book[i] is order:
+            del book[i]
+            return True
+        return False
+
+    # ---------------------------------------------------------
+    # stop 주문 trigger index
+    # ---------------------------------------------------------
+    def add_stop(self, order: dict):
+        self.stops[order["id"]] = order
+        if order["side"] == "BUY":
+            heapq.heappush(self.buy_stops, (order["stop_price"], order["id"]))
+        else:
+            heapq.heappush(self.sell_stops, (-order["stop_price"], order["id"]))
+
+    def remove_stop_ids(self, ids: set) -> list:
+        removed = [self.stops.pop(oid) for oid in ids if oid in self.stops]
+
+        # 취소로 죽은 heap 항목이 너무 많아지면 한번 정리
+        if removed and len(self.buy_stops) + len(self.sell_stops) > 2 * len(self.stops) + 64:
+            self.buy_stops = [e for e in self.buy_stops if e[1] in self.stops]
+            self.sell_stops = [e for e in self.sell_stops if e[1] in self.stops]
+            heapq.heapify(self.buy_stops)
+            heapq.heapify(self.sell_stops)
+        return removed
+
+    def pop_triggered(self) -> list:
+        """
+        last_price 로 발동된 stop 만 꺼냄 (O(k log n))
+        반환 순서는 주문 id(접수 순서) → 리플레이해도 같은 순서
+        """
+        last = self.last_price
+        if last is None or not self.stops:
+            return []
+
+        fired = []
+        while self.buy_stops and self.buy_stops[0][0] <= last:
+            _, oid = heapq.heappop(self.buy_stops)
+            order = self.stops.pop(oid, None)
+            if order is not None:
+                fired.append(order)
+        while self.sell_stops and -self.sell_stops[0][0] >= last:
+            _, oid = heapq.heappop(self.sell_stops)
+            order = self.stops.pop(oid, None)
+            if order is not None:
+                fired.append(order)
+
+        fired.sort(key=lambda o: o["id"])
+        return fired
+
+    # ---------------------------------------------------------
+    # 가격 레벨 집계
+    # ---------------------------------------------------------
+    def level_change(self, side: str, price: float, dqty: float, dcnt: int):
+        lv = self.levels[side].get(price)
+        if lv is None:
+            lv = self.levels[side][price] = [0.0, 0]
+        lv[0] += dqty
+        lv[1] += dcnt
+        if lv[1] <= 0:
+            del self.levels[side][price]
+        self._dirty.add((side, price))
+
+    # ---------------------------------------------------------
+    # 명령 단위 seq / delta
+    # ---------------------------------------------------------
+    def publish(self) -> int:
+        if self._dirty:
+            changes = []
+            touched = {"BUY": False, "SELL": False}
+            prev = self.snapshot
+            for side, price in self._dirty:
+                lv = self.levels[side].get(price)
+                changes.append((side, price, lv[0], lv[1]) if lv else (side, price, 0.0, 0))
+                if not touched[side]:
+                    touched[side] = self._in_snapshot(prev, side, price)
+            self._dirty.clear()
+            self.deltas.append((self.seq + 1, changes))
+            self.seq += 1
+
+            # 새 tuple 을 다 만든 뒤 참조 한 번으로 교체
+            self.snapshot = BookSnapshot(
+                self.seq,
+                self._top("BUY") if touched["BUY"] else prev.bids,
+                self._top("SELL") if touched["SELL"] else prev.asks,
+            )
+        return self.seq
+
+    def _in_snapshot(self, snap: BookSnapshot, side: str, price: float) -> bool:
+        """이 가격의 변경이 상위 snapshot_depth 레벨에 영향을 주는지"""
+        top = snap.bids if side == "BUY" else snap.asks
+        if len(top) < self.snapshot_depth:
+            return True
+        worst = top[-1][0]
+        return price >= worst if side == "BUY" else price <= worst
+
+    def _top(self, side: str) -> tuple:
+        lv = self.levels[side]
+        pick = heapq.nlargest if side == "BUY" else heapq.nsmallest
+        return tuple((p, lv[p][0], lv[p][1]) for p in pick(self.snapshot_depth, lv))
+
+    def full_snapshot(self) -> BookSnapshot:
+        """전체 레벨 BookSnapshot (엔진 락 안에서 호출, publish 된 seq 단위로 재사용)"""
+        full = self._full
+        if full is None or full.seq != self.seq:
+            full = self._full = BookSnapshot(
+                self.seq,
+                tuple((p, lv[0], lv[1]) for p, lv in sorted(self.levels["BUY"].items(), reverse=True)),
+                tuple((p, lv[0], lv[1]) for p, lv in sorted(self.levels["SELL"].items())),
+            )
+        return full
+
+    def changes_since(self, since: int, upto: int | None = None) -> list | None:
+        """
+        since 이후 (upto 까지) 바뀐 레벨 [(side, price, qty, cnt)] (레벨별 최신 값)
+        ring buffer 범위를 벗어나면 None → 전체 스냅샷 필요
+        """
+        upto = self.seq if upto is None else upto
+        deltas = list(self.deltas)
+        if since > upto or (since < upto and (not deltas or deltas[0][0] > since + 1)):
+            return None
+
+        latest = {}
+        for seq, changes in deltas:
+            if seq > upto:
+                break
+            if seq > since:
+                for side, price, qty, cnt in changes:
+                    latest[(side, price)] = (side, price, qty, cnt)
+        return list(latest.values())
+
+    def depth(self, side: str, n: int | None = None) -> list[dict]:
+        """
+        가격 우선순위 순서의 상위 n 레벨 [{price, qty, cnt}] (전체 레벨 직접 조회)
+        엔진 스레드 / 오프라인 전용, 조회 API 는 snapshot 사용
+        """
+        lv = self.levels[side]
+        prices = sorted(lv, reverse=(side == "BUY"))
+        if n is not None:
+            prices = prices[:n]
+        return [{"price": p, "qty": lv[p][0], "cnt": lv[p][1]} for p in prices]
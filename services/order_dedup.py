@@ -0,0 +1,94 @@
+# services/order_dedup.py
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+from services.order_journal import read_events
+from services.ttl_cache import TTLCache
+
+
+class OrderDedup:
+    """
+    client_order_id 중복 접수 방지 (계좌별 LRU + TTL, 메모리)
+
+    - (account_id, client_order_id) → 처음 접수된 요청의 Future
+      재시도는 같은 Future 를 돌려받음 → 처리 중이면 끝날 때까지 기다리고, 끝났으면 같은 결과
+    - 계좌마다 최근 per_account 개, 전체 최대 max_accounts 계좌, ttl 초 동안만 기억
+    - 재시작 시 주문 저널에서 ttl 이내 기록으로 복구 (결과는 order_id 만)
+
+    DB unique 제약 대신 접수 앞단에서 끊으므로 중복 요청은 DB / 오더북에 닿지 않는다.
+    """
+
+    def __init__(self, per_account: int | None = None, max_accounts: int | None = None,
+                 ttl: float | None = None):
+        self.per_account = per_account or int(os.getenv("ORDER_DEDUP_PER_ACCOUNT", "1000"))
+        self.ttl = ttl or float(os.getenv("ORDER_DEDUP_TTL", "600"))
+        max_accounts = max_accounts or int(os.getenv("ORDER_DEDUP_ACCOUNTS", "100000"))
+
+        self.accounts = TTLCache(maxsize=max_accounts, ttl=self.ttl)
+        self._lock = threading.Lock()
+
+        self.duplicates = 0
+
+    def _ids(self, account_id: int, create: bool) -> TTLCache | None:
+        ids = self.accounts.get(account_id)
+        if ids is None and create:
+            ids = TTLCache(maxsize=self.per_account, ttl=self.ttl)
+        if ids is not None:
+            self.accounts.set(account_id, ids)   # 계좌 TTL 연장
+        return ids
+
+    # ---------------------------------------------------------
+    # 접수 / 해제
+    # ---------------------------------------------------------
+    def claim(self, account_id: int, client_order_id: str, fut: Future) -> Future | None:
+        """처음 보는 id 면 fut 를 등록하고 None, 이미 있으면 기존 Future"""
+        with self._lock:
+            ids = self._ids(account_id, create=True)
+            prev = ids.get(client_order_id)
+            if prev is not None:
+                self.duplicates += 1
+                return prev
+            ids.set(client_order_id, fut)
+            return None
+
+    def release(self, account_id: int, client_order_id: str, fut: Future | None = None):
+        """
+        접수 실패(과부하/예외) → 같은 id 로 다시 보낼 수 있게
+        fut 를 주면 그 Future 가 아직 등록돼 있을 때만 (LRU/TTL 로 빠진 뒤 다시 claim 된 것은 유지)
+        """
+        with self._lock:
+            ids = self._ids(account_id, create=False)
+            if ids is None:
+                return
+            if fut is None or ids.get(client_order_id) is fut:
+                ids.pop(client_order_id)
+
+    # ---------------------------------------------------------
+    # 저널에서 복구
+    # ---------------------------------------------------------
+    def load_journal(self, path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+
+        cutoff = time.time() - self.ttl
+        loaded = 0
+        for e in read_events(path):
+            coid = e.get("client_order_id")
+            if coid is None or e.get("ts", 0) < cutoff:
+                continue
+            fut = Future()
+            fut.set_result({"order_id": e.get("order_id"), "fills": [], "recovered": True})
+            with self._lock:
+                self._ids(e["account_id"], create=True).set(coid, fut, ttl=e["ts"] - cutoff)
+            loaded += 1
+        return loaded
+
+    def stats(self) -> dict:
+        return {
+            "accounts": len(self.accounts),
+            "per_account": self.per_account,
+            "ttl": self.ttl,
+            "duplicates": self.duplicates,
+        }
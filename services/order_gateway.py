@@ -0,0 +1,271 @@
+# services/order_gateway.py
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from services.order_dedup import OrderDedup
+from services.ttl_cache import TTLCache
+
+
+class Overloaded(Exception):
+    """접수 거절 (API 에서 429 + Retry-After)"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """유저별 주문 속도 제한 (rate 개/초, 최대 burst 개 적립)"""
+
+    __slots__ = ("rate", "burst", "tokens", "stamp")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.stamp = time.monotonic()
+
+    def take(self, now: float) -> float:
+        """토큰 1개 사용 → 0.0, 부족하면 다음 토큰까지 남은 초"""
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+
+class OrderGateway:
+    """
+    주문 접수 admission control (OrderService 앞단)
+
+    - 신규 주문은 심볼별 bounded queue (queue_limit), 유저별 token bucket 으로 제한
+    - 취소는 별도 큐 (cancel_limit), 속도 제한 없음, 신규 주문보다 항상 먼저 처리
+    - 넘치면 큐에 넣지 않고 바로 Overloaded(retry_after) → 429
+    - worker 스레드 1개가 취소 큐 → 심볼 큐 round-robin 순으로 OrderService 호출
+      (엔진이 어차피 명령을 한 번에 하나씩 처리하므로 API 스레드가 엔진 락/DB 커넥션에 몰리지 않게 함)
+    - client_order_id 가 있으면 OrderDedup 으로 재시도를 걸러서 처음 요청의 Future 를 돌려줌
+
+    호출자는 submit / submit_cancel 이 돌려준 Future 를 기다린다.
+    """
+
+    def __init__(self, order_service,
+                 queue_limit: int | None = None,
+                 cancel_limit: int | None = None,
+                 user_rate: float | None = None,
+                 user_burst: float | None = None,
+                 dedup: OrderDedup | None = None):
+        self.order_service = order_service
+        self.dedup = dedup or OrderDedup()
+
+        self.queue_limit = queue_limit or int(os.getenv("ORDER_QUEUE_LIMIT", "1000"))
+        self.cancel_limit = cancel_limit or int(os.getenv("ORDER_CANCEL_QUEUE_LIMIT", "10000"))
+        self.user_rate = user_rate or float(os.getenv("ORDER_USER_RATE", "20"))
+        self.user_burst = user_burst or float(os.getenv("ORDER_USER_BURST", "40"))
+
+        self._queues = {}          # symbol -> deque[(fn, args, kwargs, future)]
+        self._ready = deque()      # 대기 주문이 있는 심볼 (round-robin)
+        self._cancels = deque()
+        self._cond = threading.Condition()
+
+        # 오래 안 쓴 유저 bucket 은 TTL 로 정리 (만료 = 가득 찬 bucket 과 동일)
+        self._buckets = TTLCache(maxsize=100000, ttl=max(60.0, self.user_burst / self.user_rate))
+
+        self._worker = None
+        self._stopping = False
+
+        # 모니터링
+        self.admitted = 0
+        self.cancels_admitted = 0
+        self.rejected_rate = 0
+        self.rejected_queue = 0
+        self.completed = 0
+        self._service_sec = 0.001   # 명령 1건 처리시간 EWMA (Retry-After 추정용)
+
+    # ---------------------------------------------------------
+    # 접수
+    # ---------------------------------------------------------
+    def submit(self, user_id: int, symbol: str, fn, *args,
+               dedup_key: tuple | None = None, **kwargs) -> Future:
+        """
+        신규 주문: 중복 확인 → 유저 속도 제한 → 심볼 큐 길이 확인 → 큐잉
+        dedup_key = (account_id, client_order_id)
+        """
+        now = time.monotonic()
+        fut = Future()
+
+        if dedup_key is not None:
+            prev = self.dedup.claim(*dedup_key, fut)
+            if prev is not None:
+                return prev
+
+            def release_on_error(f):
+                if f.exception() is not None:
+                    self.dedup.release(*dedup_key, f)
+
+            fut.add_done_callback(release_on_error)
+            try:
+                return self._enqueue(user_id, symbol, fn, args, kwargs, fut, now)
+            except Overloaded:
+                self.dedup.release(*dedup_key, fut)
+                raise
+
+        return self._enqueue(user_id, symbol, fn, args, kwargs, fut, now)
+
+    def _enqueue(self, user_id, symbol, fn, args, kwargs, fut, now) -> Future:
+        with self._cond:
+            bucket = self._buckets.get(user_id)
+            if bucket is None:
+                bucket = TokenBucket(self.user_rate, self.user_burst)
+            wait = bucket.take(now)
+            self._buckets.set(user_id, bucket)
+            if wait > 0:
+                self.rejected_rate += 1
+                raise Overloaded("rate limit exceeded", wait)
+
+            q = self._queues.get(symbol)
+            if q is None:
+                q = self._queues[symbol] = deque()
+            if len(q) >= self.queue_limit:
+                bucket.tokens += 1.0   # 큐 거절분은 속도 제한에서 차감하지 않음
+                self.rejected_queue += 1
+                raise Overloaded(f"{symbol} order queue full", self._retry_after())
+
+            q.append((fn, args, kwargs, fut))
+            if len(q) == 1:
+                self._ready.append(symbol)
+            self.admitted += 1
+            self._cond.notify()
+
+        return fut
+
+    def submit_cancel(self, fn, *args, **kwargs) -> Future:
+        fut = Future()
+        with self._cond:
+            if len(self._cancels) >= self.cancel_limit:
+                self.rejected_queue += 1
+                raise Overloaded("cancel queue full", self._retry_after())
+            self._cancels.append((fn, args, kwargs, fut))
+            self.cancels_admitted += 1
+            self._cond.notify()
+        return fut
+
+    def _retry_after(self) -> float:
+        queued = len(self._cancels) + sum(len(q) for q in self._queues.values())
+        return max(1.0, math.ceil(queued * self._service_sec))
+
+    # ---------------------------------------------------------
+    # worker
+    # ---------------------------------------------------------
+    def start(self):
+        if self._worker is not None:
+            return
+        self._stopping = False
+        self._worker = threading.Thread(target=self._run, name="order-gateway", daemon=True)
+        self._worker.start()
+
+    def stop(self, timeout: float = 10.0):
+        """남은 요청을 모두 처리하고 종료"""
+        if self._worker is None:
+            return
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._worker.join(timeout)
+        self._worker = None
+
+    def _next(self):
+        """취소 우선, 그 다음 심볼 round-robin (cond 잡은 상태에서 호출)"""
+        if self._cancels:
+            return self._cancels.popleft()
+        symbol = self._ready.popleft()
+        q = self._queues[symbol]
+        item = q.popleft()
+        if q:
+            self._ready.append(symbol)
+        return item
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._cancels and not self._ready and not self._stopping:
+                    self._cond.wait()
+                if not self._cancels and not self._ready:
+                    return
+                fn, args, kwargs, fut = self._next()
+
+            if not fut.set_running_or_notify_cancel():
+                continue
+
+            t0 = time.perf_counter()
+            try:
+                fut.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                fut.set_exception(e)
+            finally:
+                self._service_sec = 0.9 * self._service_sec + 0.1 * (time.perf_counter() - t0)
+                self.completed += 1
+
+    # ---------------------------------------------------------
+    # OrderService 래퍼
+    # ---------------------------------------------------------
+    @staticmethod
+    def _dedup_key(account_id, client_order_id):
+        return (account_id, client_order_id) if client_order_id else None
+
+    def place_limit(self, user_id, account_id, symbol, side, price, qty, good_till=None,
+                    client_order_id=None) -> Future:
+        symbol = symbol.upper()
+        return self.submit(user_id, symbol, self.order_service.place_limit,
+                           user_id, account_id, symbol, side, price, qty, good_till,
+                           client_order_id,
+                           dedup_key=self._dedup_key(account_id, client_order_id))
+
+    def place_market(self, user_id, account_id, symbol, side, qty,
+                     client_order_id=None) -> Future:
+        symbol = symbol.upper()
+        return self.submit(user_id, symbol, self.order_service.place_market,
+                           user_id, account_id, symbol, side, qty, client_order_id,
+                           dedup_key=self._dedup_key(account_id, client_order_id))
+
+    def place_stop(self, user_id, account_id, symbol, side, stop_price, qty,
+                   price=None, good_till=None, client_order_id=None) -> Future:
+        symbol = symbol.upper()
+        return self.submit(user_id, symbol, self.order_service.place_stop,
+                           user_id, account_id, symbol, side, stop_price, qty, price, good_till,
+                           client_order_id,
+                           dedup_key=self._dedup_key(account_id, client_order_id))
+
+    def cancel_orders(self, order_ids) -> Future:
+        return self.submit_cancel(self.order_service.cancel_orders, list(order_ids))
+
+    # ---------------------------------------------------------
+    # 모니터링 / 튜닝
+    # ---------------------------------------------------------
+    def stats(self) -> dict:
+        with self._cond:
+            queues = {s: len(q) for s, q in self._queues.items() if q}
+            cancel_queue = len(self._cancels)
+        return {
+            "limits": {
+                "queue_limit": self.queue_limit,
+                "cancel_limit": self.cancel_limit,
+                "user_rate": self.user_rate,
+                "user_burst": self.user_burst,
+            },
+            "queues": queues,
+            "cancel_queue": cancel_queue,
+            "admitted": self.admitted,
+            "cancels_admitted": self.cancels_admitted,
+            "rejected_rate": self.rejected_rate,
+            "rejected_queue": self.rejected_queue,
+            "completed": self.completed,
+            "avg_service_ms": round(self._service_sec * 1000, 3),
+            "users_tracked": len(self._buckets),
+            "dedup": self.dedup.stats(),
+        }
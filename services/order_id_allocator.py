@@ -0,0 +1,26 @@
+# services/order_id_allocator.py
+import threading
+from collections import deque
+
+
+class OrderIdAllocator:
+    """
+    orders.id 시퀀스를 블록 단위로 미리 받아두고 엔진에서 바로 id 를 할당.
+    - 블록이 비었을 때만 DB 왕복 1회 (nextval × block_size)
+    - 주문 INSERT 전에 id 가 정해지므로 INSERT ... RETURNING id / 재조회가 필요 없음
+    - reserve 를 주면 다른 시퀀스 (예: trades.id → trade_repo.reserve_trade_ids)
+    """
+
+    def __init__(self, order_repo, block_size: int = 1000, reserve=None):
+        self.order_repo = order_repo
+        self.block_size = block_size
+        self.reserve = reserve or order_repo.reserve_order_ids
+
+        self._ids = deque()
+        self._lock = threading.Lock()
+
+    def next_id(self) -> int:
+        with self._lock:
+            if not self._ids:
+                self._ids.extend(self.reserve(self.block_size))
+            return self._ids.popleft()
@@ -0,0 +1,51 @@
+# services/order_journal.py
+import json
+import os
+import threading
+import time
+
+
+class OrderJournal:
+    """
+    주문/취소 이벤트 JSONL 기록 (엔진 리플레이 / 장애 복구용)
+
+    한 줄 = 이벤트 1건
+      {"ts": 1700000000.123, "type": "limit",  "order_id": 1, "user_id": 1, "account_id": 1,
+       "symbol": "SOLUSDT", "side": "BUY", "price": 100.0, "qty": 1.0}
+      {"ts": ..., "type": "market", ...  (price 없음)}
+      {"ts": ..., "type": "stop",   ..., "stop_price": 101.0, "price": null(STOP) | 지정가(STOP_LIMIT)}
+      {"ts": ..., "type": "cancel", "order_ids": [1, 2]}
+    limit / stop 은 GTT/GTD 면 "expire_at": epoch 초 (없으면 null = GTC)
+    신규 주문에는 "client_order_id" (없으면 null) → services/order_dedup.py 가 재시작 시 읽음
+
+    engine/replay.py 가 같은 형식을 읽는다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, "a", buffering=1, encoding="utf-8")
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """ORDER_JOURNAL_PATH 가 있을 때만 저널 사용"""
+        path = os.getenv("ORDER_JOURNAL_PATH")
+        return cls(path) if path else None
+
+    def record(self, type_: str, **fields):
+        line = json.dumps({"ts": time.time(), "type": type_, **fields}, separators=(",", ":"))
+        with self._lock:
+            self._f.write(line + "\n")
+
+    def close(self):
+        with self._lock:
+            self._f.close()
+
+
+def read_events(path: str):
+    """저널 JSONL → 이벤트 dict (빈 줄 무시)"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
@@ -1,4 +1,24 @@
 # services/order_service.py
+from datetime import date, datetime, time, timezone
+
+from services.order_journal import OrderJournal
+
+
+def expire_at_from(good_till) -> datetime | None:
+    """
+    만료 조건 → UTC 만료 시각
+      None     : GTC
+      datetime : GTT (tz 없으면 UTC 로 간주)
+      date     : GTD (해당 날짜 UTC 자정 직전까지 유효)
+    """
+    if good_till is None:
+        return None
+    if isinstance(good_till, datetime):
+        return good_till if good_till.tzinfo else good_till.replace(tzinfo=timezone.utc)
+    if isinstance(good_till, date):
+        return datetime.combine(good_till, time.max, tzinfo=timezone.utc)
+    raise ValueError(f"invalid good_till: {good_till!r}")
+
 
 class OrderService:
     """
@@ -6,13 +26,15 @@ class OrderService:
     -----------------------
     - OrderRepository + TradeRepository + MatchingEngine
     - 지정가/시장가 주문 처리
-    - 주문 INSERT → 매칭 → 체결 저장 → 잔량 업데이트
+    - 엔진 id 할당 → 매칭 → 주문+체결+잔량 배치 저장
+    - 엔진에 들어가는 주문/취소는 저널(ORDER_JOURNAL_PATH)에 먼저 기록 → engine/replay.py
     """
 
-    def __init__(self, order_repo, trade_repo, matching_engine):
+    def __init__(self, order_repo, trade_repo, matching_engine, journal: OrderJournal | None = None):
         self.order_repo = order_repo
         self.trade_repo = trade_repo
         self.engine = matching_engine
+        self.journal = journal or OrderJournal.from_env()
 
     # ---------------------------------------------------------
     # 단순 주문 INSERT (UI에서 사용)
@@ -35,59 +57,129 @@ class OrderService:
     # ---------------------------------------------------------
     # 지정가 주문
     # ---------------------------------------------------------
-    def place_limit(self, user_id, account_id, symbol, side, price, qty):
+    def place_limit(self, user_id, account_id, symbol, side, price, qty, good_till=None,
+                    client_order_id=None):
         """
-        1) DB INSERT
-        2) 매칭엔진에 전달
+        good_till: GTT datetime / GTD date (없으면 GTC)
+        client_order_id: 저널에 같이 기록 (재시작 시 중복 접수 캐시 복구용)
+        0) 사전 리스크 체크 (거절 시 DB 미접근)
+        1) 엔진에서 id 할당 + 메모리 주문 생성
+        2) 즉시 매칭 → 주문/체결을 한 배치로 저장
         3) 체결 결과 반환
         """
-        order_id = self.order_repo.insert_order(
-            user_id=user_id,
-            account_id=account_id,
-            symbol=symbol.upper(),
-            side=side.upper(),
-            price=price,
-            quantity=qty,
-            remaining_qty=qty,
-            status="WORKING"
-        )
+        symbol = symbol.upper()
+        side = side.upper()
+        notional = price * qty
+        expire_at = expire_at_from(good_till)
+
+        reason = self.engine.risk.check_order(account_id, symbol, side, qty, notional)
+        if reason:
+            return {"order_id": None, "fills": [], "rejected": reason}
+
+        try:
+            order = self.engine.create_order(
+                user_id, account_id, symbol, side, price, qty, expire_at=expire_at,
+            )
+        except Exception:
+            self.engine.risk.unreserve(account_id, symbol, side, qty, notional)
+            raise
+
+        self.engine.risk.bind(order, notional)
+
+        if self.journal:
+            self.journal.record(
+                "limit", order_id=order["id"], user_id=user_id, account_id=account_id,
+                symbol=symbol, side=side, price=price, qty=qty,
+                expire_at=expire_at.timestamp() if expire_at else None,
+                client_order_id=client_order_id,
+            )
+
+        # 매칭엔진 호출 (주문 INSERT 는 체결과 같은 배치)
+        fills = self.engine.process_limit_order(order, is_new=True)
+
+        return {"order_id": order["id"], "fills": fills}
+
+    # ---------------------------------------------------------
+    # 시장가 주문
+    # ---------------------------------------------------------
+    def place_market(self, user_id, account_id, symbol, side, qty, client_order_id=None):
+        """
+        예상 금액 계산 → 리스크 예약 → 매칭을 엔진 락 하나로 묶음
+        (그 사이 오더북이 바뀌어 예약보다 비싸게 체결되지 않도록)
+        반대편 호가가 비어 있으면 예약 없이 거절
+        """
+        symbol = symbol.upper()
+        side = side.upper()
 
-        if not order_id:
-            return {"order_id": None, "fills": []}
+        with self.engine.lock:
+            if not self.engine.has_liquidity(symbol, side):
+                return {"order_id": None, "fills": [], "rejected": "NO_LIQUIDITY"}
 
-        # MatchingEngine은 DB에서 주문 읽어야 하므로 order_repo.get_order 필요
-        order = self.order_repo.get_order(order_id)
-        if not order:
-            return {"order_id": order_id, "fills": []}
+            # 시장가 매수는 현재 매도 주문 전체를 쓸어올 금액으로 예약
+            notional = self.engine.estimate_market_cost(symbol, qty) if side == "BUY" else 0.0
 
-        # 매칭엔진 호출
-        fills = self.engine.process_limit_order(order)
+            reason = self.engine.risk.check_order(account_id, symbol, side, qty, notional)
+            if reason:
+                return {"order_id": None, "fills": [], "rejected": reason}
 
-        return {"order_id": order_id, "fills": fills}
+            try:
+                order = self.engine.create_order(user_id, account_id, symbol, side, 0.0, qty)
+            except Exception:
+                self.engine.risk.unreserve(account_id, symbol, side, qty, notional)
+                raise
 
-    # ---------------------------------------------------------
-    # 시장가 주문
-    # ---------------------------------------------------------
-    def place_market(self, user_id, account_id, symbol, side, qty):
-        order_id = self.place_order(
-            user_id=user_id,
-            account_id=account_id,
-            symbol=symbol,
-            side=side,
-            price=0.0,
-            qty=qty
-        )
+            self.engine.risk.bind(order, notional)
 
-        if not order_id:
-            return {"order_id": None, "fills": []}
+            if self.journal:
+                self.journal.record(
+                    "market", order_id=order["id"], user_id=user_id, account_id=account_id,
+                    symbol=symbol, side=side, qty=qty, client_order_id=client_order_id,
+                )
 
-        order = self.order_repo.get_order(order_id)
-        if not order:
-            return {"order_id": order_id, "fills": []}
+            fills = self.engine.process_market_order(order, is_new=True)
 
-        fills = self.engine.process_market_order(order)
+        return {"order_id": order["id"], "fills": fills}
 
-        return {"order_id": order_id, "fills": fills}
+    # ---------------------------------------------------------
+    # stop / stop-limit 주문
+    #  price 가 있으면 STOP_LIMIT (발동 시 price 지정가), 없으면 STOP (발동 시 시장가)
+    # ---------------------------------------------------------
+    def place_stop(self, user_id, account_id, symbol, side, stop_price, qty, price=None,
+                   good_till=None, client_order_id=None):
+        symbol = symbol.upper()
+        side = side.upper()
+        order_type = "STOP_LIMIT" if price else "STOP"
+        expire_at = expire_at_from(good_till)
+
+        # 시장가 stop 은 stop 가격 기준으로 예약
+        notional = (price or stop_price) * qty
+
+        reason = self.engine.risk.check_order(account_id, symbol, side, qty, notional)
+        if reason:
+            return {"order_id": None, "fills": [], "rejected": reason}
+
+        try:
+            order = self.engine.create_order(
+                user_id, account_id, symbol, side, price or 0.0, qty,
+                order_type=order_type, stop_price=stop_price, expire_at=expire_at,
+            )
+        except Exception:
+            self.engine.risk.unreserve(account_id, symbol, side, qty, notional)
+            raise
+
+        self.engine.risk.bind(order, notional)
+
+        if self.journal:
+            self.journal.record(
+                "stop", order_id=order["id"], user_id=user_id, account_id=account_id,
+                symbol=symbol, side=side, price=price, stop_price=stop_price, qty=qty,
+                expire_at=expire_at.timestamp() if expire_at else None,
+                client_order_id=client_order_id,
+            )
+
+        fills = self.engine.process_stop_order(order, is_new=True)
+
+        return {"order_id": order["id"], "fills": fills}
 
     # ---------------------------------------------------------
     # 잔량 업데이트
@@ -99,7 +191,32 @@ class OrderService:
     # 주문 취소
     # ---------------------------------------------------------
     def cancel_orders(self, order_ids):
-        return self.order_repo.cancel_orders(order_ids)
+        """
+        엔진 오더북에 있는 주문은 엔진이 취소 (상태 + book_levels 를 배치로 반영)
+        나머지(엔진 미적재 주문)만 DB 에서 직접 취소
+        """
+        if self.journal:
+            self.journal.record("cancel", order_ids=list(order_ids))
+
+        cancelled = set(self.engine.cancel_orders(order_ids))
+        rest = [oid for oid in order_ids if oid not in cancelled]
+        affected = self.order_repo.cancel_orders(rest) if rest else 0
+        return len(cancelled) + affected
+
+    def owned_order_ids(self, user_id, order_ids) -> list:
+        """user_id 소유 주문만 (엔진 live 주문 → 없는 것만 DB 에서 한 번에)"""
+        owned, missing = set(), []
+        for oid in order_ids:
+            order = self.engine.live_order(oid)
+            if order is None:
+                missing.append(oid)
+            elif order["user_id"] == user_id:
+                owned.add(oid)
+
+        if missing:
+            owners = self.order_repo.get_order_owners(missing)
+            owned.update(oid for oid in missing if owners.get(oid) == user_id)
+        return [oid for oid in order_ids if oid in owned]
 
     # ---------------------------------------------------------
     # 미체결 조회
@@ -0,0 +1,130 @@
+# services/profiler.py
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class ProfilerBusy(RuntimeError):
+    """이미 다른 프로파일링이 실행 중"""
+
+
+class SamplingProfiler:
+    """
+    필요할 때만 켜는 샘플링 프로파일러 (켜져 있지 않으면 비용 0)
+    - interval 마다 sys._current_frames() 로 모든 스레드 스택을 찍어 집계
+    - 결과는 collapsed stack ("thread;mod:func;mod:func count" 줄 단위)
+      → flamegraph.pl / speedscope / inferno 에 그대로 입력
+    - 락/소켓 대기 중인 스레드는 기본 제외 (idle=True 면 포함)
+    - 한 번에 하나만 실행
+    """
+
+    # 스택 끝(leaf)이 이 모듈이면 대기 중인 스레드로 봄
+    IDLE_MODULES = frozenset({
+        "threading", "selectors", "queue", "socket", "socketserver", "ssl",
+        "concurrent.futures.thread", "concurrent.futures._base",
+        "asyncio.base_events", "asyncio.events", "asyncio.runners",
+    })
+
+    def __init__(self, interval_ms: float | None = None, max_seconds: float | None = None):
+        self.interval_ms = interval_ms or float(os.getenv("PROFILE_INTERVAL_MS", "10"))
+        self.max_seconds = max_seconds or float(os.getenv("PROFILE_MAX_SEC", "60"))
+
+        self._lock = threading.Lock()
+        self._labels = {}          # code -> "module:qualname"
+        self.running = False
+        self.last = None           # 마지막 실행 요약
+
+    def _label(self, frame) -> str:
+        code = frame.f_code
+        label = self._labels.get(code)
+        if label is None:
+            module = frame.f_globals.get("__name__", "?")
+            label = self._labels[code] = f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+        return label
+
+    def _stack(self, frame) -> list:
+        stack = []
+        while frame is not None:
+            stack.append(self._label(frame))
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+    def run(self, seconds: float, interval_ms: float | None = None,
+            thread: str | None = None, idle: bool = False) -> dict:
+        """
+        seconds 동안 샘플링 (호출한 스레드에서 실행, 끝날 때까지 반환하지 않음)
+        thread : 스레드 이름에 이 문자열이 들어간 것만
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("profiler already running")
+
+        seconds = min(max(seconds, 0.1), self.max_seconds)
+        interval = (interval_ms or self.interval_ms) / 1000
+        me = threading.get_ident()
+        counts = Counter()
+        samples = 0
+
+        self.running = True
+        try:
+            t0 = time.perf_counter()
+            deadline = t0 + seconds
+            names = {}
+            names_at = 0.0
+            next_at = t0
+
+            while True:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                if now - names_at > 1.0:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                    names_at = now
+
+                for ident, frame in sys._current_frames().items():
+                    if ident == me:
+                        continue
+                    name = names.get(ident, str(ident))
+                    if thread and thread not in name:
+                        continue
+                    if not idle and frame.f_globals.get("__name__") in self.IDLE_MODULES:
+                        continue
+                    counts[";".join([name, *self._stack(frame)])] += 1
+                samples += 1
+
+                next_at += interval
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_at = time.perf_counter()   # 밀렸으면 간격 다시 맞춤
+
+            elapsed = time.perf_counter() - t0
+        finally:
+            self.running = False
+            self._lock.release()
+
+        self.last = {
+            "at": time.time(),
+            "seconds": round(elapsed, 3),
+            "samples": samples,
+            "interval_ms": interval * 1000,
+            "stacks": len(counts),
+        }
+        return {**self.last, "counts": counts}
+
+    @staticmethod
+    def collapsed(counts: Counter) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in counts.most_common())
+
+    @staticmethod
+    def top(counts: Counter, n: int = 30) -> list:
+        """leaf 함수 기준 self 샘플 상위 n 개"""
+        leaf = Counter()
+        for stack, c in counts.items():
+            leaf[stack.rsplit(";", 1)[-1]] += c
+        total = sum(leaf.values()) or 1
+        return [{"frame": f, "samples": c, "pct": round(100 * c / total, 1)}
+                for f, c in leaf.most_common(n)]
@@ -0,0 +1,192 @@
+# services/request_trace.py
+"""
+요청 단위 추적 (느린 요청 기록용)
+
+- 미들웨어가 요청마다 RequestTrace 를 contextvar 에 걸어둠
+  (threadpool 로 넘어간 sync 핸들러도 context 가 복사되므로 같은 trace 를 봄)
+- stage(name) : 구간별 소요시간
+- TracingConnection : 이 커넥션으로 실행한 SQL 문 / 소요시간 (trace 가 없으면 기록 안 함)
+- SlowRequestLog : threshold 를 넘은 요청만 최근 N 건 보관
+
+엔진 worker / persister 스레드처럼 요청 context 밖에서 돈 작업은 기록되지 않는다.
+"""
+import contextvars
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import psycopg2.extensions
+
+_current = contextvars.ContextVar("request_trace", default=None)
+
+SQL_MAX_CHARS = 500
+SQL_MAX_STATEMENTS = 100
+
+
+class RequestTrace:
+    __slots__ = ("method", "path", "query", "started_at", "t0", "stages", "sql", "sql_dropped")
+
+    def __init__(self, method: str, path: str, query: str = ""):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.started_at = time.time()
+        self.t0 = time.perf_counter()
+        self.stages = []        # (name, ms)
+        self.sql = []           # (statement, ms)
+        self.sql_dropped = 0
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.t0) * 1000
+
+    def add_sql(self, statement, ms: float):
+        if len(self.sql) >= SQL_MAX_STATEMENTS:
+            self.sql_dropped += 1
+            return
+        if isinstance(statement, bytes):
+            statement = statement.decode(errors="replace")
+        elif not isinstance(statement, str):
+            statement = str(statement)
+        self.sql.append((" ".join(statement.split())[:SQL_MAX_CHARS], round(ms, 3)))
+
+    def to_dict(self, total_ms: float, status: int | None) -> dict:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "query": self.query,
+            "status": status,
+            "started_at": self.started_at,
+            "total_ms": round(total_ms, 3),
+            "stages": [{"name": n, "ms": ms} for n, ms in self.stages],
+            "sql_ms": round(sum(ms for _, ms in self.sql), 3),
+            "sql": [{"statement": s, "ms": ms} for s, ms in self.sql],
+            "sql_dropped": self.sql_dropped,
+        }
+
+
+def begin(trace: RequestTrace):
+    return _current.set(trace)
+
+
+def end(token):
+    _current.reset(token)
+
+
+def current() -> RequestTrace | None:
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str):
+    """요청 구간 시간 기록 (요청 context 밖이면 아무것도 안 함)"""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.stages.append((name, round((time.perf_counter() - t0) * 1000, 3)))
+
+
+# ---------------------------------------------------------
+# SQL 기록: 커넥션 cursor() 가 요청한 cursor_factory 를 감싼 cursor 를 돌려줌
+#  (DictCursor / RealDictCursor 등 기존 factory 그대로 사용)
+# ---------------------------------------------------------
+class _TracedCursor:
+    def execute(self, query, vars=None):
+        trace = _current.get()
+        if trace is None:
+            return super().execute(query, vars)
+        t0 = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            trace.add_sql(query, (time.perf_counter() - t0) * 1000)
+
+    def executemany(self, query, vars_list):
+        trace = _current.get()
+        if trace is None:
+            return super().executemany(query, vars_list)
+        t0 = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            trace.add_sql(query, (time.perf_counter() - t0) * 1000)
+
+    def copy_expert(self, sql, file, size=8192):
+        trace = _current.get()
+        if trace is None:
+            return super().copy_expert(sql, file, size)
+        t0 = time.perf_counter()
+        try:
+            return super().copy_expert(sql, file, size)
+        finally:
+            trace.add_sql(sql, (time.perf_counter() - t0) * 1000)
+
+
+_traced_factories = {}
+
+
+def _traced(factory):
+    cls = _traced_factories.get(factory)
+    if cls is None:
+        cls = _traced_factories[factory] = type(
+            "Traced" + factory.__name__, (_TracedCursor, factory), {},
+        )
+    return cls
+
+
+class TracingConnection(psycopg2.extensions.connection):
+    """psycopg2.connect(connection_factory=TracingConnection)"""
+
+    def cursor(self, *args, **kwargs):
+        factory = kwargs.get("cursor_factory") or self.cursor_factory or psycopg2.extensions.cursor
+        kwargs["cursor_factory"] = _traced(factory)
+        return super().cursor(*args, **kwargs)
+
+
+# ---------------------------------------------------------
+# 느린 요청 보관
+# ---------------------------------------------------------
+class SlowRequestLog:
+    """threshold_ms 이상 걸린 요청의 stage / SQL 내역 (최근 keep 건, 0 이면 기록 끔)"""
+
+    def __init__(self, threshold_ms: float | None = None, keep: int | None = None):
+        self.threshold_ms = threshold_ms if threshold_ms is not None else float(
+            os.getenv("SLOW_REQUEST_MS", "500"))
+        self.entries = deque(maxlen=keep or int(os.getenv("SLOW_REQUEST_KEEP", "200")))
+
+        # 모니터링
+        self.requests = 0
+        self.slow = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+
+    def finish(self, trace: RequestTrace, status: int | None):
+        self.requests += 1
+        total = trace.elapsed_ms()
+        if total < self.threshold_ms:
+            return
+        self.slow += 1
+        self.entries.append(trace.to_dict(total, status))
+
+    def recent(self, limit: int | None = None) -> list:
+        items = list(self.entries)
+        items.reverse()
+        return items[:limit]
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "threshold_ms": self.threshold_ms,
+            "kept": len(self.entries),
+            "requests": self.requests,
+            "slow": self.slow,
+        }
@@ -0,0 +1,252 @@
+# services/risk_manager.py
+import os
+import threading
+import time
+
+
+class AccountRisk:
+    """
+    계좌별 메모리 리스크 상태 (lock 으로 보호: 접수 스레드 check_order / 엔진 스레드 on_fill)
+    - balance        : 현금 잔고 (체결 반영 후), None 이면 아직 DB 에서 안 읽음
+    - reserved_cash  : 미체결 매수주문이 잡고 있는 금액
+    - positions      : 심볼별 보유 수량
+    - reserved_qty   : 심볼별 미체결 매도주문이 잡고 있는 수량
+    - open_orders    : 예약이 붙어 있는 미체결 주문 수
+    예약은 잔고 로드와 상관없이 주문 접수(check_order) / 재적재(adopt) 시점부터 쌓인다.
+    """
+
+    __slots__ = ("lock", "balance", "reserved_cash", "positions", "reserved_qty",
+                 "open_orders", "loaded_at")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.balance = None
+        self.reserved_cash = 0.0
+        self.positions = {}
+        self.reserved_qty = {}
+        self.open_orders = 0
+        self.loaded_at = 0.0
+
+    @property
+    def idle(self) -> bool:
+        return self.open_orders <= 0
+
+
+class RiskManager:
+    """
+    매칭 전 사전 리스크 체크 (엔진 메모리에서 O(1))
+    - 주문 접수 시 가용 잔고 / 매도가능 수량 확인 후 예약
+    - 체결 시 예약분 차감 + 잔고/포지션 반영
+    - 취소/잔량소멸 시 남은 예약분 해제
+    - DB 에서 다시 올린 미체결 주문(load_symbol)은 adopt 로 예약 복구
+    거절된 주문은 DB(insert_order)나 오더북에 닿지 않는다.
+
+    잔고/포지션은 처음 보는 계좌만 AccountService(캐시)에서 한번 읽어온다 (체크 또는 첫 체결 때).
+    미체결 주문이 없고 reload_after 초 동안 체결도 없던 계좌는 다시 읽어서
+    엔진 밖(입금 등)에서 바뀐 잔고를 따라간다.
+    """
+
+    def __init__(self, account_service, enabled: bool | None = None,
+                 reload_after: float = 60.0):
+        self.account_service = account_service
+        if enabled is None:
+            enabled = os.getenv("RISK_CHECK_ENABLED", "1") == "1"
+        self.enabled = enabled
+        self.reload_after = reload_after
+
+        self.accounts = {}   # account_id -> AccountRisk
+        self._lock = threading.Lock()
+
+    # ---------------------------------------------------------
+    # 계좌 상태
+    # ---------------------------------------------------------
+    def _state(self, account_id: int) -> AccountRisk:
+        acct = self.accounts.get(account_id)
+        if acct is None:
+            with self._lock:
+                acct = self.accounts.setdefault(account_id, AccountRisk())
+        return acct
+
+    def _load(self, account_id: int, acct: AccountRisk):
+        """acct.lock 을 잡은 상태에서 호출 → 필요할 때만 잔고/포지션 (다시) 읽기"""
+        if acct.balance is not None:
+            if not acct.idle or time.monotonic() - acct.loaded_at < self.reload_after:
+                return
+
+        summary = self.account_service.get_account_summary(account_id)
+        acct.balance = float(summary["balance"])
+        acct.positions = {p["symbol"]: float(p["qty"]) for p in summary["positions"]}
+        acct.loaded_at = time.monotonic()
+
+    # ---------------------------------------------------------
+    # 주문 접수 체크 + 예약
+    # ---------------------------------------------------------
+    def check_order(self, account_id: int, symbol: str, side: str,
+                    qty: float, notional: float) -> str | None:
+        """
+        통과하면 예약 후 None, 거절이면 사유 문자열 반환
+        notional: 매수 시 잡아둘 금액 (지정가 = price * qty)
+        """
+        if not self.enabled:
+            return None
+
+        acct = self._state(account_id)
+        with acct.lock:
+            self._load(account_id, acct)
+
+            if side == "BUY":
+                available = acct.balance - acct.reserved_cash
+                if notional > available:
+                    return "INSUFFICIENT_BALANCE"
+                acct.reserved_cash += notional
+            else:
+                reserved = acct.reserved_qty.get(symbol, 0.0)
+                sellable = acct.positions.get(symbol, 0.0) - reserved
+                if qty > sellable:
+                    return "INSUFFICIENT_POSITION"
+                acct.reserved_qty[symbol] = reserved + qty
+            acct.open_orders += 1
+
+        return None
+
+    def unreserve(self, account_id: int, symbol: str, side: str,
+                  qty: float, notional: float):
+        """check_order 통과 후 주문 저장이 실패했을 때 되돌리기"""
+        if not self.enabled:
+            return
+        acct = self.accounts.get(account_id)
+        if acct is None:
+            return
+        with acct.lock:
+            if side == "BUY":
+                acct.reserved_cash = max(acct.reserved_cash - notional, 0.0)
+            else:
+                acct.reserved_qty[symbol] = max(acct.reserved_qty.get(symbol, 0.0) - qty, 0.0)
+            acct.open_orders -= 1
+
+    def bind(self, order: dict, notional: float):
+        """예약분을 엔진 주문 dict 에 붙여서 체결/취소 때 해제할 수 있게 함"""
+        if not self.enabled:
+            return
+        if order["side"] == "BUY":
+            order["risk_cash"] = notional
+        else:
+            order["risk_qty"] = order["remaining_qty"]
+
+    def adopt(self, order: dict):
+        """
+        DB 에서 오더북으로 다시 올린 미체결 주문 (MatchingEngine.load_symbol)
+        → 남은 잔량만큼 예약을 다시 잡고 주문에 붙임 (잔고 체크 없음, 이미 접수된 주문)
+        """
+        if not self.enabled:
+            return
+        acct = self._state(order["account_id"])
+        with acct.lock:
+            if order["side"] == "BUY":
+                # 시장가 stop (price 0) 은 접수 때처럼 stop 가격 기준
+                notional = (order["price"] or order.get("stop_price") or 0.0) * order["remaining_qty"]
+                order["risk_cash"] = notional
+                acct.reserved_cash += notional
+            else:
+                symbol = order["symbol"]
+                order["risk_qty"] = order["remaining_qty"]
+                acct.reserved_qty[symbol] = acct.reserved_qty.get(symbol, 0.0) + order["remaining_qty"]
+            acct.open_orders += 1
+
+    def top_up(self, order: dict, notional: float) -> float | None:
+        """
+        발동된 stop 시장가 매수: 예약을 notional (발동 시점 예상 금액) 까지 늘림
+        가용 잔고가 모자라면 있는 만큼만 → 이 주문이 쓸 수 있는 금액(예약 총액) 반환
+        리스크 체크를 끈 경우 None (한도 없음)
+        """
+        if not self.enabled:
+            return None
+        acct = self._state(order["account_id"])
+        with acct.lock:
+            self._load(order["account_id"], acct)
+            if "risk_cash" not in order:
+                order["risk_cash"] = 0.0
+                acct.open_orders += 1
+            available = max(acct.balance - acct.reserved_cash, 0.0)
+            extra = min(max(notional - order["risk_cash"], 0.0), available)
+            order["risk_cash"] += extra
+            acct.reserved_cash += extra
+            return order["risk_cash"]
+
+    # ---------------------------------------------------------
+    # 체결 반영
+    # ---------------------------------------------------------
+    def on_fill(self, order: dict, price: float, qty: float):
+        if not self.enabled:
+            return
+        account_id = order["account_id"]
+        symbol = order["symbol"]
+
+        acct = self._state(account_id)
+        with acct.lock:
+            # 처음 보는 계좌면 지금 로드 (DB 에는 아직 이 체결이 없음 → 아래에서 반영)
+            self._load(account_id, acct)
+
+            if order["side"] == "BUY":
+                # 지정가는 주문가격 기준으로 예약했으므로 같은 기준으로 해제
+                unit = order["price"] if order.get("price") else price
+                rel = min(order.get("risk_cash", 0.0), unit * qty)
+                if "risk_cash" in order:
+                    order["risk_cash"] -= rel
+                acct.reserved_cash = max(acct.reserved_cash - rel, 0.0)
+
+                acct.balance -= price * qty
+                acct.positions[symbol] = acct.positions.get(symbol, 0.0) + qty
+            else:
+                rel = min(order.get("risk_qty", 0.0), qty)
+                if "risk_qty" in order:
+                    order["risk_qty"] -= rel
+                acct.reserved_qty[symbol] = max(acct.reserved_qty.get(symbol, 0.0) - rel, 0.0)
+
+                acct.balance += price * qty
+                acct.positions[symbol] = acct.positions.get(symbol, 0.0) - qty
+
+            # 이 체결이 DB 에 커밋되기 전에 reload 로 덮어쓰지 않도록
+            acct.loaded_at = time.monotonic()
+
+    # ---------------------------------------------------------
+    # 취소 / 잔량소멸 시 남은 예약 해제
+    # ---------------------------------------------------------
+    def release(self, order: dict):
+        if not self.enabled:
+            return
+        key = "risk_cash" if order["side"] == "BUY" else "risk_qty"
+        if key not in order:
+            return    # 예약이 없는 주문 또는 이미 해제됨
+        acct = self.accounts.get(order["account_id"])
+        if acct is None:
+            order.pop(key)
+            return
+
+        with acct.lock:
+            rel = order.pop(key, 0.0)
+            if order["side"] == "BUY":
+                acct.reserved_cash = max(acct.reserved_cash - rel, 0.0)
+            else:
+                symbol = order["symbol"]
+                acct.reserved_qty[symbol] = max(acct.reserved_qty.get(symbol, 0.0) - rel, 0.0)
+            acct.open_orders -= 1
+
+    # ---------------------------------------------------------
+    # 모니터링
+    # ---------------------------------------------------------
+    def account_state(self, account_id: int) -> dict | None:
+        acct = self.accounts.get(account_id)
+        if acct is None:
+            return None
+        with acct.lock:
+            balance = acct.balance or 0.0
+            return {
+                "loaded": acct.balance is not None,
+                "balance": balance,
+                "reserved_cash": acct.reserved_cash,
+                "available": balance - acct.reserved_cash,
+                "positions": dict(acct.positions),
+                "reserved_qty": dict(acct.reserved_qty),
+                "open_orders": acct.open_orders,
+            }
@@ -0,0 +1,236 @@
+# services/shm_book.py
+"""
+엔진 → API 워커 공유메모리 top-of-book (mmap 파일, 심볼별 고정 크기 slot)
+
+layout (little endian)
+  header : magic(8s) version(I) slots(I) depth(I) pad(4)
+  slot   : seqlock(Q) book_seq(Q) symbol(16s) last_price(d, 없으면 NaN) n_bids(I) n_asks(I)
+           bids[depth] (price d, qty d, cnt Q)
+           asks[depth] (price d, qty d, cnt Q)
+
+seqlock
+  writer : seqlock 홀수로 → 데이터 기록 → 짝수로
+  reader : seqlock 읽기(홀수면 재시도) → 데이터 unpack → seqlock 다시 읽어서 같을 때만 사용
+writer 는 엔진 하나, reader 는 여러 프로세스. reader 는 mmap 에서 바로 unpack (엔진 IPC / 직렬화 없음)
+엔진 재시작 시 같은 파일(inode)을 다시 쓰므로 slots / depth 설정은 바꾸지 않는다 (바꾸면 API 도 재시작)
+"""
+import math
+import mmap
+import os
+import struct
+
+from services.order_book import BookSnapshot
+
+MAGIC = b"MYHTSBK1"
+VERSION = 1
+
+HEADER = struct.Struct("<8sIII4x")
+SLOT_HEAD = struct.Struct("<QQ16sdII")
+SEQLOCK = struct.Struct("<Q")
+LEVEL_SIZE = struct.calcsize("<ddQ")
+
+
+def _slot_size(depth: int) -> int:
+    return SLOT_HEAD.size + 2 * depth * LEVEL_SIZE
+
+
+class ShmBookWriter:
+    """엔진 쪽: publish 된 BookSnapshot 을 심볼 slot 에 기록 (엔진 스레드에서만 호출)"""
+
+    def __init__(self, path: str, slots: int | None = None, depth: int | None = None):
+        self.path = path
+        self.slots = slots or int(os.getenv("ENGINE_SHM_SLOTS", "256"))
+        self.depth = depth or int(os.getenv("ENGINE_SHM_DEPTH", "100"))
+        self.slot_size = _slot_size(self.depth)
+        self._levels = struct.Struct("<" + "ddQ" * self.depth)
+
+        size = HEADER.size + self.slots * self.slot_size
+
+        # 같은 파일을 계속 쓴다 (재시작해도 reader 의 mmap 이 유효하도록 inode 유지)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            reuse = os.fstat(fd).st_size == size
+            os.ftruncate(fd, size)
+            self.mm = mmap.mmap(fd, size, access=mmap.ACCESS_WRITE)
+        finally:
+            os.close(fd)
+
+        if not reuse or HEADER.unpack_from(self.mm, 0) != (MAGIC, VERSION, self.slots, self.depth):
+            self.mm[:] = bytes(size)
+            HEADER.pack_into(self.mm, 0, MAGIC, VERSION, self.slots, self.depth)
+
+        # 기존 slot 이름은 유지하고 내용만 비움
+        self.index = {}
+        for i in range(self.slots):
+            name = self._slot_symbol(i)
+            if name:
+                self.index[name] = i
+                self._write_slot(i, name, BookSnapshot(0, (), ()), None)
+
+        self._last = {}          # symbol -> (snapshot, last_price), 그대로면 skip
+        self.writes = 0
+        self.dropped = 0
+
+    @classmethod
+    def from_env(cls):
+        """ENGINE_SHM_PATH 가 있을 때만 사용"""
+        path = os.getenv("ENGINE_SHM_PATH")
+        return cls(path) if path else None
+
+    def _offset(self, i: int) -> int:
+        return HEADER.size + i * self.slot_size
+
+    def _slot_symbol(self, i: int) -> str:
+        raw = SLOT_HEAD.unpack_from(self.mm, self._offset(i))[2]
+        return raw.rstrip(b"\0").decode()
+
+    def write(self, symbol: str, snap: BookSnapshot, last_price: float | None = None):
+        prev = self._last.get(symbol)
+        if prev is not None and prev[0] is snap and prev[1] == last_price:
+            return
+
+        i = self.index.get(symbol)
+        if i is None:
+            if len(self.index) >= self.slots or len(symbol.encode()) > 16:
+                self.dropped += 1
+                return
+            i = self.index[symbol] = len(self.index)
+
+        self._write_slot(i, symbol, snap, last_price)
+        self._last[symbol] = (snap, last_price)
+        self.writes += 1
+
+    def _write_slot(self, i: int, symbol: str, snap: BookSnapshot, last_price):
+        off = self._offset(i)
+        seq = SEQLOCK.unpack_from(self.mm, off)[0]
+        if seq % 2:
+            seq += 1   # 이전 기록 도중 죽은 경우
+
+        bids = snap.bids[: self.depth]
+        asks = snap.asks[: self.depth]
+
+        SEQLOCK.pack_into(self.mm, off, seq + 1)
+        SLOT_HEAD.pack_into(
+            self.mm, off, seq + 1, snap.seq, symbol.encode()[:16],
+            math.nan if last_price is None else last_price, len(bids), len(asks),
+        )
+        base = off + SLOT_HEAD.size
+        self._levels.pack_into(self.mm, base, *self._flat(bids))
+        self._levels.pack_into(self.mm, base + self._levels.size, *self._flat(asks))
+        SEQLOCK.pack_into(self.mm, off, seq + 2)
+
+    def _flat(self, levels) -> list:
+        flat = [v for lv in levels for v in lv]
+        flat.extend((0.0, 0.0, 0) * (self.depth - len(levels)))
+        return flat
+
+    def close(self):
+        self.mm.close()
+
+
+class ShmBookReader:
+    """API 쪽: 심볼 slot 을 seqlock 으로 일관되게 읽어서 BookSnapshot 반환"""
+
+    RETRIES = 100
+
+    def __init__(self, path: str):
+        self.path = path
+        self.mm = None
+        self.slots = 0
+        self.depth = 0
+        self.index = {}
+
+        # 모니터링
+        self.reads = 0
+        self.retries = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls):
+        path = os.getenv("ENGINE_SHM_PATH")
+        return cls(path) if path else None
+
+    def _open(self) -> bool:
+        """엔진이 아직 파일을 만들기 전이면 False (다음 조회 때 다시 시도)"""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, slots, depth = HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or version != VERSION:
+                mm.close()
+                return False
+        except (OSError, ValueError, struct.error) as e:
+            print("[ShmBookReader] open error:", e)
+            return False
+
+        self.slots, self.depth = slots, depth
+        self.slot_size = _slot_size(depth)
+        self._levels = struct.Struct("<" + "ddQ" * depth)
+        self.mm = mm
+        return True
+
+    def _offset(self, i: int) -> int:
+        return HEADER.size + i * self.slot_size
+
+    def _find(self, symbol: str) -> int | None:
+        i = self.index.get(symbol)
+        if i is not None:
+            return i
+
+        # slot 이름은 한 번 정해지면 바뀌지 않으므로 새 심볼만 다시 스캔
+        for i in range(self.slots):
+            raw = SLOT_HEAD.unpack_from(self.mm, self._offset(i))[2]
+            if not raw.strip(b"\0"):
+                break
+            self.index[raw.rstrip(b"\0").decode()] = i
+        return self.index.get(symbol)
+
+    def read(self, symbol: str) -> tuple[BookSnapshot, float | None] | None:
+        """(snapshot, last_price), 심볼이 없거나 계속 기록 중이면 None"""
+        if self.mm is None and not self._open():
+            return None
+
+        i = self._find(symbol)
+        if i is None:
+            self.misses += 1
+            return None
+
+        off = self._offset(i)
+        base = off + SLOT_HEAD.size
+        for _ in range(self.RETRIES):
+            seq1 = SEQLOCK.unpack_from(self.mm, off)[0]
+            if seq1 % 2:
+                self.retries += 1
+                continue
+
+            _, book_seq, _, last, n_bids, n_asks = SLOT_HEAD.unpack_from(self.mm, off)
+            bids = self._levels.unpack_from(self.mm, base)
+            asks = self._levels.unpack_from(self.mm, base + self._levels.size)
+
+            if SEQLOCK.unpack_from(self.mm, off)[0] != seq1:
+                self.retries += 1
+                continue
+
+            self.reads += 1
+            snap = BookSnapshot(book_seq, self._group(bids, n_bids), self._group(asks, n_asks))
+            return snap, (None if math.isnan(last) else last)
+
+        self.misses += 1
+        return None
+
+    @staticmethod
+    def _group(flat, n: int) -> tuple:
+        return tuple(zip(flat[0:3 * n:3], flat[1:3 * n:3], flat[2:3 * n:3]))
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "open": self.mm is not None,
+            "symbols": len(self.index),
+            "depth": self.depth,
+            "reads": self.reads,
+            "retries": self.retries,
+            "misses": self.misses,
+        }
@@ -0,0 +1,61 @@
+# services/snapshot_cache.py
+import json
+import os
+import threading
+
+try:
+    import orjson
+except ImportError:  # orjson 없으면 표준 json (compact)
+    orjson = None
+
+from services.ttl_cache import TTLCache
+
+
+def dumps(obj) -> bytes:
+    """응답용 JSON bytes (orjson 우선)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":"), default=str).encode()
+
+
+class SnapshotCache:
+    """
+    hot read 엔드포인트의 직렬화 결과(bytes) 캐시
+    - key     : (endpoint, symbol, depth)
+    - version : 원본이 바뀌었는지 판단하는 값 (엔진 book seq 등), 다르면 다시 직렬화
+    - ttl     : version 으로 잡히지 않는 변경(외부 DB 쓰기 등)의 최대 지연
+
+    같은 key 로 동시에 miss 가 나도 직렬화는 1번만 (key hash 별 lock striping)
+    """
+
+    LOCK_STRIPES = 64
+
+    def __init__(self, maxsize: int | None = None, ttl: float | None = None):
+        maxsize = maxsize or int(os.getenv("SNAPSHOT_CACHE_SIZE", "2000"))
+        ttl = ttl or float(os.getenv("SNAPSHOT_CACHE_TTL", "1.0"))
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+        self._locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+
+        self.builds = 0
+
+    def get(self, endpoint: str, symbol: str, depth, version, build) -> bytes:
+        """
+        version 이 같은 캐시가 있으면 bytes 재사용, 없으면 build() → dumps
+        """
+        key = (endpoint, symbol, depth)
+
+        entry = self.cache.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        with self._locks[hash(key) % self.LOCK_STRIPES]:
+            entry = self.cache.get(key)
+            if entry is None or entry[0] != version:
+                entry = (version, dumps(build()))
+                self.cache.set(key, entry)
+                self.builds += 1
+        return entry[1]
+
+    def stats(self) -> dict:
+        return {**self.cache.stats(), "builds": self.builds}
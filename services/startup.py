@@ -0,0 +1,126 @@
+# services/startup.py
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from services.db_matching import MatchingDB
+
+
+class Startup:
+    """
+    프로세스 기동 상태
+    - phase(name) : 단계별 소요시간(ms) 기록 → /health/startup
+    - concurrent(name, tasks) : 워밍업 작업 병렬 실행 (작업별 시간도 기록)
+    - live  : 기동 실패 전까지 True (실패 시 재시작 대상)
+    - ready : 모든 단계 + 워밍업이 끝나고 readiness check 가 통과할 때
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.phases = {}
+        self.current = None
+        self.finished = False
+        self.error = None
+        self.checks = {}       # name -> fn() -> bool
+
+    @contextmanager
+    def phase(self, name: str):
+        self.current = name
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, t0)
+        self.current = None     # 실패하면 남겨둠 (report 의 current)
+
+    def _record(self, name: str, t0: float):
+        ms = (time.perf_counter() - t0) * 1000
+        self.phases[name] = round(ms, 1)
+        print(f"[Startup] {name}: {ms:.1f}ms")
+
+    def concurrent(self, name: str, tasks: dict, workers: int | None = None) -> dict:
+        """
+        tasks : {작업 이름: fn()} → {작업 이름: 결과}
+        하나라도 실패하면 나머지를 기다린 뒤 첫 예외를 다시 던짐
+        """
+        def run(task, fn):
+            t0 = time.perf_counter()
+            try:
+                return fn()
+            finally:
+                self._record(f"{name}.{task}", t0)
+
+        if not tasks:
+            return {}
+        with self.phase(name):
+            with ThreadPoolExecutor(workers or len(tasks), thread_name_prefix=name) as ex:
+                futures = {task: ex.submit(run, task, fn) for task, fn in tasks.items()}
+            errors = [f.exception() for f in futures.values() if f.exception() is not None]
+            if errors:
+                raise errors[0]
+            return {task: f.result() for task, f in futures.items()}
+
+    def done(self):
+        self.finished = True
+        self.phases["total"] = round((time.perf_counter() - self._t0) * 1000, 1)
+        print(f"[Startup] ready in {self.phases['total']:.1f}ms")
+
+    def fail(self, e: Exception):
+        self.error = f"{type(e).__name__}: {e}"
+        print(f"[Startup] failed during {self.current}:", e)
+        traceback.print_exc()
+
+    # ---------------------------------------------------------
+    # probe
+    # ---------------------------------------------------------
+    @property
+    def live(self) -> bool:
+        return self.error is None
+
+    def readiness(self) -> tuple[bool, dict]:
+        if not self.finished:
+            return False, {}
+        results = {}
+        for name, fn in self.checks.items():
+            try:
+                results[name] = bool(fn())
+            except Exception as e:
+                print(f"[Startup] check {name} error:", e)
+                results[name] = False
+        return all(results.values()), results
+
+    def report(self) -> dict:
+        return {
+            "started_at": self.started_at,
+            "finished": self.finished,
+            "current": self.current,
+            "error": self.error,
+            "phases_ms": dict(self.phases),
+        }
+
+
+# ---------------------------------------------------------
+# 엔진 오더북 워밍업: DB 미체결 주문 → 메모리 오더북, 발동 대기 stop → trigger index
+#  심볼별 조회는 풀 커넥션으로 병렬, 적재(load_symbol)는 엔진 락 안에서 하나씩
+# ---------------------------------------------------------
+def warm_engine_books(engine, pool, symbols=None, workers: int | None = None) -> dict:
+    workers = workers or int(os.getenv("WARMUP_WORKERS", "4"))
+
+    if symbols is None:
+        with pool.connection() as conn:
+            symbols = MatchingDB(conn=conn).get_active_symbols()
+
+    def load(symbol):
+        with pool.connection() as conn:
+            mdb = MatchingDB(conn=conn)
+            rows = mdb.fetch_working_orders(symbol)
+            stops = mdb.fetch_pending_stops(symbol)
+        return engine.load_symbol(symbol, rows, stops)
+
+    if not symbols:
+        return {}
+    with ThreadPoolExecutor(min(workers, len(symbols)), thread_name_prefix="warm-book") as ex:
+        return dict(zip(symbols, ex.map(load, symbols)))
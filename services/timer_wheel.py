@@ -0,0 +1,112 @@
+# services/timer_wheel.py
+
+
+class TimerWheel:
+    """
+    계층형 타이머 휠 (주문 만료용)
+
+    - 시간 단위는 tick (tick_ms 밀리초)
+    - level L 의 슬롯 1칸 = wheel_size**L tick
+      level 0 : 0 ~ wheel_size tick, level 1 : ~ wheel_size**2 tick, ...
+    - schedule / cancel : O(1) (슬롯은 key -> deadline dict)
+    - advance : tick 당 슬롯 1칸 + 상위 level 슬롯이 넘어갈 때만 cascade → 만료 1건당 amortized O(1)
+
+    key 는 hashable 이면 무엇이든 (엔진은 주문 id)
+    """
+
+    def __init__(self, tick_ms: int = 100, wheel_size: int = 256, levels: int = 4,
+                 start_ms: int = 0):
+        self.tick_ms = tick_ms
+        self.wheel_size = wheel_size
+        self.levels = levels
+
+        self.current = start_ms // tick_ms
+        self._slots = [[{} for _ in range(wheel_size)] for _ in range(levels)]
+        self._where = {}     # key -> (level, idx)
+        self._due = {}       # 이미 지난 deadline 으로 들어온 key -> deadline
+
+    def __len__(self):
+        return len(self._where) + len(self._due)
+
+    def __contains__(self, key):
+        return key in self._where or key in self._due
+
+    # ---------------------------------------------------------
+    # 등록 / 취소
+    # ---------------------------------------------------------
+    def schedule(self, key, deadline_ms: int):
+        self.cancel(key)
+        self._place(key, -(-deadline_ms // self.tick_ms))   # 올림: deadline 이전에 만료되지 않도록
+
+    def cancel(self, key) -> bool:
+        where = self._where.pop(key, None)
+        if where is not None:
+            level, idx = where
+            del self._slots[level][idx][key]
+            return True
+        return self._due.pop(key, None) is not None
+
+    def _place(self, key, deadline: int):
+        delta = deadline - self.current
+        if delta <= 0:
+            self._due[key] = deadline
+            return
+
+        w = self.wheel_size
+        level = 0
+        span = w
+        while delta >= span and level < self.levels - 1:
+            level += 1
+            span *= w
+
+        idx = (deadline // (w ** level)) % w
+        self._slots[level][idx][key] = deadline
+        self._where[key] = (level, idx)
+
+    # ---------------------------------------------------------
+    # 시간 진행 → 만료된 key 목록 (deadline, 등록 순서)
+    # ---------------------------------------------------------
+    def advance(self, now_ms: int) -> list:
+        target = now_ms // self.tick_ms
+        expired = []
+
+        if self._due:
+            expired += sorted(self._due, key=self._due.get)
+            self._due.clear()
+
+        w = self.wheel_size
+        while self.current < target:
+            # 비어있으면 다음 항목까지 건너뜀 (장시간 idle 후에도 tick 단위 루프 없음)
+            if not self._where:
+                self.current = target
+                break
+
+            self.current += 1
+            cur = self.current
+
+            # 상위 level 슬롯 경계면 한 단계 내려서 재배치
+            level, unit = 1, w
+            while level < self.levels and cur % unit == 0:
+                slot = self._slots[level][(cur // unit) % w]
+                if slot:
+                    moved = list(slot.items())
+                    slot.clear()
+                    for key, deadline in moved:
+                        del self._where[key]
+                        self._place(key, deadline)
+                level += 1
+                unit *= w
+
+            slot = self._slots[0][cur % w]
+            if slot:
+                items = sorted(slot.items(), key=lambda kv: kv[1])
+                slot.clear()
+                for key, _ in items:
+                    del self._where[key]
+                    expired.append(key)
+
+            if self._due:
+                expired += sorted(self._due, key=self._due.get)
+                self._due.clear()
+
+        return expired
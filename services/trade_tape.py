@@ -0,0 +1,36 @@
+# services/trade_tape.py
+
+
+class TradeTape:
+    """
+    심볼 1개의 최근 체결 (고정 크기 ring buffer)
+    - entry : (seq, ts_ms, price, qty, aggressor)  aggressor = "BUY" / "SELL" / None(단일가)
+    - 엔진 스레드만 append, 조회는 락 없이
+      slot 에 불변 tuple 을 넣은 뒤 seq 를 올리므로, 조회 중 덮어쓰인 slot 은 seq 가 달라서 걸러짐
+    """
+
+    __slots__ = ("capacity", "_ring", "seq")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._ring = [None] * capacity
+        self.seq = 0
+
+    def append(self, price: float, qty: float, aggressor: str | None, ts_ms: int):
+        seq = self.seq + 1
+        self._ring[seq % self.capacity] = (seq, ts_ms, price, qty, aggressor)
+        self.seq = seq
+
+    def recent(self, limit: int | None = None, since: int = 0) -> tuple[int, list]:
+        """(현재 seq, since 이후 체결 최신순 최대 limit 건)"""
+        top = self.seq
+        n = min(limit or self.capacity, self.capacity, max(0, top - since))
+
+        out = []
+        ring = self._ring
+        for s in range(top, top - n, -1):
+            e = ring[s % self.capacity]
+            if e is None or e[0] != s:
+                break       # 읽는 동안 한 바퀴 돌아 덮어쓰임 → 여기까지만
+            out.append(e)
+        return top, out
@@ -0,0 +1,108 @@
+# services/ttl_cache.py
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    크기 제한(LRU) + 만료시간(TTL)을 가진 인메모리 캐시.
+    - 여러 threadpool 스레드에서 동시에 호출해도 되도록 Lock 으로 보호
+    - 엔트리마다 만료시각을 따로 줄 수 있음 (예: JWT exp)
+    - hit/miss 카운터 제공
+    - on_evict(key, value): LRU 로 밀리거나 만료로 빠진 엔트리 통지 (lock 밖에서 호출, 보조 인덱스 정리용)
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60.0, on_evict=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+
+        self._data = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # -----------------------------------
+    # 조회 (만료/미존재 시 None)
+    # -----------------------------------
+    def get(self, key, default=None):
+        now = time.monotonic()
+
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = item
+            if expires_at > now:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+
+            del self._data[key]
+            self.misses += 1
+
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+        return default
+
+    # -----------------------------------
+    # 저장 (ttl 미지정 시 기본 TTL)
+    # -----------------------------------
+    def set(self, key, value, ttl: float | None = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+
+        evicted = []
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                old_key, (_, old_value) = self._data.popitem(last=False)
+                evicted.append((old_key, old_value))
+                self.evictions += 1
+
+        if self.on_evict is not None:
+            for old_key, old_value in evicted:
+                self.on_evict(old_key, old_value)
+
+    # -----------------------------------
+    # 이미 있는 엔트리의 값만 교체 (만료시각 유지)
+    # -----------------------------------
+    def replace(self, key, value) -> bool:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return False
+            self._data[key] = (item[0], value)
+            return True
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, None)
+            return default if item is None else item[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    # -----------------------------------
+    # 모니터링용 통계
+    # -----------------------------------
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
@@ -0,0 +1,156 @@
+# tests/test_call_auction.py
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from services.call_auction import uncross
+
+
+def _book(bids, asks):
+    """[(price, qty)] → 가격-시간 우선순위로 정렬된 주문 dict (OrderBook 과 같은 순서)"""
+    oid = iter(range(1, 10_000))
+    b = [{"id": next(oid), "price": p, "remaining_qty": q} for p, q in bids]
+    a = [{"id": next(oid), "price": p, "remaining_qty": q} for p, q in asks]
+    b.sort(key=lambda o: (-o["price"], o["id"]))
+    a.sort(key=lambda o: (o["price"], o["id"]))
+    return b, a
+
+
+def _padded(fill, orders) -> list:
+    """buy_fill / sell_fill 은 가격 조건을 만족하는 prefix 길이 → 뒤는 체결 0"""
+    return list(fill) + [0.0] * (len(orders) - len(fill))
+
+
+def _check_pairs(r, bids, asks):
+    """체결 쌍: 주문별 합계 = 배분량, 우선순위 순서, 가격 교차"""
+    buy = [0.0] * len(bids)
+    sell = [0.0] * len(asks)
+    prev = (0, 0)
+    for bi, si, qty in r["pairs"]:
+        assert qty > 0
+        assert (bi, si) >= prev and bi >= prev[0] and si >= prev[1]
+        prev = (bi, si)
+        assert bids[bi]["price"] >= r["price"] >= asks[si]["price"]
+        buy[bi] += qty
+        sell[si] += qty
+    assert buy == pytest.approx(_padded(r["buy_fill"], bids))
+    assert sell == pytest.approx(_padded(r["sell_fill"], asks))
+    assert sum(buy) == pytest.approx(r["volume"])
+
+
+def test_no_cross():
+    bids, asks = _book([(99, 1)], [(100, 1)])
+    assert uncross(bids, asks) is None
+    assert uncross([], asks) is None
+    assert uncross(bids, []) is None
+
+
+def test_single_price_full_match():
+    bids, asks = _book([(100, 2)], [(100, 2)])
+    r = uncross(bids, asks)
+    assert r["price"] == 100 and r["volume"] == 2 and r["imbalance"] == 0
+    assert r["pairs"] == [(0, 0, 2.0)]
+
+
+def test_max_volume_price():
+    # 101: 수요 3 / 공급 3 → 거래량 최대
+    bids, asks = _book([(102, 1), (101, 2), (100, 5)], [(99, 1), (100, 1), (101, 1), (103, 4)])
+    r = uncross(bids, asks)
+    assert r["volume"] == 3
+    assert r["price"] == 101
+    _check_pairs(r, bids, asks)
+
+
+def test_tie_min_imbalance():
+    # 100 (수요 3 / 공급 2), 101 (수요 2 / 공급 4) 둘 다 거래량 2 → 불균형이 작은 100
+    bids, asks = _book([(101, 2), (100, 1)], [(100, 2), (101, 2)])
+    r = uncross(bids, asks)
+    assert r["volume"] == 2
+    assert r["price"] == 100 and r["imbalance"] == 1
+
+
+def test_tie_market_pressure_buy():
+    # 후보 전부 매수 우위 → 높은 가격
+    bids, asks = _book([(102, 3)], [(100, 1), (101, 1)])
+    r = uncross(bids, asks)
+    assert r["volume"] == 2 and r["imbalance"] == 1
+    assert r["price"] == 102
+
+
+def test_tie_market_pressure_sell():
+    # 후보 전부 매도 우위 → 낮은 가격
+    bids, asks = _book([(102, 1), (101, 1)], [(100, 3)])
+    r = uncross(bids, asks)
+    assert r["volume"] == 2 and r["imbalance"] == -1
+    assert r["price"] == 100
+
+
+def test_tie_reference_price():
+    # 100 ~ 102 모두 거래량 1, 불균형 0 → reference 에 가까운 가격, 없으면 구간 중앙
+    bids, asks = _book([(102, 1)], [(100, 1)])
+    assert uncross(bids, asks, reference_price=99)["price"] == 100
+    assert uncross(bids, asks, reference_price=105)["price"] == 102
+    assert uncross(bids, asks)["price"] in (100, 102)    # 중앙 101 은 호가 격자에 없음
+
+
+def test_time_priority_within_price():
+    # 같은 가격이면 먼저 들어온(id 작은) 주문부터
+    bids, asks = _book([(100, 1), (100, 1), (100, 1)], [(100, 2)])
+    r = uncross(bids, asks)
+    assert list(r["buy_fill"]) == [1, 1, 0]
+    assert [o["id"] for o in bids] == [1, 2, 3]
+    _check_pairs(r, bids, asks)
+
+
+def test_fractional_qty_exact():
+    # 1e-8 정수 단위 → 0.1 + 0.2 도 오차 없이 0.3 과 동점
+    bids, asks = _book([(100, 0.1), (100, 0.2)], [(100, 0.3)])
+    r = uncross(bids, asks)
+    assert r["volume"] == 0.3 and r["imbalance"] == 0
+    assert r["pairs"] == [(0, 0, 0.1), (1, 0, 0.2)]
+
+
+def test_pair_construction_interleaved():
+    bids, asks = _book([(105, 3), (104, 1), (103, 2)], [(100, 1), (101, 2), (102, 4)])
+    r = uncross(bids, asks)
+    assert r["volume"] == 6
+    _check_pairs(r, bids, asks)
+    assert r["pairs"] == [(0, 0, 1.0), (0, 1, 2.0), (1, 2, 1.0), (2, 2, 2.0)]
+
+
+def _reference(bids, asks):
+    """모든 호가 가격에서 거래량 / 불균형 직접 계산 → (최대 거래량, 그 중 최소 불균형)"""
+    best = None
+    for p in sorted({o["price"] for o in bids + asks}):
+        d = sum(round(o["remaining_qty"] * 1e8) for o in bids if o["price"] >= p)
+        s = sum(round(o["remaining_qty"] * 1e8) for o in asks if o["price"] <= p)
+        key = (min(d, s), -abs(d - s))
+        if best is None or key > best:
+            best = key
+    return best[0] / 1e8, -best[1] / 1e8
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_random_against_reference(seed):
+    rng = random.Random(seed)
+    bids, asks = _book(
+        [(rng.randint(95, 105), rng.randint(1, 5) / 10) for _ in range(rng.randint(1, 20))],
+        [(rng.randint(95, 105), rng.randint(1, 5) / 10) for _ in range(rng.randint(1, 20))],
+    )
+    r = uncross(bids, asks)
+    if bids[0]["price"] < asks[0]["price"]:
+        assert r is None
+        return
+
+    volume, imbalance = _reference(bids, asks)
+    assert r["volume"] == pytest.approx(volume)
+    assert abs(r["imbalance"]) == pytest.approx(imbalance)
+    _check_pairs(r, bids, asks)
+
+    # 배분은 가격-시간 우선순위 prefix
+    filled = _padded(r["buy_fill"], bids)
+    for i in range(1, len(filled)):
+        if filled[i] > 0:
+            assert filled[i - 1] == pytest.approx(bids[i - 1]["remaining_qty"])
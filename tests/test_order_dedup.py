@@ -0,0 +1,84 @@
+# tests/test_order_dedup.py
+import json
+import time
+from concurrent.futures import Future
+
+from services.order_dedup import OrderDedup
+
+
+def test_claim_then_duplicate_gets_same_future():
+    d = OrderDedup(per_account=10, max_accounts=10, ttl=60)
+    f1, f2 = Future(), Future()
+    assert d.claim(1, "a", f1) is None
+    assert d.claim(1, "a", f2) is f1
+    assert d.duplicates == 1
+
+
+def test_ids_are_per_account():
+    d = OrderDedup(per_account=10, max_accounts=10, ttl=60)
+    assert d.claim(1, "a", Future()) is None
+    assert d.claim(2, "a", Future()) is None
+
+
+def test_release_allows_retry():
+    d = OrderDedup(per_account=10, max_accounts=10, ttl=60)
+    f1, f2 = Future(), Future()
+    d.claim(1, "a", f1)
+    d.release(1, "a", f1)
+    assert d.claim(1, "a", f2) is None
+    assert d.claim(1, "a", Future()) is f2
+
+
+def test_release_unknown_is_noop():
+    d = OrderDedup(per_account=10, max_accounts=10, ttl=60)
+    d.release(1, "nope")
+    d.claim(1, "a", Future())
+    d.release(1, "nope")
+    assert d.claim(1, "a", Future()) is not None
+
+
+def test_stale_release_keeps_newer_claim():
+    # a 가 계좌당 LRU 에서 밀려난 뒤 다시 claim 됨 → 처음 요청의 실패 release 가 새 claim 을 지우면 안 됨
+    d = OrderDedup(per_account=2, max_accounts=10, ttl=60)
+    first = Future()
+    d.claim(1, "a", first)
+    d.claim(1, "b", Future())
+    d.claim(1, "c", Future())           # a 밀려남
+    second = Future()
+    assert d.claim(1, "a", second) is None
+    d.release(1, "a", first)
+    assert d.claim(1, "a", Future()) is second
+
+
+def test_per_account_lru_limit():
+    d = OrderDedup(per_account=2, max_accounts=10, ttl=60)
+    for coid in ("a", "b", "c"):
+        d.claim(1, coid, Future())
+    assert d.claim(1, "a", Future()) is None          # 가장 오래된 id 는 잊음
+    assert d.claim(1, "c", Future()) is not None
+
+
+def test_ttl_expiry():
+    d = OrderDedup(per_account=10, max_accounts=10, ttl=0.05)
+    d.claim(1, "a", Future())
+    time.sleep(0.08)
+    assert d.claim(1, "a", Future()) is None
+
+
+def test_load_journal(tmp_path):
+    now = time.time()
+    path = tmp_path / "journal.jsonl"
+    events = [
+        {"ts": now - 10, "type": "limit", "order_id": 7, "account_id": 1, "client_order_id": "a"},
+        {"ts": now - 1000, "type": "limit", "order_id": 8, "account_id": 1, "client_order_id": "old"},
+        {"ts": now - 5, "type": "market", "order_id": 9, "account_id": 2, "client_order_id": None},
+        {"ts": now - 5, "type": "cancel", "order_ids": [7]},
+    ]
+    path.write_text("\n".join(json.dumps(e) for e in events) + "\n\n", encoding="utf-8")
+
+    d = OrderDedup(per_account=10, max_accounts=10, ttl=600)
+    assert d.load_journal(str(path)) == 1
+    prev = d.claim(1, "a", Future())
+    assert prev is not None and prev.result() == {"order_id": 7, "fills": [], "recovered": True}
+    assert d.claim(1, "old", Future()) is None
+    assert d.load_journal(str(tmp_path / "missing.jsonl")) == 0
@@ -0,0 +1,112 @@
+# tests/test_timer_wheel.py
+import random
+
+from services.timer_wheel import TimerWheel
+
+
+def _wheel(**kw):
+    # 작은 휠: level 경계 / cascade 를 짧은 시간 안에 지나가도록
+    return TimerWheel(**{"tick_ms": 10, "wheel_size": 4, "levels": 3, **kw})
+
+
+def test_expires_at_deadline_not_before():
+    tw = _wheel()
+    tw.schedule("a", 55)            # 올림 → tick 6
+    assert tw.advance(59) == []
+    assert tw.advance(60) == ["a"]
+    assert len(tw) == 0
+
+
+def test_past_deadline_is_due_on_next_advance():
+    tw = _wheel(start_ms=1000)
+    tw.schedule("late", 500)
+    tw.schedule("now", 1000)
+    assert "late" in tw and len(tw) == 2
+    # 시간이 그대로여도 다음 advance 에서 deadline 순서로
+    assert tw.advance(1000) == ["late", "now"]
+    assert tw.advance(5000) == []
+
+
+def test_cancel_and_reschedule():
+    tw = _wheel()
+    tw.schedule("a", 100)
+    tw.schedule("b", 100)
+    assert tw.cancel("a") is True
+    assert tw.cancel("a") is False
+    tw.schedule("b", 300)           # 재등록은 이전 deadline 을 대체
+    assert tw.advance(200) == []
+    assert tw.advance(300) == ["b"]
+
+
+def test_cancel_due_key():
+    tw = _wheel(start_ms=100)
+    tw.schedule("a", 0)
+    assert tw.cancel("a") is True
+    assert tw.advance(100) == []
+
+
+def test_cascade_at_slot_boundaries():
+    # wheel_size 4 → level 1 슬롯 경계 tick 4, 8, ..  level 2 경계 tick 16, 32, ..
+    tw = _wheel()
+    for tick in (3, 4, 5, 15, 16, 17, 63, 64, 65):
+        tw.schedule(tick, tick * 10)
+    got = {}
+    for now in range(0, 700, 10):
+        for key in tw.advance(now):
+            got[key] = now
+    assert got == {tick: tick * 10 for tick in (3, 4, 5, 15, 16, 17, 63, 64, 65)}
+
+
+def test_beyond_top_level_range():
+    # levels=3, size 4 → 64 tick 이상은 최상위 level 에서 여러 바퀴 돈 뒤 만료
+    tw = _wheel()
+    tw.schedule("far", 2000)
+    assert tw.advance(1990) == []
+    assert tw.advance(2000) == ["far"]
+
+
+def test_idle_skip_then_schedule():
+    tw = _wheel()
+    assert tw.advance(10_000) == []
+    tw.schedule("a", 10_050)
+    assert tw.advance(10_040) == []
+    assert tw.advance(10_050) == ["a"]
+
+
+def test_expiry_order():
+    # deadline 은 tick 단위 → 같은 tick 이면 등록 순서, 다른 tick 은 deadline 순서
+    tw = _wheel()
+    tw.schedule("b", 58)
+    tw.schedule("a", 51)
+    tw.schedule("c", 45)
+    assert tw.advance(60) == ["c", "b", "a"]
+
+
+def test_random_against_reference():
+    rng = random.Random(7)
+    tw = _wheel(start_ms=rng.randrange(1000))
+    tick = tw.tick_ms
+    live = {}
+    now = tw.current * tick
+
+    for step in range(3000):
+        op = rng.random()
+        if op < 0.5:
+            key = rng.randrange(200)
+            deadline = now + rng.randrange(-50, 3000)
+            tw.schedule(key, deadline)
+            live[key] = -(-deadline // tick)
+        elif op < 0.6 and live:
+            key = rng.choice(list(live))
+            assert tw.cancel(key)
+            del live[key]
+        else:
+            now += rng.choice((0, 1, 7, 10, 40, 333))
+            target = now // tick
+            expired = tw.advance(now)
+            expect = {k for k, d in live.items() if d <= target}
+            assert set(expired) == expect, step
+            assert len(expired) == len(expect)
+            for k in expired:
+                del live[k]
+        assert len(tw) == len(live)
@@ -0,0 +1,61 @@
+# tests/test_trade_tape.py
+from services.trade_tape import TradeTape
+
+
+def _fill(tape, n, start=1):
+    for i in range(start, start + n):
+        tape.append(float(i), 1.0, "BUY", i)
+
+
+def test_empty():
+    assert TradeTape(4).recent() == (0, [])
+    assert TradeTape(4).recent(10, since=3) == (0, [])
+
+
+def test_newest_first_with_limit():
+    tape = TradeTape(8)
+    _fill(tape, 5)
+    seq, out = tape.recent(3)
+    assert seq == 5
+    assert [e[0] for e in out] == [5, 4, 3]
+
+
+def test_since_returns_only_newer():
+    tape = TradeTape(8)
+    _fill(tape, 5)
+    assert [e[0] for e in tape.recent(since=3)[1]] == [5, 4]
+    assert tape.recent(since=5) == (5, [])
+    assert tape.recent(since=9) == (5, [])     # 클라이언트 seq 가 앞서 있으면 (엔진 재시작 등) 빈 목록
+
+
+def test_wraparound_keeps_last_capacity():
+    tape = TradeTape(4)
+    _fill(tape, 10)
+    seq, out = tape.recent()
+    assert seq == 10
+    assert [e[0] for e in out] == [10, 9, 8, 7]
+    # ring 보다 오래된 since → 남아 있는 것까지만
+    assert [e[0] for e in tape.recent(since=2)[1]] == [10, 9, 8, 7]
+    assert [e[0] for e in tape.recent(100, since=8)[1]] == [10, 9]
+
+
+def test_wraparound_at_exact_capacity():
+    tape = TradeTape(4)
+    _fill(tape, 4)
+    assert [e[0] for e in tape.recent()[1]] == [4, 3, 2, 1]
+    _fill(tape, 1, start=5)
+    assert [e[0] for e in tape.recent()[1]] == [5, 4, 3, 2]
+
+
+def test_overwritten_slot_stops_read():
+    # 읽는 도중 엔진이 한 바퀴 돌아 덮어쓴 slot 은 seq 가 달라서 거기서 멈춤
+    tape = TradeTape(4)
+    _fill(tape, 6)
+    tape._ring[4 % 4] = (8, 8, 8.0, 1.0, "SELL")     # seq 4 자리를 seq 8 이 덮어씀
+    assert [e[0] for e in tape.recent()[1]] == [6, 5]
+
+
+def test_entry_shape():
+    tape = TradeTape(2)
+    tape.append(101.5, 0.25, None, 1234)
+    assert tape.recent()[1] == [(1, 1234, 101.5, 0.25, None)]